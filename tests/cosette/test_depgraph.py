@@ -32,7 +32,7 @@
 # pylint: disable=no-value-for-parameter
 
 from hypothesis import given, note, assume, event, HealthCheck, settings
-from hypothesis.strategies import text, booleans, integers
+from hypothesis.strategies import text, booleans, integers, data, sampled_from
 import pytest
 
 from ..context import valjean  # pylint: disable=unused-import
@@ -107,6 +107,20 @@ def do_test_topological_sort(graph):
         seen.add(item)
 
 
+@given(graph=depgraphs())
+def test_bottom_levels(graph):
+    '''Test that the bottom level of a node is its weight plus the largest
+    bottom level of its dependees.'''
+    weights = {node: abs(node) % 7 for node in graph.nodes()}
+    levels = graph.bottom_levels(weights)
+    inverted = graph.invert()
+    for node in graph.nodes():
+        dependees = inverted.dependencies(node)
+        expected = weights[node] + max((levels[dep] for dep in dependees),
+                                       default=0)
+        assert levels[node] == expected
+
+
 @given(graph=depgraphs())
 def test_invert_roundtrip(graph):
     '''Test that DepGraph.invert() is idempotent.'''
@@ -399,6 +413,31 @@ def test_add_remove_is_identity(graph, new):
     assert graph == graph_copy
 
 
+@settings(suppress_health_check=(HealthCheck.too_slow,))
+@given(graph=depgraphs(min_size=1), sampler=data())
+def test_dependees_after_remove(graph, sampler):
+    '''Test that the dependees of the nodes are still consistent with the
+    dependencies after removing a node.'''
+    node = sampler.draw(sampled_from(list(graph.nodes())), label='node')
+    graph.remove_node(node)
+    inverted = graph.invert()
+    for other in graph.nodes():
+        assert (sorted(graph.dependees(other))
+                == sorted(inverted.dependencies(other)))
+        assert node not in graph.dependencies(other)
+
+
+def test_topological_sort_deep():
+    '''Test that the topological sort of a very deep graph does not exceed the
+    recursion limit.'''
+    from sys import getrecursionlimit
+    nodes = [f'node{i}' for i in range(2 * getrecursionlimit())]
+    graph = depgraph.DepGraph()
+    for node, previous in zip(nodes[1:], nodes):
+        graph.add_dependency(node, on=previous)
+    assert graph.topological_sort() == nodes
+
+
 @settings(suppress_health_check=(HealthCheck.too_slow,))
 @given(graph1=depgraphs(min_size=2), graph2=depgraphs())
 def test_flatten_dependencies(graph1, graph2):
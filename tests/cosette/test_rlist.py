@@ -89,6 +89,17 @@ def test_delete(rlst, sampler):
     assert len(rlst_deleted) == len(rlst) - 1
 
 
+@given(rlst=reversible_lists(), new=integers(0, 10))
+def test_append(rlst, new):
+    '''Test that appending an element does not violate any invariant.'''
+    rlst_appended = rlst.copy()
+    rlst_appended.append(new)
+    note(f'rlst_appended = {rlst_appended}')
+    check_revlist_invariant(rlst_appended)
+    assert rlst_appended[-1] == new
+    assert len(rlst_appended) == len(rlst) + 1
+
+
 @given(rlst=reversible_lists(min_size=1), new=integers(0, 10), sampler=data())
 def test_setitem(rlst, new, sampler):
     '''Test that updating an element does not violate any invariant.'''
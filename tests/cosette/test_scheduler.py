@@ -31,8 +31,10 @@
 '''Tests for the :mod:`~.scheduler` module.'''
 # pylint: disable=no-value-for-parameter
 
+import os
+
 from hypothesis import given, settings, note, event
-from hypothesis.strategies import integers, data
+from hypothesis.strategies import integers, data, booleans, lists, floats
 import pytest
 
 from .conftest import (graphs, failing_tasks, delay_tasks, FailingTask,
@@ -41,11 +43,15 @@ from ..context import valjean  # pylint: disable=unused-import
 # pylint: disable=wrong-import-order
 from valjean.cosette.scheduler import (Scheduler, QueueScheduling,
                                        SchedulerError)
-from valjean.cosette.task import TaskStatus
+from valjean.cosette.task import TaskStatus, DelayTask
 from valjean.cosette.depgraph import DepGraph
+from valjean.cosette.pythontask import PythonTask
+from valjean.cosette.run import RunTask
+from valjean.cosette.backends.process import ProcessScheduling
 
 
-def run(*, hard_graph, soft_graph=None, n_workers):
+def run(*, hard_graph, soft_graph=None, n_workers, event_driven=True,
+        env=None):
     '''Schedule a graph on a given number of workers.
 
     :param DepGraph hard_graph: The graph of the hard dependencies among the
@@ -58,12 +64,16 @@ def run(*, hard_graph, soft_graph=None, n_workers):
                                 hard and soft dependencies.
     :param int n_workers: The number of workers. Use ``n_workers=0`` to test
                           the choice of the default backend.
+    :param bool event_driven: Whether the backend should use the event-driven
+                              mode.
+    :param Env env: An initial environment.
     '''
     soft_graph = DepGraph() if soft_graph is None else soft_graph
-    backend = QueueScheduling(n_workers=n_workers) if n_workers > 0 else None
+    backend = (QueueScheduling(n_workers=n_workers, event_driven=event_driven)
+               if n_workers > 0 else None)
     scheduler = Scheduler(hard_graph=hard_graph, soft_graph=soft_graph,
                           backend=backend)
-    env = scheduler.schedule()
+    env = scheduler.schedule(env=env)
     for values in env.values():
         if values['status'] == TaskStatus.SKIPPED:
             continue
@@ -94,6 +104,35 @@ def test_dep_tasks(graph, n_workers):
     run(hard_graph=graph, n_workers=n_workers)
 
 
+@settings(max_examples=25)
+@given(graph=graphs(task_strategy=delay_tasks(min_duration=0.0,
+                                              max_duration=0.0),
+                    dep_frac=0.02),
+       n_workers=integers(min_value=1, max_value=100))
+def test_dep_tasks_polling(graph, n_workers):
+    '''Test scheduling of dependent tasks with the polling mode.'''
+    run(hard_graph=graph, n_workers=n_workers, event_driven=False)
+
+
+@settings(max_examples=10)
+@given(graph=graphs(task_strategy=delay_tasks(min_duration=0.0,
+                                              max_duration=0.0),
+                    dep_frac=0.1),
+       n_workers=integers(min_value=1, max_value=10),
+       event_driven=booleans())
+def test_done_tasks_not_rerun(graph, n_workers, event_driven):
+    '''Test that tasks that are already done and newer than their
+    dependencies are not executed again.'''
+    env = run(hard_graph=graph, n_workers=n_workers,
+              event_driven=event_driven)
+    clocks = {name: values['start_clock'] for name, values in env.items()}
+    env = run(hard_graph=graph, n_workers=n_workers,
+              event_driven=event_driven, env=env)
+    for task in graph.nodes():
+        assert env.is_done(task)
+        assert env.get_start_clock(task) == clocks[task.name]
+
+
 @given(graph=graphs(task_strategy=delay_tasks(min_duration=0,
                                               max_duration=1e-2),
                     dep_frac=0.1),
@@ -132,8 +171,9 @@ def test_failing_task(graph, n_workers):
                                 min_size=3, max_size=10),
                     dep_frac=0.5),
        n_workers=integers(min_value=0, max_value=10),
+       event_driven=booleans(),
        sampler=data())
-def test_failing_blocks(graph, n_workers, sampler):
+def test_failing_blocks(graph, n_workers, event_driven, sampler):
     '''Check that tasks depending on a failing task are not executed.'''
 
     # add a failing task to the dependency of one of the tasks
@@ -152,7 +192,8 @@ def test_failing_blocks(graph, n_workers, sampler):
     graph.add_node(failing_task)
 
     # schedule the graph
-    env = run(hard_graph=graph, n_workers=n_workers)
+    env = run(hard_graph=graph, n_workers=n_workers,
+              event_driven=event_driven)
     note(f'environment after scheduling: {env}')
 
     n_blocked = 0
@@ -227,6 +268,168 @@ def test_failing_soft_not_blocks(graph, n_workers, sampler):
     event(f'blocked tasks = {n_blocked}')
 
 
+def test_priority_order():
+    '''Test that the tasks on the critical path, estimated from the
+    durations of a previous run, are executed first.'''
+    from valjean.cosette.env import Env
+    durations = {'short': 1., 'long': 10., 'medium': 5., 'unknown': None}
+    tasks = [DelayTask(name, 0.) for name in durations]
+    env = Env()
+    for name, duration in durations.items():
+        if duration is not None:
+            env[name] = {'status': TaskStatus.WAITING, 'start_clock': 0.,
+                         'end_clock': duration}
+    graph = DepGraph.from_dependency_dictionary({task: [] for task in tasks})
+    backend = QueueScheduling(n_workers=1, default_duration=3.)
+    env = Scheduler(hard_graph=graph, backend=backend).schedule(env=env)
+    order = sorted(durations, key=lambda name: env[name]['start_clock'])
+    assert order == ['long', 'medium', 'unknown', 'short']
+
+
+class ResourceTask(DelayTask):
+    '''A :class:`~.DelayTask` that records the peak usage of resources.'''
+
+    def __init__(self, name, delay, usage, *, resources):
+        super().__init__(name, delay, resources=resources)
+        self.usage = usage
+
+    def do(self, env, config):
+        with self.usage['lock']:
+            for key, amount in self.resources.items():
+                self.usage[key] = self.usage.get(key, 0) + amount
+                peak = max(self.usage.get('peak_' + key, 0), self.usage[key])
+                self.usage['peak_' + key] = peak
+        result = super().do(env, config)
+        with self.usage['lock']:
+            for key, amount in self.resources.items():
+                self.usage[key] -= amount
+        return result
+
+
+@settings(max_examples=10, deadline=None)
+@given(cores=lists(integers(min_value=0, max_value=6), min_size=1,
+                   max_size=15),
+       licences=lists(integers(min_value=0, max_value=1), min_size=15,
+                      max_size=15),
+       dep_frac=floats(min_value=0., max_value=0.3),
+       sampler=data())
+def test_capacity_respected(cores, licences, dep_frac, sampler):
+    '''Test that the running tasks never use more resources than the
+    capacity, and that all of them are eventually executed.'''
+    from threading import Lock
+    usage = {'lock': Lock()}
+    tasks = [ResourceTask(f't{i}', 1e-3, usage,
+                          resources={'cores': n_cores, 'licences': n_lic})
+             for i, (n_cores, n_lic) in enumerate(zip(cores, licences))]
+    deps = {}
+    for i, task in enumerate(tasks):
+        deps[task] = [other for other in tasks[:i]
+                      if sampler.draw(floats(0., 1.)) < dep_frac]
+    graph = DepGraph.from_dependency_dictionary(deps)
+    capacity = {'cores': 4, 'licences': 1}
+    backend = QueueScheduling(n_workers=8, capacity=capacity)
+    env = Scheduler(hard_graph=graph, backend=backend).schedule()
+    assert all(env.is_done(task) for task in tasks)
+    # oversized tasks are run alone
+    max_cores = max(max(cores), capacity['cores'])
+    assert usage.get('peak_cores', 0) <= max_cores
+    if max(cores) <= capacity['cores']:
+        assert usage.get('peak_cores', 0) <= capacity['cores']
+    assert usage.get('peak_licences', 0) <= capacity['licences']
+
+
+def test_capacity_requires_event_driven():
+    '''Test that the resource-aware mode requires the event-driven
+    mode.'''
+    with pytest.raises(ValueError):
+        QueueScheduling(event_driven=False, capacity={'cores': 4})
+
+
+######################################
+#  tests for the process backend     #
+######################################
+
+def add_results(name, *names, env):
+    '''Add up the results of the given tasks.'''
+    result = 1 + sum(env[dep]['result'] for dep in names)
+    return {name: {'result': result}}, TaskStatus.DONE
+
+
+def raise_error():
+    '''Raise an exception.'''
+    raise ValueError('spam')
+
+
+def test_process_scheduling():
+    '''Test that the process backend executes the tasks in worker processes
+    and merges their results in the environment.'''
+    names = ['t0', 't1', 't2', 't3']
+    deps = {}
+    tasks = []
+    for i, name in enumerate(names):
+        task = PythonTask(name, add_results, args=(name, *names[:i]),
+                          env_kwarg='env')
+        deps[task] = list(tasks)
+        tasks.append(task)
+    graph = DepGraph.from_dependency_dictionary(deps)
+    scheduler = Scheduler(hard_graph=graph,
+                          backend=ProcessScheduling(n_workers=2))
+    env = scheduler.schedule()
+    assert [env[name]['result'] for name in names] == [1, 2, 4, 8]
+    assert all(env.is_done(task) for task in tasks)
+
+
+def test_process_scheduling_failures():
+    '''Test that unpicklable or failing tasks fail without affecting the
+    other tasks.'''
+    from threading import Lock
+    lock = Lock()
+    unpicklable = PythonTask('unpicklable', lambda: lock)
+    failing = PythonTask('failing', raise_error)
+    good = PythonTask('good', add_results, args=('good',), env_kwarg='env')
+    graph = DepGraph.from_dependency_dictionary(
+        {unpicklable: [], failing: [], good: []})
+    scheduler = Scheduler(hard_graph=graph,
+                          backend=ProcessScheduling(n_workers=2))
+    env = scheduler.schedule()
+    assert env.is_failed(unpicklable)
+    assert 'cannot be pickled' in env['unpicklable']['why']
+    assert env.is_failed(failing)
+    assert env.is_done(good)
+    assert env['good']['result'] == 1
+
+
+def crash_worker():
+    '''Kill the current process abruptly.'''
+    os._exit(1)  # pylint: disable=protected-access
+
+
+def test_process_scheduling_broken_pool():
+    '''Test that a task killing its worker process fails and that the process
+    pool is restarted for the other tasks.'''
+    crashing = PythonTask('crashing', crash_worker)
+    good = PythonTask('good', add_results, args=('good',), env_kwarg='env')
+    graph = DepGraph.from_dependency_dictionary({crashing: [], good: []})
+    soft_graph = DepGraph.from_dependency_dictionary({good: [crashing]})
+    scheduler = Scheduler(hard_graph=graph, soft_graph=soft_graph,
+                          backend=ProcessScheduling(n_workers=2))
+    env = scheduler.schedule()
+    assert env.is_failed(crashing)
+    assert 'died' in env['crashing']['why']
+    assert env.is_done(good)
+    assert env['good']['result'] == 1
+
+
+def test_process_scheduling_hybrid():
+    '''Test that the hybrid mode keeps :class:`~.RunTask` objects in the
+    master process.'''
+    run_task = RunTask.from_cli('run', ['true'])
+    py_task = PythonTask('py', raise_error)
+    assert not ProcessScheduling(hybrid=True).in_process(run_task)
+    assert ProcessScheduling(hybrid=True).in_process(py_task)
+    assert ProcessScheduling(hybrid=False).in_process(run_task)
+
+
 ########################################
 #  tests that should raise exceptions  #
 ########################################
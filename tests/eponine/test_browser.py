@@ -43,8 +43,10 @@ from hypothesis.strategies import (integers, lists, composite, text, booleans,
                                    sampled_from)
 
 from valjean.cosette.env import Env
-from valjean.eponine.browser import (Index, Browser, TooManyItemsBrowserError,
-                                     NoItemBrowserError)
+from valjean.eponine.index import Index, ArrayIndex
+from valjean.eponine.browser import (Browser, BrowserView,
+                                     TooManyItemsBrowserError,
+                                     NoItemBrowserError, SelectionBrowserError)
 from ..context import valjean  # pylint: disable=unused-import
 from ..conftest import CaptureLog
 
@@ -225,6 +227,148 @@ def test_selection(sampler):
                     in caplog)
 
 
+def index_as_dict(index):
+    '''Convert an index to a plain dictionary of sets.'''
+    return {key: dict(values.items()) for key, values in index.items()}
+
+
+@settings(suppress_health_check=(HealthCheck.too_slow,))
+@given(sampler=data())
+def test_array_index(sampler):
+    '''Test that the :class:`~.ArrayIndex` backend gives the same index and
+    the same selections as the default :class:`~.Index` one.'''
+    # pylint: disable=protected-access
+    iteml = sampler.draw(items_lists())
+    set_br = Browser(iteml)
+    arr_br = Browser(iteml, index_backend='array')
+    assert isinstance(arr_br.index, ArrayIndex)
+    assert index_as_dict(arr_br.index) == index_as_dict(set_br.index)
+    for key in set_br.keys():
+        for val in set_br.available_values(key):
+            sel = {key: val}
+            other_key = sampler.draw(sampled_from(sorted(set_br.keys())))
+            other_val = sampler.draw(sampled_from(
+                set_br.available_values(other_key)))
+            for crit in (sel, {**sel, other_key: other_val}):
+                ids = set_br._filter_items_id_by(**crit)
+                assert arr_br._filter_items_id_by(**crit) == ids
+                assert (index_as_dict(arr_br.index.keep_only(ids))
+                        == index_as_dict(set_br.index.keep_only(ids)))
+                assert arr_br.filter_by(**crit) == set_br.filter_by(**crit)
+    with pytest.raises(ValueError):
+        Browser(iteml, index_backend='btree')
+
+
+@settings(suppress_health_check=(HealthCheck.too_slow,))
+@given(sampler=data(), backend=sampled_from(['set', 'array']))
+def test_select_many(sampler, backend):
+    '''Test that :meth:`~.Browser.select_many` and
+    :meth:`~.Browser.filter_many` give the same results as the corresponding
+    calls to :meth:`~.Browser.select_by` and :meth:`~.Browser.filter_by`.'''
+    choices = {'menu': [1, 2, 3, 4],
+               'drink': ['beer', 'coffee', 'tea', 'wine'],
+               'ingredient': [('spam', 'egg'), 'spam']}
+    _, fmdr = sampler.draw(fixed_metadata_items(choices))
+    browser = Browser(fmdr, index_backend=backend)
+    queries = sampler.draw(lists(
+        dictionaries(keys=sampled_from(sorted(choices)),
+                     values=sampled_from([1, 2, 4, 'beer', 'wine', 'spam'])),
+        max_size=10))
+    queries.append({'dessert': 1})
+    for query, sbr in zip(queries, browser.filter_many(queries)):
+        assert sbr == browser.filter_by(**query)
+    items = browser.select_many(queries, errors='return')
+    for iquery, (query, item) in enumerate(zip(queries, items)):
+        try:
+            assert item == browser.select_by(**query)
+        except (NoItemBrowserError, TooManyItemsBrowserError) as err:
+            assert isinstance(item, type(err))
+            with pytest.raises(SelectionBrowserError) as sel_err:
+                browser.select_many(queries)
+            assert iquery in sel_err.value.errors
+
+
+def strip_index_key(items):
+    '''Remove the ``'index'`` metadata from a list of items.'''
+    return [{k: v for k, v in item.items() if k != 'index'} for item in items]
+
+
+@settings(suppress_health_check=(HealthCheck.too_slow,))
+@given(sampler=data(), backend=sampled_from(['set', 'array']))
+def test_browser_view(sampler, backend):
+    '''Test that selections on :class:`~.BrowserView` give the same items as
+    the selections on :class:`~.Browser`, without copying them.'''
+    choices = {'menu': [1, 2, 3, 4],
+               'drink': ['beer', 'coffee', 'tea', 'wine'],
+               'ingredient': [('spam', 'egg'), 'spam']}
+    _, fmdr = sampler.draw(fixed_metadata_items(choices))
+    browser = Browser(fmdr, index_backend=backend)
+    query1, query2 = sampler.draw(lists(
+        dictionaries(keys=sampled_from(sorted(choices)),
+                     values=sampled_from([1, 2, 4, 'beer', 'wine', 'spam'])),
+        min_size=2, max_size=2))
+    view = browser.filter_view(**query1)
+    sbr = browser.filter_by(**query1)
+    assert isinstance(view, BrowserView)
+    assert len(view) == len(sbr)
+    assert strip_index_key(view.content) == strip_index_key(sbr.content)
+    assert all(item is browser.content[iid]
+               for iid, item in zip(view.ids, view.content))
+    assert sorted(view.keys()) == sorted(sbr.keys())
+    sview = view.filter_by(**query2)
+    ssbr = sbr.filter_by(**query2)
+    assert isinstance(sview, BrowserView)
+    assert sview.browser is browser
+    assert strip_index_key(sview.content) == strip_index_key(ssbr.content)
+    try:
+        item = ssbr.select_by(**query2)
+    except (NoItemBrowserError, TooManyItemsBrowserError) as err:
+        with pytest.raises(type(err)):
+            sview.select_by(**query2)
+    else:
+        assert strip_index_key([sview.select_by(**query2)]) == \
+            strip_index_key([item])
+    views = view.filter_many([query1, query2])
+    assert [vw.ids for vw in views] == [view.ids, sview.ids]
+    view2 = browser.filter_view(**query2)
+    mview = view.merge(view2)
+    assert isinstance(mview, BrowserView)
+    assert mview.ids == sorted(set(view.ids) | set(view2.ids))
+    assert mview.merge(view2).ids == mview.ids
+    assert mview.to_browser() == Browser(mview.content)
+
+
+@settings(suppress_health_check=(HealthCheck.too_slow,))
+@given(itemls=lists(items_lists(), min_size=1, max_size=4),
+       backends=lists(sampled_from(['set', 'array']), min_size=4,
+                      max_size=4))
+def test_browser_concat(itemls, backends):
+    '''Test that :meth:`~.Browser.concat` and :meth:`~.Browser.extend` give
+    the same browser as the one built from the concatenated items.'''
+    browsers = [Browser(iteml, index_backend=backend)
+                for iteml, backend in zip(itemls, backends)]
+    ref = Browser([item for iteml in itemls for item in iteml],
+                  index_backend=backends[0])
+    cbr = Browser.concat(browsers)
+    assert cbr == ref
+    assert cbr.index_backend == backends[0]
+    assert index_as_dict(cbr.index) == index_as_dict(ref.index)
+    ebr = Browser(itemls[0], index_backend=backends[0])
+    for browser in browsers[1:]:
+        ebr.extend(browser)
+    assert ebr == ref
+    assert index_as_dict(ebr.index) == index_as_dict(ref.index)
+    with pytest.raises(TypeError):
+        browsers[0].filter_view().extend(browsers[0])
+    sbr = Browser(itemls[0], index_backend=backends[0])
+    sbr.extend(sbr)
+    ref = Browser(itemls[0] + itemls[0], index_backend=backends[0])
+    assert sbr == ref
+    assert index_as_dict(sbr.index) == index_as_dict(ref.index)
+    with pytest.raises(ValueError):
+        sbr.index.extend([sbr.index], [len(sbr)])
+
+
 @composite
 def indexes(draw):
     '''Strategy for generating index.
@@ -276,7 +420,7 @@ def test_strip_index(sampler):
 
     The first step is the removal of these empty sets (and associated
     keys) from the index. If some are present, the
-    :func:`keep_only <valjean.eponine.browser.Index.keep_only>` is used to
+    :func:`keep_only <valjean.eponine.index.Index.keep_only>` is used to
     remove them, rerun the :func:`empty_sets_and_ids` allows to check that no
     empty sets subsists.
 
@@ -672,6 +672,27 @@ def test_parse_spectrum_roundtrip(array_bins, units):
                 assert np.allclose(larray['integrated'][:][key], int_res[key])
 
 
+def test_spectrum_table_fast_path():
+    '''Check that regular spectrum tables are converted at once in a
+    :obj:`numpy.ndarray` and that irregular ones fall back on the token by
+    token parsing, with the same result.
+    '''
+    header = ("\t SPECTRUM RESULTS\n"
+              "\t number of first discarded batches : 0\n\n"
+              "\t group (MeV) \t\t score   \t sigma_% \t score/lethargy\n\n")
+    rows = ["2.000000e+01 - 1.000000e+00\t1.0e+00\t2.0e+01\t3.0e-01\n",
+            "1.000000e+00 - 1.000000e-11\t4.0e+00\t5.0e+01\t6.0e-01\n"]
+    fast = pygram.spectrumblock.parse_string(header + ''.join(rows) + "\n")
+    fast_vals = fast[0][0]['spectrum_vals']
+    assert isinstance(fast_vals, np.ndarray)
+    assert fast_vals.shape == (2, 5)
+    rows[1] = rows[1].replace(' - ', '-')
+    slow = pygram.spectrumblock.parse_string(header + ''.join(rows) + "\n")
+    slow_vals = slow[0][0]['spectrum_vals']
+    assert not isinstance(slow_vals, np.ndarray)
+    assert np.array_equal(fast_vals, np.array(slow_vals.as_list()))
+
+
 def gb_step_str(istep, sebins):
     '''Print the Tripoli-4 output for Green bands steps (source steps in
     energy).
@@ -42,7 +42,8 @@ from ...context import valjean  # pylint: disable=unused-import
 import numpy as np
 import logging
 from valjean.eponine.dataset import Dataset
-from valjean.eponine.tripoli4.parse import Parser
+from valjean.eponine.tripoli4.parse import Parser, parse_many
+from valjean.eponine.tripoli4.scan import Scanner
 from valjean.eponine.tripoli4.parse_debug import ParserDebug
 import valjean.eponine.tripoli4.data_convertor as dcv
 
@@ -352,6 +353,10 @@ def test_debug_entropy(caplog, datadir):
             assert len(lines) == 124
             assert "RESULTS ARE GIVEN FOR SOURCE INTENSITY" in lines[0]
             assert "number of batches used" in lines[-1]
+        sel_res = t4p.parse_from_index(-1, response_function='REACTION')
+        assert len(sel_res.res['list_responses']) == 1
+        sel_res = t4p.parse_from_index(-1, response_function='FLUX')
+        assert not sel_res.res['list_responses']
 
 
 def check_last_entropy_result(lastres):
@@ -895,3 +900,113 @@ def test_spherical_harmonics(datadir):
     # bin ids : u=0, v=0, e=0 (1 bin in w and ie), l=2, m=-1
     af_l2mm1 = ang_flux['results']['score'][:1, :1, :, :, :1, 2:, 1:2]
     assert np.isclose(af_l2mm1.squeeze().error, 62.1*0.01*1.088e-3)
+
+
+def test_mmap_scan(datadir):
+    '''Check that the memory-mapped scan gives the same results as the default
+    one, including the photon-electron-positron balances and the homogenized
+    material dumps.
+    '''
+    for fname in ('gauss_E_time_mu_phi.res.ceav5',
+                  'ELECTRON_PHOTON_BALANCE.d.res.ceav5',
+                  'angle.d.res.ceav5',
+                  'ttsSimplePacket20.d.PARA.res.ceav5'):
+        sres = Scanner(str(datadir/fname))
+        mres = Scanner(str(datadir/fname), use_mmap=True)
+        assert list(mres) == list(sres)
+        assert all(mres[bnum] == sres[bnum] for bnum in sres)
+        assert dict(mres.phemep_balance) == dict(sres.phemep_balance)
+        assert dict(mres.homog_mat) == dict(sres.homog_mat)
+        assert mres.times == sres.times
+        assert mres.last_generator_state == sres.last_generator_state
+        assert mres.global_variables(mres.batch_number(-1)) \
+            == sres.global_variables(sres.batch_number(-1))
+    t4p = Parser(str(datadir/"angle.d.res.ceav5"), use_mmap=True)
+    t4res = t4p.parse_from_index(batch_index=-1).to_browser()
+    assert len(t4res) == 17
+
+
+def test_scan_index(datadir, monkeypatch):
+    '''Check that the scan index is written, then reused as long as the listing
+    does not change, and rebuilt when it changes.
+    '''
+    fname = str(datadir/'gauss_E_time_mu_phi.res.ceav5')
+    sres = Scanner(fname)
+    ires = Scanner(fname, use_index=True)
+    assert not ires.from_index
+    assert (datadir/'gauss_E_time_mu_phi.res.ceav5.scanidx').exists()
+
+    def no_scan(_self):
+        raise AssertionError('listing should not be scanned')
+    with monkeypatch.context() as mpatch:
+        mpatch.setattr(Scanner, '_get_collres', no_scan)
+        ires = Scanner(fname, use_index=True)
+    assert ires.from_index
+    assert list(ires) == list(sres)
+    assert all(ires[bnum] == sres[bnum] for bnum in sres)
+    assert ires.times == sres.times
+    assert ires.batches == sres.batches
+    assert ires.last_generator_state == sres.last_generator_state
+    assert (ires.countwarnings, ires.counterrors) \
+        == (sres.countwarnings, sres.counterrors)
+    # a different end flag cannot reuse the index
+    assert not Scanner(fname, 'ENERGY INTEGRATED', use_index=True).from_index
+    # modified listing: index rebuilt
+    with open(fname, 'a', encoding='utf-8') as fout:
+        fout.write('\n')
+    ires = Scanner(fname, use_index=True)
+    assert not ires.from_index
+    assert Scanner(fname, use_index=True).from_index
+
+
+def test_parallel_parsing(datadir):
+    '''Check that parsing batches or listings in a pool of processes gives the
+    same results as the serial parsing.
+    '''
+    t4p = Parser(str(datadir/"gauss_E_time_mu_phi.res.ceav5"))
+    pres = t4p.parse_batches(t4p.batch_numbers(), n_workers=2)
+    assert len(pres) == 2
+    for bnum, bres in zip(t4p.batch_numbers(), pres):
+        sres = t4p.parse_from_number(bnum)
+        assert bres.res['batch_data'] == sres.res['batch_data']
+        assert len(bres.to_browser()) == len(sres.to_browser())
+        bscore = bres.to_browser().select_by(score_name='courant_Etmuphi')
+        sscore = sres.to_browser().select_by(score_name='courant_Etmuphi')
+        assert np.array_equal(bscore['results']['score'].value,
+                              sscore['results']['score'].value)
+    fnames = [str(datadir/"angle.d.res.ceav5"),
+              str(datadir/"ELECTRON_PHOTON_BALANCE.d.res.ceav5")]
+    pres = parse_many(fnames, n_workers=2, use_mmap=True)
+    assert [len(res.to_browser()) for res in pres] == [17, 4]
+    assert [res.res['run_data']['t4_file'] for res in pres] == fnames
+
+
+def test_iter_responses(datadir):
+    '''Check that responses yielded one by one, with or without selection,
+    are the ones from the complete parsing, with the same indices.
+    '''
+    def metadata(resps):
+        return [{k: v for k, v in resp.items()
+                 if k not in ('results', 'index')}
+                for resp in resps]
+
+    t4p = Parser(str(datadir/"pertu_covariances.d.res.ceav5"))
+    bnum = t4p.batch_numbers()[-1]
+    pres = t4p.parse_from_number(bnum)
+    full = pres.res['list_responses'] + pres.res['perturbation']
+    resps = list(t4p.iter_responses(bnum))
+    assert metadata(resps) == metadata(full)
+    assert resps[-1]['results'].keys() == full[-1]['results'].keys()
+    sel = {'response_index': full[-1]['response_index'],
+           'perturbation_index': full[-1]['perturbation_index']}
+    resps = list(t4p.iter_responses(bnum, **sel))
+    assert metadata(resps) == metadata(full[-1:])
+    assert not list(t4p.iter_responses(bnum, response_function='KEFFS'))
+    t4p = Parser(str(datadir/"pincell.res.ceav5"))
+    pres = t4p.parse_from_index()
+    resps = list(t4p.iter_responses(t4p.batch_numbers()[-1],
+                                    response_function='KEFFS'))
+    assert len(resps) == 7
+    assert metadata(resps) == metadata(
+        [resp for resp in pres.res['list_responses']
+         if resp['response_function'] == 'KEFFS'])
@@ -39,14 +39,14 @@ from valjean.cosette.pythontask import PythonTask
 from valjean.eponine.tripoli4.use import make_parser, parse_batch_index
 
 
-def parse_task(datafile, batch_index=-1):
+def parse_task(datafile, batch_index=-1, **selectors):
     '''Create a :class:`~.PythonTask` that parses the given Tripoli-4 output
     file.'''
     task_name = 'parse_task'
 
     def parse_batch_task(datafile):
         env_up = {task_name: {'result': parse_batch_index(
-            make_parser(datafile), batch_index=batch_index)}}
+            make_parser(datafile), batch_index=batch_index, **selectors)}}
         return env_up, TaskStatus.DONE
     return PythonTask('parse_task', parse_batch_task,
                       args=[str(datafile)])
@@ -102,3 +102,19 @@ def test_parse_t4_first_batch_task(datafile):
     pres = env_task['result'].res
     assert (pres['batch_data']['batch_number']
             <= pres['run_data']['required_batches'])
+
+
+def test_parse_t4_selection_task(datadir):
+    '''Test a parsing task restricted to a selection of responses.'''
+    datafile = str(datadir/"pu_met_fast_001_decompose_list_small.d.res.ceav5")
+    task = parse_task(datafile, response_function='FLUX',
+                      scoring_mode='SCORE_COLL')
+    env_up, status = task.do(env={}, config=None)
+    assert status == TaskStatus.DONE
+    browser = env_up[task.name]['result'].to_browser()
+    full_browser = parse_batch_index(make_parser(datafile)).to_browser()
+    sel_browser = full_browser.filter_by(response_function='FLUX',
+                                         scoring_mode='SCORE_COLL')
+    assert len(browser) == len(sel_browser) > 0
+    assert (browser.available_values('response_index')
+            == sel_browser.available_values('response_index'))
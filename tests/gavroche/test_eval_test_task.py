@@ -30,13 +30,24 @@
 
 '''Tests for the :mod:`~.eval_test_task` module.'''
 
+import logging
+import os
+import numpy as np
 import pytest
 
 # pylint: disable=wrong-import-order,no-value-for-parameter
 from ..context import valjean  # pylint: disable=unused-import
 from valjean.cosette.task import TaskStatus
-from valjean.gavroche.test import TestResult
-from valjean.gavroche.eval_test_task import EvalTestTask
+from valjean.fingerprint import fingerprint
+from valjean.eponine.dataset import Dataset
+from valjean.gavroche.test import TestResult, TestResultFailed
+from valjean.gavroche.stat_tests.student import TestStudent
+from valjean.gavroche.eval_test_task import (EvalTestTask,
+                                             evaluate_tests_cached,
+                                             evaluate_tests_sharded)
+from valjean.cambronne.commands.run import RunCommand
+from valjean.gavroche.diagnostics.stats import TestStatsTasks
+from valjean.gavroche.result_cache import ResultCache
 
 
 def test_valid_test_eval(valid_tests, config_tmp):
@@ -61,3 +72,117 @@ def test_wrong_type_fails(invalid_tests, config_tmp):
     env = {'test_task': {'result': invalid_tests}}
     with pytest.raises(TypeError):
         eval_test_task.do(env=env, config=config_tmp)
+
+
+def test_sharded_test_eval(valid_tests, config_tmp):
+    '''Test that :class:`~.EvalTestTask` gives the same results, in the same
+    order, when the tests are evaluated in a pool of processes.'''
+    failing = TestStudent(Dataset(1., 0.1), Dataset(np.array([1., 2.]),
+                                                    np.array([0.1, 0.1])),
+                          name='wrong shape')
+    tests = valid_tests + [failing] + valid_tests
+    env = {'test_task': {'result': tests}}
+    serial = EvalTestTask('eval(test_task)', 'test_task')
+    sharded = EvalTestTask('eval(test_task)', 'test_task', n_workers=2,
+                           chunksize=1)
+    serial_res = serial.do(env=env, config=config_tmp)[0]['eval(test_task)']
+    sharded_res = sharded.do(env=env, config=config_tmp)[0]['eval(test_task)']
+    assert len(sharded_res['result']) == len(tests)
+    for sres, res in zip(serial_res['result'], sharded_res['result']):
+        assert type(sres) is type(res)
+        assert sres.test.name == res.test.name
+        assert bool(sres) == bool(res)
+    assert isinstance(sharded_res['result'][len(valid_tests)],
+                      TestResultFailed)
+    # results evaluated in the workers are bound to the original tests
+    for res, test in zip(evaluate_tests_sharded(tests, n_workers=2,
+                                                chunksize=1), tests):
+        assert res.test is test
+        if hasattr(res, 'first_test_res'):
+            assert res.first_test_res.test is test.test
+
+
+def test_cached_test_eval(valid_tests, config_tmp, caplog):
+    '''Test that :class:`~.EvalTestTask` stores the test results in the cache
+    and reuses them, unless the cache is disabled.'''
+    eval_test_task = EvalTestTask('eval(test_task)', 'test_task')
+    env = {'test_task': {'result': valid_tests}}
+    first = eval_test_task.do(env=env, config=config_tmp)[0]
+    cache = ResultCache.from_config(config_tmp)
+    assert len(cache.entries()) == len({fingerprint(test)
+                                        for test in valid_tests})
+    with caplog.at_level(logging.DEBUG, logger='valjean'):
+        second = eval_test_task.do(env=env, config=config_tmp)[0]
+    assert f'{len(valid_tests)} results found in the cache' in caplog.text
+    for res1, res2, test in zip(first['eval(test_task)']['result'],
+                                second['eval(test_task)']['result'],
+                                valid_tests):
+        assert type(res1) is type(res2)
+        assert bool(res1) == bool(res2)
+        assert res2.test is test
+        if hasattr(res2, 'first_test_res'):
+            assert res2.first_test_res.test is test.test
+
+    config_tmp['args'] = {'result_cache': False}
+    assert ResultCache.from_config(config_tmp) is None
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger='valjean'):
+        eval_test_task.do(env=env, config=config_tmp)
+    assert 'found in the cache' not in caplog.text
+
+
+def test_uncacheable_test_eval(config_tmp):
+    '''Test that the results of tests that are not cacheable (whose
+    fingerprint does not represent all their inputs) are not reused.'''
+    eval_test_task = EvalTestTask('eval(test_task)', 'test_task')
+    results = []
+    for status in (TaskStatus.DONE, TaskStatus.FAILED):
+        test = TestStatsTasks(name='stats',
+                              task_results=[('task', {'status': status})])
+        env = {'test_task': {'result': [test]}}
+        env_up = eval_test_task.do(env=env, config=config_tmp)[0]
+        results.append(env_up['eval(test_task)']['result'][0])
+    assert [bool(res) for res in results] == [True, False]
+    assert not ResultCache.from_config(config_tmp).entries()
+
+
+def test_result_cache_eviction(valid_tests, tmp_path):
+    '''Test that the least recently used results are evicted from the
+    :class:`~.ResultCache`.'''
+    cache = ResultCache(tmp_path / 'cache')
+    tests = {fingerprint(test): test for test in valid_tests}
+    for itest, (fpr, test) in enumerate(tests.items()):
+        cache.put(test, test.evaluate())
+        os.utime(cache.path(fpr), (itest, itest))
+    fprs = list(tests)
+    os.utime(cache.path(fprs[0]), (len(fprs), len(fprs)))
+    cache.max_entries = 1
+    assert cache.evict() == len(fprs) - 1
+    assert cache.get(tests[fprs[0]]) is not None
+    assert all(cache.get(tests[fpr]) is None for fpr in fprs[1:])
+    cache.max_entries, cache.max_size = None, 0
+    assert cache.evict() == 1
+    assert not cache.entries()
+
+
+def test_result_cache_pruned_once(valid_tests, config_tmp):
+    '''Test that the cache is not pruned by each evaluation, but once at the
+    end of the run.'''
+    config_tmp['args'] = {'result_cache_size': 0}
+    cache = ResultCache.from_config(config_tmp)
+    assert cache.max_size == 0
+    evaluate_tests_cached(valid_tests, cache)
+    assert cache.entries()
+    RunCommand.prune_result_cache(config_tmp)
+    assert not cache.entries()
+
+
+def test_result_cache_salt(valid_tests, tmp_path):
+    '''Test that results cached with another salt (another version of
+    :program:`valjean`) are not reused.'''
+    cache = ResultCache(tmp_path / 'cache')
+    for test in valid_tests:
+        cache.put(test, test.evaluate())
+    other_cache = ResultCache(tmp_path / 'cache', salt='other')
+    assert all(other_cache.get(test) is None for test in valid_tests)
+    assert all(cache.get(test) is not None for test in valid_tests)
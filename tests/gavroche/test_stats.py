@@ -39,6 +39,8 @@ from valjean.fingerprint import fingerprint
 from valjean.eponine.dataset import Dataset
 from valjean.gavroche.stat_tests.chi2 import TestChi2
 from valjean.gavroche.stat_tests.student import TestStudent
+from valjean.gavroche.test import TestResultFailed
+from valjean.gavroche.eval_test_task import evaluate_tests_batched
 
 
 def test_student(student_test_result):
@@ -207,3 +209,51 @@ def test_chi2_pvalue_1(some_scalar_dataset):
     tres = test.evaluate()
     assert bool(tres)
     assert np.isclose(tres.pvalue, 1.0)
+
+
+def test_evaluate_tests_batched():
+    '''Test that batched evaluation of Student and χ² tests gives the same
+    results as their individual evaluation, including special cases and
+    failing tests.'''
+    rng = np.random.default_rng(42)
+    dsets = [Dataset(rng.normal(5., 0.2, 4), rng.uniform(0.1, 0.3, 4))
+             for _ in range(5)]
+    dsets.append(Dataset(np.array([1.2, 0, np.nan, 5.1]),
+                         np.array([0., 0.1, np.nan, np.nan])))
+    scalars = [Dataset(1.2, 0.2), Dataset(np.nan, np.nan),
+               Dataset(0.3, np.nan), Dataset(1.3, 0.1)]
+    tests = [TestStudent(dsets[0], *dsets[1:], name='arrays'),
+             TestStudent(dsets[1], dsets[2], ndf=20, name='ndf'),
+             TestStudent(scalars[0], *scalars, name='scalars'),
+             TestStudent(dsets[0], scalars[0], name='wrong shape'),
+             TestChi2(dsets[0], *dsets[1:5], name='chi2'),
+             TestChi2(dsets[0], dsets[5], ignore_empty=True, name='chi2 nan'),
+             TestChi2(scalars[0], scalars[3], name='chi2 scalar')]
+    results = evaluate_tests_batched(tests)
+    assert isinstance(results[3], TestResultFailed)
+    for test, res in zip(tests, results):
+        if isinstance(res, TestResultFailed):
+            continue
+        ref = test.evaluate()
+        assert type(res) is type(ref)
+        assert bool(res) == bool(ref)
+        if isinstance(test, TestStudent):
+            assert all(np.array_equal(val, rval, equal_nan=True)
+                       for val, rval in zip(res.tstud, ref.tstud))
+        else:
+            assert np.allclose(res.chi2, ref.chi2, equal_nan=True)
+        assert np.allclose(res.pvalue, ref.pvalue, equal_nan=True)
+
+
+def test_evaluate_tests_batched_fallback(monkeypatch, caplog):
+    '''Test that tests whose batch evaluation fails are evaluated one by one,
+    with a warning.'''
+    def broken_batch(_tests):
+        raise ValueError('broken batch')
+
+    monkeypatch.setattr(TestStudent, 'evaluate_batch', broken_batch)
+    tests = [TestStudent(Dataset(1.2, 0.2), Dataset(1.3, 0.1), name='ok'),
+             TestStudent(Dataset(1.2, 0.2), Dataset(9.3, 0.1), name='ko')]
+    results = evaluate_tests_batched(tests)
+    assert 'broken batch' in caplog.text
+    assert [bool(res) for res in results] == [True, False]
@@ -37,7 +37,7 @@ import numpy as np
 from hypothesis import given, note, settings, HealthCheck
 
 from ..context import valjean  # pylint: disable=unused-import
-from valjean.fingerprint import fingerprint
+from valjean.fingerprint import fingerprint, memoized_fingerprints
 from valjean.eponine.dataset import Dataset
 from valjean.gavroche import test
 
@@ -165,3 +165,41 @@ def test_fingerprint(valid_tests):
         fgpr = fingerprint(valid_test)
         all_fingerprints.add(fgpr)
     assert len(all_fingerprints) == len(valid_tests)
+
+
+def test_memoized_fingerprint(valid_tests):
+    '''Test that memoized fingerprints and BLAKE2b fingerprints are consistent
+    with the plain ones.'''
+    fingerprints = [fingerprint(valid_test) for valid_test in valid_tests]
+    with memoized_fingerprints():
+        assert [fingerprint(valid_test)
+                for valid_test in valid_tests] == fingerprints
+        assert [fingerprint(valid_test)
+                for valid_test in valid_tests] == fingerprints
+    blake = {fingerprint(valid_test, algorithm='blake2b', digest_size=20)
+             for valid_test in valid_tests}
+    assert len(blake) == len(set(fingerprints))
+    assert all(len(fpr) == 40 for fpr in blake)
+    with pytest.raises(ValueError):
+        fingerprint(valid_tests[0], algorithm='md5')
+
+
+def test_fingerprint_children_algorithm(valid_tests, monkeypatch):
+    '''Test that the datasets of a test are hashed with the algorithm of the
+    fingerprint of the test.'''
+    hashed = []
+    dataset_data = Dataset.data
+
+    def data(self):
+        hashed.append(self)
+        yield from dataset_data(self)
+
+    monkeypatch.setattr(Dataset, 'data', data)
+    with memoized_fingerprints():
+        for valid_test in valid_tests:
+            fingerprint(valid_test, algorithm='blake2b', digest_size=20)
+        n_hashed = len(hashed)
+        assert n_hashed > 0
+        for dataset in list(hashed):
+            fingerprint(dataset, algorithm='blake2b', digest_size=20)
+        assert len(hashed) == n_hashed
@@ -81,7 +81,7 @@ def test_valjean_logger(caplog, log_level, report, rst_full, tmpdir):
         assert ("Will adapt range for 3 bins, binning might be not "
                 "suitable" in caplog.text)
         assert "writing tree_path" in caplog.text
-    assert all(rec.module in ("plot_repr", "rst")
+    assert all(rec.module in ("plot_repr", "rst", "rst_writer")
                for rec in caplog.records if rec.levelno == logging.NOTE)
 
 
@@ -97,7 +97,7 @@ def test_module_logger(caplog, log_level, report, rst_full, tmpdir):
     assert len(other_recs) == 1
     assert "writing 4 plots in sequential mode" in caplog.text
     assert all(rec.levelno == logging.INFO for rec in other_recs)
-    assert all(rec.module in ("rst",) for rec in other_recs)
+    assert all(rec.module in ("rst", "rst_writer") for rec in other_recs)
     if log_level > logging.NOTE:
         assert len(plot_repr_recs) == 0
     elif log_level == logging.NOTE:
@@ -181,10 +181,12 @@ def test_javert_logs(caplog, log_level, datadir, tmpdir, rst_full):
         assert len(javert_recs) == 0
     elif log_level == logging.INFO:
         assert len(javert_recs) == 1
-        assert all(rec.module in ('rst',) for rec in javert_recs)
+        assert all(rec.module in ('rst', 'rst_writer')
+                   for rec in javert_recs)
     elif log_level == logging.NOTE:
         assert len(javert_recs) == 2
-        assert all(rec.module in ('rst',) for rec in javert_recs)
+        assert all(rec.module in ('rst', 'rst_writer')
+                   for rec in javert_recs)
     else:
         assert len(javert_recs) > 40
         assert all(rec.levelno in (logging.INFO, logging.NOTE, logging.DEBUG)
@@ -204,7 +206,7 @@ def test_custom_epjav1(caplog, datadir, rst_full, tmpdir):
     assert len([rec for rec in caplog.records if "eponine" in rec.name]) == 0
     assert all(rec.levelno == logging.DEBUG for rec in caplog.records
                if rec.module == "plot_repr")
-    assert "rst" in [rec.module for rec in caplog.records]
+    assert "rst_writer" in [rec.module for rec in caplog.records]
     assert set(rec.levelno for rec in caplog.records) == {logging.INFO,
                                                           logging.DEBUG}
 
@@ -222,6 +224,7 @@ def test_custom_epjav2(caplog, datadir, rst_full, tmpdir):
     assert len([rec for rec in caplog.records if "javert" in rec.name]) == 0
     assert all(rec.levelno == logging.DEBUG for rec in caplog.records
                if rec.module == "common")
-    assert "rst" not in [rec.module for rec in caplog.records]
+    assert not {"rst", "rst_writer"}.intersection(
+        rec.module for rec in caplog.records)
     assert set(rec.levelno for rec in caplog.records) == {logging.INFO,
                                                           logging.DEBUG}
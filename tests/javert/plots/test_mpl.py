@@ -53,7 +53,8 @@ from ...context import valjean  # pylint: disable=wrong-import-order
 from valjean import LOGGER
 from valjean.javert.templates import (PlotTemplate, join, TableTemplate,
                                       CurveElements, SubPlotElements)
-from valjean.javert.mpl import MplPlot, MplPlotException
+from valjean.javert.mpl import (MplPlot, MplPlotException, MplRenderer,
+                                MplRenderPool)
 from valjean.javert import plot_repr as pltr
 from valjean.javert.representation import PlotRepresenter
 from ..conftest import check_rst
@@ -930,3 +931,59 @@ def test_student_fplit_3ds(student_test_result_3ds, rfull_repr, rst_formatter,
     mplt = MplPlot([template for template in templ
                     if isinstance(template, PlotTemplate)][0])
     return mplt.draw()[0]
+
+
+def test_plot_renderer(student_test_result, plot_repr, tmp_path):
+    '''Test that plots drawn on reused figures are identical to plots drawn
+    on new figures, sequentially and in a pool of workers.'''
+    templates = plot_repr(student_test_result) * 2
+    for i, template in enumerate(templates):
+        MplPlot(template).save(str(tmp_path / f'fresh_{i}.png'))
+    with MplRenderer(max_figures=1) as renderer:
+        for i, template in enumerate(templates):
+            renderer.save(MplPlot(template), str(tmp_path / f'reused_{i}.png'))
+        assert len(renderer.figures) == 1
+    assert not renderer.figures
+    with MplRenderPool(2) as pool:
+        assert not pool.render([(MplPlot(template),
+                                 str(tmp_path / f'pool_{i}.png'))
+                                for i, template in enumerate(templates)])
+    assert not list(tmp_path.glob('*.tmp.png'))
+    for i in range(len(templates)):
+        fresh = (tmp_path / f'fresh_{i}.png').read_bytes()
+        assert (tmp_path / f'reused_{i}.png').read_bytes() == fresh
+        assert (tmp_path / f'pool_{i}.png').read_bytes() == fresh
+
+
+class _BrokenPlot:
+    '''A plot that cannot be drawn.'''
+
+    @staticmethod
+    def layout_key():
+        '''Layout of the plot.'''
+        return 'broken'
+
+    @staticmethod
+    def draw(_fig=None):
+        '''Fail to draw the plot.'''
+        raise MplPlotException('cannot draw this plot')
+
+
+def test_plot_renderer_failure(student_test_result, plot_repr, tmp_path):
+    '''Test that a plot that cannot be drawn does not prevent the other plots
+    from being saved, sequentially and in a pool of workers.'''
+    template, = plot_repr(student_test_result)[:1]
+    for mode in ('seq', 'pool'):
+        items = [(_BrokenPlot(), str(tmp_path / f'{mode}_broken.png')),
+                 (MplPlot(template), str(tmp_path / f'{mode}_ok.png'))]
+        if mode == 'seq':
+            with MplRenderer() as renderer:
+                failures = renderer.save_many(items)
+        else:
+            with MplRenderPool(2) as pool:
+                failures = pool.render(items)
+        assert len(failures) == 1
+        assert failures[0][0] == str(tmp_path / f'{mode}_broken.png')
+        assert 'cannot draw this plot' in failures[0][1]
+        assert (tmp_path / f'{mode}_ok.png').exists()
+        assert not (tmp_path / f'{mode}_broken.png').exists()
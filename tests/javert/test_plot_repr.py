@@ -31,14 +31,21 @@
 '''Tests for the :mod:`~valjean.javert.plot_repr` module.'''
 # pylint: disable=wrong-import-order
 
+from collections import OrderedDict
 import numpy as np
 from hypothesis import given
+from hypothesis.strategies import integers
 
 from ..eponine.conftest import finite
-from .conftest import ranges
+from .conftest import ranges, plot_repr  # pylint: disable=unused-import
 
 from ..context import valjean  # pylint: disable=unused-import
-from valjean.javert.plot_repr import pad_range
+from valjean.eponine.dataset import Dataset
+from valjean.gavroche.stat_tests.student import TestStudent
+from valjean.javert.templates import CurveElements
+from valjean.javert.plot_repr import (pad_range, downsample_1d,
+                                      downsample_2d, MAX_POINTS_1D,
+                                      MAX_BINS_2D)
 
 
 @given(limits=ranges())  # pylint: disable=no-value-for-parameter
@@ -86,3 +93,59 @@ def test_pad_range_wider_log(limits, padding):
     assert new_limits[1] >= limits[1]
     assert np.isclose(np.log(limits[0]) - np.log(new_limits[0]),
                       np.log(new_limits[1]) - np.log(limits[1]))
+
+
+@given(size=integers(3, 5000),  # pylint: disable=no-value-for-parameter
+       max_points=integers(2, 300), seed=integers(0, 2**32-1))
+def test_downsample_1d_envelope(size, max_points, seed):
+    '''Test that :func:`~.downsample_1d` respects the point budget and keeps
+    the error envelope of the curve.'''
+    rng = np.random.default_rng(seed)
+    values, errors = rng.normal(size=size), rng.uniform(size=size)
+    for bins in (np.arange(size + 1.), np.arange(size * 1.)):
+        curve = CurveElements(values=values, bins=[bins], legend='',
+                              errors=errors)
+        small = downsample_1d(curve, max_points=max_points)
+        assert small.values.size <= max(max_points, 2)
+        assert small.bins[0].size - small.values.size == bins.size - size
+        assert np.all(np.diff(small.bins[0]) >= 0)
+        assert np.max(small.values + small.errors) == np.max(values + errors)
+        assert np.min(small.values - small.errors) == np.min(values - errors)
+        if bins.size == size + 1:
+            assert small.bins[0][0] == bins[0]
+            assert small.bins[0][-1] == bins[-1]
+
+
+def test_downsample_2d_budget():
+    '''Test that :func:`~.downsample_2d` respects the bin budget per axis and
+    keeps the edges of the plot.'''
+    values = np.ones((3 * MAX_BINS_2D + 1, 10))
+    curve = CurveElements(values=values, legend='',
+                          bins=[np.linspace(0., 1., values.shape[0] + 1),
+                                np.linspace(0., 2., values.shape[1])])
+    small = downsample_2d(curve)
+    assert small.values.shape[0] <= MAX_BINS_2D
+    assert small.values.shape[1] == 10
+    assert np.all(small.values == 1.)
+    assert small.bins[0][0] == 0. and small.bins[0][-1] == 1.
+    assert small.bins[1] is curve.bins[1]
+
+
+def test_downsample_student(plot_repr):
+    '''Test that the plots of a large Student test are reduced and that a
+    failing bin is still visible.'''
+    size = 20 * MAX_POINTS_1D
+    bins = OrderedDict([('e', np.arange(size + 1.))])
+    dsref = Dataset(np.ones(size), np.full(size, 0.01), bins=bins, name='ref')
+    values = np.ones(size)
+    values[1234] = 2.
+    dstest = Dataset(values, np.full(size, 0.01), bins=bins, name='test')
+    result = TestStudent(dsref, dstest, name='student').evaluate()
+    assert not bool(result)
+    templates = plot_repr(result)
+    curves = [crv for templ in templates for splt in templ.subplots
+              for crv in splt.curves]
+    assert len(curves) == 3
+    assert all(crv.values.size <= MAX_POINTS_1D for crv in curves)
+    assert np.max(curves[1].values) == 2.
+    assert np.max(np.abs(curves[2].values)) > result.test.threshold
@@ -31,14 +31,20 @@
 '''Tests for the :mod:`~valjean.javert.rst` module.'''
 # pylint: disable=unused-argument
 
+import io
+import os
 import numpy as np
+import pytest
 from hypothesis import given, note
+from hypothesis.strategies import integers, sampled_from
+from hypothesis.extra.numpy import arrays
 
 # pylint: disable=wrong-import-order
 from ..context import valjean  # noqa: F401, pylint: disable=unused-import
 from valjean import LOGGER
-from valjean.javert.rst import RstTable
-from valjean.javert.templates import join
+from valjean.javert.rst import Rst
+from valjean.javert.rst_table import RstTable
+from valjean.javert.templates import join, TableTemplate
 from valjean.javert.table_repr import repr_bins
 from valjean.javert.verbosity import Verbosity
 from .conftest import int_matrices
@@ -68,8 +74,8 @@ from ..gavroche.conftest import (equal_test,  # pylint: disable=unused-import
 @given(matrix=int_matrices())  # pylint: disable=no-value-for-parameter
 def test_rsttable_col_widths(matrix):
     '''Check that :meth:`RstTable.compute_column_widths
-    <valjean.javert.rst.RstTable.compute_column_widths>` correctly computes the
-    column widths for rows with known shapes.'''
+    <valjean.javert.rst_table.RstTable.compute_column_widths>` correctly
+    computes the column widths for rows with known shapes.'''
     expected = np.amax(matrix, axis=0)
     headers = ['☺'*n for n in matrix[0, :]]
     note(f'headers: {headers}')
@@ -81,6 +87,44 @@ def test_rsttable_col_widths(matrix):
     assert np.equal(expected, result).all()
 
 
+@given(column=arrays(np.float64, integers(0, 50)),
+       num_fmt=sampled_from(['{:11.6g}', '{:+.3e}', '{:<10.3f}', '{:#g}']),
+       seed=integers(0, 2**32-1))
+def test_rsttable_format_column(column, num_fmt, seed):
+    '''Check that :meth:`RstTable.format_column
+    <valjean.javert.rst_table.RstTable.format_column>` formats floating-point
+    columns like the element-wise formatting of :meth:`RstTable.format_columns
+    <valjean.javert.rst_table.RstTable.format_columns>`.'''
+    highlight = np.random.default_rng(seed).random(column.size) > 0.5
+    rows = (RstTable.format_columns([column, column], [highlight, highlight],
+                                    num_fmt)
+            if column.size else [])
+    expected = [row[0] for row in rows]
+    assert RstTable.format_column(column, highlight, num_fmt) == expected
+
+
+def test_rsttable_stream_truncate():
+    '''Check that large tables are truncated to the cell budget and that
+    :meth:`RstTable.write <valjean.javert.rst_table.RstTable.write>` writes the
+    same text as :func:`str`.'''
+    size = 3 * RstTable.CHUNK_ROWS + 1
+    table = TableTemplate(np.arange(size), np.linspace(0., 1., size),
+                          np.array(['spam'] * size), headers=['a', 'b', 'c'],
+                          highlights=[np.zeros(size), np.arange(size) == 7,
+                                      np.zeros(size)])
+    full = RstTable(table, max_cells=3 * size)
+    stream = io.StringIO()
+    full.write(stream)
+    text = str(full)
+    assert stream.getvalue() == text
+    assert text.count('\n') == size + 10
+    assert text.count(':hl:`') == 1
+    assert str(RstTable(table)) == text
+    truncated = str(RstTable(table, max_cells=3 * size - 1))
+    assert truncated.count('\n') == size + 11
+    assert f'only the first {size - 1} rows out of {size}' in truncated
+
+
 def test_rst_table(rstcheck, table_template, rst_formatter):
     '''Test that :class:`~.RstFormatter` generates correct reST tables.'''
     table = str(rst_formatter.template(table_template))
@@ -380,3 +424,120 @@ def test_rst_text(text_template, rstcheck, rst_formatter):
     LOGGER.debug('generated rst:\n%s', rsttext)
     errs = rstcheck.check(rsttext)
     assert not list(errs)
+
+
+def test_rst_report_parallel(report, full_repr):
+    '''Test that formatting a report in a pool of processes gives the same
+    result as the sequential formatting.'''
+    rst_seq = Rst(representation=full_repr)
+    fmt_seq = rst_seq.format_report(report=report, author='pytest',
+                                    version='0.1')
+    rst_par = Rst(representation=full_repr, format_workers=2)
+    fmt_par = rst_par.format_report(report=report, author='pytest',
+                                    version='0.1')
+    assert fmt_par.tree_dict == fmt_seq.tree_dict
+    assert fmt_par.text_dict == fmt_seq.text_dict
+    assert list(fmt_par.plots) == list(fmt_seq.plots)
+
+
+def test_rst_report_parallel_fallback(report, full_repr, caplog):
+    '''Test that the report is formatted sequentially if the representation
+    cannot be sent to the subprocesses.'''
+    rst_seq = Rst(representation=full_repr)
+    fmt_seq = rst_seq.format_report(report=report, author='pytest',
+                                    version='0.1')
+    full_repr.unpicklable = lambda: None
+    rst_par = Rst(representation=full_repr, format_workers=2)
+    fmt_par = rst_par.format_report(report=report, author='pytest',
+                                    version='0.1')
+    assert 'falling back to sequential formatting' in caplog.text
+    assert fmt_par.tree_dict == fmt_seq.tree_dict
+    assert fmt_par.text_dict == fmt_seq.text_dict
+    assert list(fmt_par.plots) == list(fmt_seq.plots)
+
+
+def test_rst_report_incremental(report, rst_full, tmp_path):
+    '''Test that writing a report again only rewrites the modified pages and
+    plots, and removes the orphan ones.'''
+    fmt_report = rst_full.format_report(report=report, author='pytest',
+                                        version='0.1')
+    fmt_report.write(tmp_path)
+    pages = sorted(tmp_path.rglob('*.rst'))
+    plots = sorted((tmp_path / 'figures').glob('plot_*.png'))
+    assert len(plots) == len(fmt_report.plots) > 0
+    assert all(fmt_report.is_valid_png(plot) for plot in plots)
+    mtimes = {path: path.stat().st_mtime_ns for path in pages + plots}
+    for path in mtimes:
+        os.utime(path, ns=(0, 0))
+
+    # truncated plot, modified page, orphan plot and page
+    plots[0].write_bytes(plots[0].read_bytes()[:100])
+    index = tmp_path / 'index.rst'
+    fmt_report.text_dict[()].append('Some more text.')
+    (tmp_path / 'figures' / 'plot_orphan.png').write_bytes(b'')
+    fmt_report.write(tmp_path)
+    assert sorted(tmp_path.rglob('*.rst')) == pages
+    assert sorted((tmp_path / 'figures').glob('plot_*.png')) == plots
+    assert fmt_report.is_valid_png(plots[0])
+    assert plots[0].stat().st_mtime_ns > 0
+    assert index.stat().st_mtime_ns > 0
+    assert 'Some more text.' in index.read_text()
+    assert all(path.stat().st_mtime_ns == 0
+               for path in pages + plots[1:] if path != index)
+
+    # a removed section is removed from the disk
+    removed = fmt_report.tree_dict[()].pop()
+    fmt_report.write(tmp_path)
+    assert len(list(tmp_path.rglob('*.rst'))) < len(pages)
+    assert not fmt_report.tree_to_path(base=tmp_path, tree=removed).with_name(
+        removed[-1] + '.rst').exists()
+
+    # a page that was already removed from the disk is ignored
+    removed = fmt_report.tree_dict[()].pop()
+    fmt_report.tree_to_path(base=tmp_path, tree=removed).with_name(
+        removed[-1] + '.rst').unlink()
+    fmt_report.write(tmp_path)
+
+
+def test_rst_report_lazy(report, full_repr, tmp_path):
+    '''Test that formatting a report lazily, section by section, writes the
+    same files as the eager formatting.'''
+    eager = Rst(representation=full_repr).format_report(
+        report=report, author='pytest', version='0.1')
+    eager.write(tmp_path / 'eager')
+    lazy = Rst(representation=full_repr).format_report(
+        report=report, author='pytest', version='0.1', lazy=True)
+    assert not lazy.text_dict and not lazy.plots
+    lazy.write(tmp_path / 'lazy')
+    files = sorted(path.relative_to(tmp_path / 'eager')
+                   for path in (tmp_path / 'eager').rglob('*')
+                   if path.is_file())
+    assert sorted(path.relative_to(tmp_path / 'lazy')
+                  for path in (tmp_path / 'lazy').rglob('*')
+                  if path.is_file()) == files
+    assert any(path.suffix == '.png' for path in files)
+    for path in files:
+        assert ((tmp_path / 'lazy' / path).read_bytes()
+                == (tmp_path / 'eager' / path).read_bytes()), path
+
+    # writing again does not modify the pages and the plots
+    mtimes = {path: (tmp_path / 'lazy' / path).stat().st_mtime_ns
+              for path in files if path.suffix in ('.rst', '.png')}
+    lazy.write(tmp_path / 'lazy')
+    assert all((tmp_path / 'lazy' / path).stat().st_mtime_ns == mtime
+               for path, mtime in mtimes.items())
+
+
+def test_rst_report_lazy_error(report, full_repr, tmp_path, monkeypatch):
+    '''Test that no temporary file is left in the report directory if a
+    section cannot be written.'''
+    lazy = Rst(representation=full_repr).format_report(
+        report=report, author='pytest', version='0.1', lazy=True)
+
+    def broken_section(**_kwargs):
+        raise RuntimeError('broken section')
+
+    monkeypatch.setattr(lazy, 'write_section', broken_section)
+    with pytest.raises(RuntimeError, match='broken section'):
+        lazy.write(tmp_path / 'lazy')
+    assert not list((tmp_path / 'lazy').rglob('*.tmp'))
@@ -31,13 +31,16 @@
 '''Module for the ``run`` subcommand.'''
 
 import logging
+from argparse import ArgumentTypeError
 from pathlib import Path
 
 from ..common import JobCommand, read_env, write_env, build_graphs
-from ...cosette.backends.queue import QueueScheduling
+from ...cosette.backends.queue import QueueScheduling, detect_capacity
+from ...cosette.backends.process import ProcessScheduling
 from ...chrono import Chrono
 from ...cosette.scheduler import Scheduler
 from ...cosette.task import TaskStatus
+from ...gavroche.result_cache import ResultCache
 from ...path import ensure
 
 
@@ -61,10 +64,42 @@ class RunCommand(JobCommand):
         parser.add_argument('-j', '--workers', action='store', default=4,
                             type=int,
                             help='number of workers to use in parallel')
+        parser.add_argument('--backend', action='store',
+                            choices=('threads', 'processes', 'hybrid'),
+                            default='threads',
+                            help='execute the tasks on threads, on worker '
+                            'processes, or on worker processes except for '
+                            'the tasks that run external commands (default: '
+                            'threads)')
+        parser.add_argument('--no-priority', action='store_false',
+                            dest='priority',
+                            help='dispatch the tasks in topological order, '
+                            'instead of giving priority to the tasks on the '
+                            'critical path')
+        parser.add_argument('--default-duration', action='store',
+                            type=float, metavar='SECONDS',
+                            help='estimated duration of the tasks that have '
+                            'not been executed before (default: the median '
+                            'duration of the other tasks)')
+        parser.add_argument('--capacity', action='append', metavar='SPEC',
+                            type=self.capacity_spec,
+                            help='limit the tasks by the resources of the '
+                            'node; SPEC is either NAME=AMOUNT (e.g. cores=64, '
+                            'memory=256000 for the memory in MB, or '
+                            'licences=4) or "auto" to detect the cores and '
+                            'the memory of the node; may be repeated')
         parser.add_argument('--env-filename', action='store',
                             default='valjean.env',
                             help='name of the files that contain the '
                             'persistent environment (default: valjean.env)')
+        parser.add_argument('--no-result-cache', action='store_false',
+                            dest='result_cache',
+                            help='evaluate all the tests, without using the '
+                            'cache of test results')
+        parser.add_argument('--result-cache-size', action='store',
+                            default=1024, type=float, metavar='MB',
+                            help='maximum size of the cache of test results, '
+                            'in MB (default: 1024)')
         parser.add_argument('--env-format', action='store',
                             choices=('pickle',), default='pickle',
                             help='environment persistency format')
@@ -91,14 +126,92 @@ class RunCommand(JobCommand):
         env = read_env(root=output_root, names=task_names,
                        filename=args.env_filename, fmt=args.env_format)
         new_env = schedule(hard_graph=hard_graph, soft_graph=soft_graph,
-                           env=env, config=config, workers=args.workers)
+                           env=env, config=config, workers=args.workers,
+                           backend=args.backend, priority=args.priority,
+                           default_duration=args.default_duration,
+                           capacity=self.parse_capacity(args.capacity))
 
         self.task_diagnostics(tasks=tasks,
                               env=new_env, config=config)
+        self.prune_result_cache(config)
 
         write_env(env, filename=args.env_filename, fmt=args.env_format)
         return new_env
 
+    @staticmethod
+    def prune_result_cache(config):
+        '''Remove the least recently used test results from the cache if it
+        is too large (see :meth:`~.ResultCache.evict`), once per run rather
+        than after each evaluation task.
+
+        :param Config config: the configuration object.
+        '''
+        cache = ResultCache.from_config(config)
+        if cache is not None:
+            cache.evict()
+
+    @staticmethod
+    def capacity_spec(spec):
+        '''Parse the value of a ``--capacity`` option (used as the `type`
+        of the option, so that malformed values are reported by the argument
+        parser).
+
+        >>> RunCommand.capacity_spec('cores=64')
+        ('cores', 64)
+        >>> RunCommand.capacity_spec('memory=1.5e3')
+        ('memory', 1500.0)
+        >>> RunCommand.capacity_spec('auto')
+        ('auto', None)
+        >>> RunCommand.capacity_spec('cores:64')
+        Traceback (most recent call last):
+            ...
+        argparse.ArgumentTypeError: bad capacity specification 'cores:64'; ...
+
+        :param str spec: the option value.
+        :returns: the name of the resource and its amount, or ``('auto',
+            None)``.
+        :rtype: tuple(str, int or float or None)
+        :raises ArgumentTypeError: if the specification is malformed.
+        '''
+        if spec == 'auto':
+            return spec, None
+        name, sep, amount = spec.partition('=')
+        if sep and name and name != 'auto':
+            for conv in (int, float):
+                try:
+                    value = conv(amount)
+                except ValueError:
+                    continue
+                if value >= 0:
+                    return name, value
+        raise ArgumentTypeError(f'bad capacity specification {spec!r}; '
+                                'expected NAME=AMOUNT or "auto"')
+
+    @staticmethod
+    def parse_capacity(specs):
+        '''Build the capacity of the node from the ``--capacity`` options.
+
+        >>> RunCommand.parse_capacity(None) is None
+        True
+        >>> RunCommand.parse_capacity([('cores', 64), ('licences', 4)])
+        {'cores': 64, 'licences': 4}
+
+        :param specs: the option values, as parsed by :meth:`capacity_spec`,
+            or `None`.
+        :type specs: list(tuple(str, int or float or None)) or None
+        :returns: the capacity of the node, or `None` if no options were
+            given.
+        :rtype: dict or None
+        '''
+        if not specs:
+            return None
+        capacity = {}
+        if ('auto', None) in specs:
+            capacity.update(detect_capacity())
+        capacity.update(spec for spec in specs if spec != ('auto', None))
+        LOGGER.info('node capacity: %s', capacity)
+        return capacity
+
     @classmethod
     def task_diagnostics(cls, *, tasks, env, config):
         '''Emit diagnostic messages about the status of the tasks. Count how
@@ -156,12 +269,23 @@ class RunCommand(JobCommand):
                 failed_file.write(task + '\n')
 
 
-def schedule(*, hard_graph, soft_graph, env, config=None, workers=1):
+def schedule(*, hard_graph, soft_graph, env, config=None, workers=1,
+             backend='threads', **kwargs):
     '''Schedule a graph for execution.
 
+    :param str backend: the scheduling backend: ``'threads'``
+        (:class:`~.QueueScheduling`), ``'processes'`` or ``'hybrid'``
+        (:class:`~.ProcessScheduling`).
+    :param kwargs: any other keyword arguments are passed to the backend
+        constructor.
     '''
+    if backend == 'threads':
+        sched_backend = QueueScheduling(workers, **kwargs)
+    else:
+        sched_backend = ProcessScheduling(workers, hybrid=backend == 'hybrid',
+                                          **kwargs)
     scheduler = Scheduler(hard_graph=hard_graph, soft_graph=soft_graph,
-                          backend=QueueScheduling(workers))
+                          backend=sched_backend)
     new_env = scheduler.schedule(env=env, config=config)
     LOGGER.debug('resulting environment: %s', new_env)
     return new_env
@@ -0,0 +1,59 @@
+# Copyright French Alternative Energies and Atomic Energy Commission
+# Contributors: valjean developers
+# valjean-support@cea.fr
+#
+# This software is a computer program whose purpose is to analyze and
+# post-process numerical simulation results.
+#
+# This software is governed by the CeCILL license under French law and abiding
+# by the rules of distribution of free software. You can use, modify and/ or
+# redistribute the software under the terms of the CeCILL license as circulated
+# by CEA, CNRS and INRIA at the following URL: http://www.cecill.info.
+#
+# As a counterpart to the access to the source code and rights to copy, modify
+# and redistribute granted by the license, users are provided only with a
+# limited warranty and the software's author, the holder of the economic
+# rights, and the successive licensors have only limited liability.
+#
+# In this respect, the user's attention is drawn to the risks associated with
+# loading, using, modifying and/or developing or reproducing the software by
+# the user in light of its specific status of free software, that may mean that
+# it is complicated to manipulate, and that also therefore means that it is
+# reserved for developers and experienced professionals having in-depth
+# computer knowledge. Users are therefore encouraged to load and test the
+# software's suitability as regards their requirements in conditions enabling
+# the security of their systems and/or data to be ensured and, more generally,
+# to use and operate it in the same conditions as regards security.
+#
+# The fact that you are presently reading this means that you have had
+# knowledge of the CeCILL license and that you accept its terms.
+
+'''This module provides helper functions to split a workload in chunks to be
+distributed over a pool of worker processes.'''
+
+
+def chunk_size(n_items, n_workers, *, per_worker=4):
+    '''Return the number of items per chunk to split `n_items` items over
+    `n_workers` workers.
+
+    The items are split in about `per_worker` chunks per worker, so that the
+    workers are kept busy even if the chunks take different times to process.
+    Chunks contain at least one item.
+
+    >>> chunk_size(100, 5)
+    5
+    >>> chunk_size(101, 5)
+    6
+    >>> chunk_size(3, 8)
+    1
+    >>> chunk_size(0, 2)
+    1
+    >>> chunk_size(100, 5, per_worker=1)
+    20
+
+    :param int n_items: the number of items to split.
+    :param int n_workers: the number of workers.
+    :param int per_worker: the number of chunks per worker.
+    :rtype: int
+    '''
+    return max(1, -(-n_items // (per_worker * n_workers)))
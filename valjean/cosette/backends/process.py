@@ -0,0 +1,289 @@
+# Copyright French Alternative Energies and Atomic Energy Commission
+# Contributors: valjean developers
+# valjean-support@cea.fr
+#
+# This software is a computer program whose purpose is to analyze and
+# post-process numerical simulation results.
+#
+# This software is governed by the CeCILL license under French law and abiding
+# by the rules of distribution of free software. You can use, modify and/ or
+# redistribute the software under the terms of the CeCILL license as circulated
+# by CEA, CNRS and INRIA at the following URL: http://www.cecill.info.
+#
+# As a counterpart to the access to the source code and rights to copy, modify
+# and redistribute granted by the license, users are provided only with a
+# limited warranty and the software's author, the holder of the economic
+# rights, and the successive licensors have only limited liability.
+#
+# In this respect, the user's attention is drawn to the risks associated with
+# loading, using, modifying and/or developing or reproducing the software by
+# the user in light of its specific status of free software, that may mean that
+# it is complicated to manipulate, and that also therefore means that it is
+# reserved for developers and experienced professionals having in-depth
+# computer knowledge. Users are therefore encouraged to load and test the
+# software's suitability as regards their requirements in conditions enabling
+# the security of their systems and/or data to be ensured and, more generally,
+# to use and operate it in the same conditions as regards security.
+#
+# The fact that you are presently reading this means that you have had
+# knowledge of the CeCILL license and that you accept its terms.
+#
+# -*- coding: utf-8 -*-
+
+'''This module contains a scheduling backend that executes the tasks in a pool
+of worker processes (:mod:`concurrent.futures` module).
+
+Python threads cannot execute Python code in parallel, so
+:class:`~.QueueScheduling` only really parallelizes tasks that spend their time
+waiting, like :class:`~.RunTask`. Parsing, data conversion, test evaluation
+and plotting are CPU-bound Python code; :class:`ProcessScheduling` ships them
+to worker processes instead. The scheduling logic is the same as in
+:class:`~.QueueScheduling`: the worker threads of the backend just delegate the
+execution of each task to the process pool and wait for its completion.
+
+    >>> from valjean.cosette.task import DelayTask
+    >>> from valjean.cosette.depgraph import DepGraph
+    >>> from valjean.cosette.scheduler import Scheduler
+    >>> spam = DelayTask('spam', 0.01)
+    >>> eggs = DelayTask('eggs', 0.01)
+    >>> graph = DepGraph.from_dependency_dictionary({spam: [eggs]})
+    >>> scheduler = Scheduler(hard_graph=graph,
+    ...                       backend=ProcessScheduling(n_workers=2))
+    >>> env = scheduler.schedule()
+    >>> env.is_done(spam), env.is_done(eggs)
+    (True, True)
+
+How the tasks are shipped
+-------------------------
+
+Each task is pickled, detached from its dependencies, and sent to a worker
+process along with the configuration and a snapshot of the environment. The
+snapshot only contains the entries of the (recursive) dependencies of the
+task, which are the only ones that are guaranteed to be complete when the task
+starts. The worker process executes the task and sends back the
+`(env_update, status)` pair, which is merged into the environment of the
+master process.
+
+Most of the tasks generated by :mod:`valjean` wrap closures, which the
+standard :mod:`pickle` module cannot serialize; if the `cloudpickle
+<https://github.com/cloudpipe/cloudpickle>`_ package is installed, it is used
+instead. A task that cannot be pickled (or whose result cannot be pickled) is
+marked as failed, and the reason is logged and stored in the ``'why'`` key of
+its environment section; the other tasks are not affected.
+
+If a worker process dies abruptly (for instance because a task crashed the
+Python interpreter), the process pool cannot be used any more: it is replaced
+by a new one, and the tasks that were running in the broken pool are
+submitted once more. A task that breaks the pool twice is marked as failed.
+
+In *hybrid* mode (the default), :class:`~.RunTask` objects are executed
+directly by the worker threads of the master process: they spend most of
+their time waiting for external processes, so there is nothing to gain by
+shipping them elsewhere.
+'''
+
+import copy
+import logging
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from .queue import QueueScheduling
+from ..env import Env
+from ..pythontask import PythonTask
+from ..run import RunTask
+from ..task import TaskStatus
+
+try:
+    from cloudpickle import dumps
+except ImportError:
+    from pickle import dumps
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ProcessScheduling(QueueScheduling):
+    '''Scheduling backend that executes the tasks in a pool of worker
+    processes.'''
+
+    def __init__(self, n_workers=10, *, hybrid=True, mp_context=None,
+                 **kwargs):
+        '''Initialize the process backend.
+
+        :param int n_workers: The number of worker processes to use.
+        :param bool hybrid: If true, execute :class:`~.RunTask` objects in the
+                            master process, on threads.
+        :param mp_context: The :mod:`multiprocessing` context used to start
+                           the worker processes, or `None` for the default
+                           context (a context requires Python 3.7).
+        :param kwargs: Any other keyword arguments are passed to
+                       :class:`~.QueueScheduling`.
+        '''
+        super().__init__(n_workers, **kwargs)
+        self.hybrid = hybrid
+        self.mp_context = mp_context
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.full_graph = None
+
+    def execute_tasks(self, *, full_graph, hard_graph, env, config):
+        '''Execute the tasks.
+
+        See :meth:`.QueueScheduling.execute_tasks` for the meaning of the
+        arguments.
+        '''
+        self.pool = self.new_pool()
+        self.full_graph = full_graph
+        try:
+            super().execute_tasks(full_graph=full_graph,
+                                  hard_graph=hard_graph, env=env,
+                                  config=config)
+        finally:
+            self.pool.shutdown()
+            self.pool = None
+            self.full_graph = None
+
+    def new_pool(self):
+        '''Start a new pool of worker processes.
+
+        :rtype: concurrent.futures.ProcessPoolExecutor
+        '''
+        kwargs = {}
+        if self.mp_context is not None:
+            # the mp_context argument only exists since Python 3.7
+            kwargs['mp_context'] = self.mp_context
+        # the pool outlives this method, it is shut down by execute_tasks
+        pool = ProcessPoolExecutor(  # pylint: disable=consider-using-with
+            max_workers=self.n_workers, **kwargs)
+        # make sure that the worker processes are started before the worker
+        # threads
+        pool.submit(int).result()
+        return pool
+
+    def restart_pool(self, broken):
+        '''Replace a broken pool of worker processes by a new one.
+
+        Several worker threads may notice that the pool is broken at the same
+        time; the pool is only replaced by the first of them.
+
+        :param concurrent.futures.ProcessPoolExecutor broken: the broken pool.
+        '''
+        with self.pool_lock:
+            if self.pool is not broken:
+                return
+            LOGGER.error('a worker process died abruptly, restarting the '
+                         'process pool')
+            broken.shutdown(wait=False)
+            self.pool = self.new_pool()
+
+    def submit(self, payload):
+        '''Execute a pickled task in the pool of worker processes and wait for
+        its result.
+
+        If the pool is broken, it is restarted and the task is submitted once
+        more.
+
+        :param bytes payload: the pickled task (see :func:`do_pickled`).
+        :returns: the result of :func:`do_pickled`, or the
+            :exc:`~concurrent.futures.process.BrokenProcessPool` exception if
+            the pool broke twice.
+        '''
+        for _ in range(2):
+            pool = self.pool
+            try:
+                return pool.submit(do_pickled, payload).result()
+            except BrokenProcessPool as ex:
+                error = ex
+                self.restart_pool(pool)
+        return error
+
+    def in_process(self, task):
+        '''Return `True` if `task` should be executed in a worker process.'''
+        return not (self.hybrid and isinstance(task, RunTask))
+
+    def do_task(self, task, env, config):
+        '''Execute a task in a worker process and return its result.
+
+        :param Task task: the task to execute.
+        :param Env env: the environment.
+        :param Config config: the configuration object.
+        :returns: an `(env_update, status)` pair.
+        '''
+        if not self.in_process(task):
+            return task.do(env, config)
+
+        names = [dep.name
+                 for dep in self.full_graph.dependencies(task, recurse=True)]
+        names.append(task.name)
+        sub_env = env.atomically(partial(snapshot, names))
+        try:
+            payload = dumps((detach(task), sub_env, config))
+        except Exception as ex:  # pylint: disable=broad-except
+            return pickling_failure(task, 'task', ex)
+
+        LOGGER.debug('sending task %s to a worker process (%d bytes)',
+                     task, len(payload))
+        result = self.submit(payload)
+        if isinstance(result, BrokenProcessPool):
+            LOGGER.error('task %s failed: its worker process died', task)
+            env_up = {task.name: {'why': 'the worker process executing the '
+                                  'task died abruptly'}}
+            return env_up, TaskStatus.FAILED
+        if isinstance(result, Exception):
+            return pickling_failure(task, 'result of the task', result)
+        return pickle.loads(result)
+
+
+def snapshot(names, env):
+    '''Return a new :class:`~.Env` containing a copy of the sections of `env`
+    associated to the given task names.
+
+    :param list(str) names: the names of the tasks.
+    :param Env env: the environment.
+    :rtype: Env
+    '''
+    return Env({name: dict(env[name]) for name in names if name in env})
+
+
+def detach(task):
+    '''Return a shallow copy of `task` without its dependencies, which do not
+    need to be shipped to the worker processes.
+
+    :param Task task: the task.
+    :rtype: Task
+    '''
+    detached = copy.copy(task)
+    detached.depends_on = set()
+    detached.soft_depends_on = set()
+    if isinstance(task, PythonTask):
+        # drop the environment and configuration injected by previous runs
+        injected = (task.env_kwarg, task.config_kwarg)
+        detached.kwargs = {key: value for key, value in task.kwargs.items()
+                           if key not in injected}
+    return detached
+
+
+def do_pickled(payload):
+    '''Execute a pickled task. This function runs in the worker processes.
+
+    :param bytes payload: the pickled `(task, env, config)` triple.
+    :returns: the pickled result of the task, or the exception raised while
+        pickling it.
+    '''
+    task, env, config = pickle.loads(payload)
+    result = task.do(env, config)
+    try:
+        return dumps(result)
+    except Exception as ex:  # pylint: disable=broad-except
+        return pickle.PicklingError(f'{type(ex).__name__}: {ex}')
+
+
+def pickling_failure(task, what, exc):
+    '''Report that something could not be pickled, and return the
+    `(env_update, status)` pair for the failed task.'''
+    LOGGER.error('the %s %s cannot be pickled: %s', what, task, exc)
+    env_up = {task.name: {'why': f'the {what} cannot be pickled: {exc}'}}
+    return env_up, TaskStatus.FAILED
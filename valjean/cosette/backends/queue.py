@@ -33,13 +33,64 @@
 '''This module contains an implementation of a scheduling backend that
 leverages Python "threads" (:mod:`~threading` module) and producer-consumer
 queues (:mod:`~queue` module).
+
+By default, :class:`QueueScheduling` is *event-driven*: before starting, the
+master computes the reverse edges of the dependency graph and the number of
+unfinished dependencies of each task. Whenever a worker finishes a task, it
+reports back to the master, which decrements the counters of the dependees of
+the finished task and enqueues the ones that have no unfinished dependencies
+left. Failed and skipped tasks propagate along the dependees in the same way.
+The cost of processing a completed task is thus proportional to the number of
+its dependees, and not to the total number of tasks.
+
+The older *polling* mode (``event_driven=False``) re-examines all the
+remaining tasks every time a worker finishes a task. It is kept for reference
+and for debugging.
+
+Task priorities
+---------------
+
+By default, the tasks that are ready for execution are dispatched to the
+workers in order of decreasing *bottom level* (see
+:meth:`.DepGraph.bottom_levels`), i.e. the tasks that lie on the longest
+paths to the end of the graph go first. The durations of the tasks are
+estimated from the ``start_clock`` and ``end_clock`` values recorded in the
+environment by a previous run; the tasks that have no recorded duration are
+assigned a default estimate (by default, the median of the known durations).
+This helps starting long simulations (and the tasks that depend on them)
+early, so that the workers do not idle at the end of the run. Use
+``priority=False`` to dispatch the tasks in topological order instead.
+
+Task resources
+--------------
+
+By default, the only limit on the number of tasks that run at the same time is
+the number of workers. If a `capacity` is given, :class:`QueueScheduling` also
+keeps track of the resources used by the running tasks (see
+:class:`~.Task` for the resource declarations) and never starts a task
+whose requirements exceed the available resources. The capacity is a
+dictionary associating resource names to the amounts available on the node;
+resources that do not appear in the capacity are not limited.
+:func:`detect_capacity` returns the number of cores and the amount of memory
+(in MB) of the current node.
+
+The tasks are started by decreasing priority, as long as they fit. If the most
+urgent task does not fit, its requirements are *reserved*: tasks with lower
+priority can only use the resources that would be left if it were running, so
+that large tasks (such as parallel simulations) are not starved by streams of
+small tasks. The resource-aware mode requires the event-driven mode.
 '''
 
+import os
 import threading
 import logging
 import time
-from queue import Queue
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+from queue import Queue, PriorityQueue
 from functools import partial
+from statistics import median
 
 from ..task import TaskStatus
 from ...chrono import Chrono
@@ -55,13 +106,38 @@ class QueueScheduling:
     tasks.
     '''
 
-    def __init__(self, n_workers=10):
+    def __init__(self, n_workers=10, *, event_driven=True, priority=True,
+                 default_duration=None, capacity=None):
 
         '''Initialize the queue backend.
 
         :param int n_workers: The number of worker threads to use.
+        :param bool event_driven: If true, use dependency counters to enqueue
+                                  tasks as soon as their dependencies are
+                                  completed; otherwise, re-examine all the
+                                  remaining tasks every time a task completes.
+        :param bool priority: If true, dispatch the tasks by decreasing
+                              bottom level; otherwise, in topological order.
+        :param default_duration: The estimated duration (in seconds) of the
+                                 tasks that have no recorded duration, or
+                                 `None` to use the median of the recorded
+                                 durations.
+        :type default_duration: float or None
+        :param capacity: The amount of each resource available for the
+                         execution of the tasks, or `None` to limit the tasks
+                         only by the number of workers.
+        :type capacity: dict(str, int or float) or None
+        :raises ValueError: if a `capacity` is given and `event_driven` is
+                            false.
         '''
+        if capacity is not None and not event_driven:
+            raise ValueError('resource-aware scheduling requires the '
+                             'event-driven mode')
         self.n_workers = n_workers
+        self.event_driven = event_driven
+        self.priority = priority
+        self.default_duration = default_duration
+        self.capacity = capacity
         self.queue = Queue(0)
 
     def _enqueue(self, tasks, full_graph, hard_graph, env):
@@ -169,6 +245,20 @@ class QueueScheduling:
         env.set_waiting(task)
         return TaskStatus.WAITING
 
+    def do_task(self, task, env, config):
+        '''Execute a single task and return its result. This method is called
+        by the worker threads; subclasses may override it to execute the task
+        elsewhere.
+
+        :param Task task: the task to execute.
+        :param Env env: the environment.
+        :param Config config: the configuration object.
+        :returns: the result of :meth:`Task.do
+            <valjean.cosette.task.Task.do>`, normally an `(env_update, status)`
+            pair.
+        '''
+        return task.do(env, config)
+
     def execute_tasks(self, *, full_graph, hard_graph, env, config):
         '''Execute the tasks.
 
@@ -181,25 +271,60 @@ class QueueScheduling:
         :type env: Config
         '''
 
+        # process tasks; sort them in topological order
+        with Chrono() as chrono:
+            tasks = full_graph.topological_sort()
+        LOGGER.info('full graph sorted in %s seconds', chrono)
+        priorities = None
+        if self.priority:
+            durations = self.estimate_durations(tasks, env)
+            priorities = full_graph.bottom_levels(durations)
+            LOGGER.info('estimated critical path length: %.1f seconds',
+                        max(priorities.values(), default=0.))
+            self.queue = TaskPriorityQueue(priorities)
+
         threads = []
         # Use a condition variable to block when no more tasks can be submitted
         # because of dependencies. The master calls cond_var.wait() and the
         # worker threads call cond_var.notify() when they are finished with a
         # task.
         cond_var = threading.Condition()
+        # In event-driven mode, the workers report the completed tasks to the
+        # master through this queue.
+        done_queue = Queue(0) if self.event_driven else None
 
         # spawn workers
         LOGGER.debug('master: spawning %s workers...', self.n_workers)
         for _ in range(self.n_workers):
             thread = QueueScheduling.WorkerThread(self.queue, env, config,
-                                                  cond_var)
+                                                  cond_var,
+                                                  done_queue=done_queue,
+                                                  do_task=self.do_task)
             thread.start()
             threads.append(thread)
 
-        # process tasks; sort them in topological order
-        with Chrono() as chrono:
-            tasks_left = full_graph.topological_sort()
-        LOGGER.info('full graph sorted in %s seconds', chrono)
+        if self.event_driven:
+            self._execute_event_driven(tasks=tasks, full_graph=full_graph,
+                                       hard_graph=hard_graph, env=env,
+                                       done_queue=done_queue,
+                                       priorities=priorities)
+        else:
+            self._execute_polling(tasks, full_graph, hard_graph, env,
+                                  cond_var)
+
+        # block until all tasks are done
+        self.queue.join()
+
+        # stop workers and go home
+        for _ in range(self.n_workers):
+            self.queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _execute_polling(self, tasks_left, full_graph, hard_graph, env,
+                         cond_var):
+        '''Submit the tasks to the workers, re-examining all the remaining
+        tasks every time a task completes.'''
         while tasks_left:
             n_tasks_left = len(tasks_left)
             LOGGER.info('master: %d tasks left', n_tasks_left)
@@ -219,21 +344,128 @@ class QueueScheduling:
                     cond_var.wait()
                     LOGGER.debug('master: ...woke up!')
 
-        # block until all tasks are done
-        self.queue.join()
+    def _execute_event_driven(self, *, tasks, full_graph, hard_graph, env,
+                              done_queue, priorities):
+        # pylint: disable=too-many-arguments
+        '''Submit the tasks to the workers as soon as all their dependencies
+        are completed.
+
+        :param list(Task) tasks: the tasks, in topological order.
+        :param Queue done_queue: the queue where the workers put the
+                                 completed tasks.
+        :param priorities: the priorities of the tasks, or `None`.
+        :type priorities: dict(Task, float) or None
+        '''
+        run = _EventDrivenRun(tasks, full_graph, hard_graph, priorities)
+        # with a capacity, the tasks that can run wait in a heap until their
+        # resources are available
+        pool = None if self.capacity is None else ResourcePool(self.capacity)
+        while run.n_left:
+            LOGGER.debug('master: %d tasks left, %d running, %d ready',
+                         run.n_left, run.n_running, len(run.ready))
+            self._submit_ready(run, env, pool)
+            if not run.n_left:
+                break
+            if pool is not None:
+                self._dispatch(run, pool)
+            assert run.n_running > 0, \
+                'no running tasks, but some tasks are left'
+            task = done_queue.get()
+            LOGGER.debug('master: task %s completed', task)
+            if pool is not None:
+                pool.release(task)
+            run.n_running -= 1
+            run.finish(task)
+
+    def _submit_ready(self, run, env, pool):
+        '''Decide the new state of the ready tasks of `run`. The pending ones
+        are submitted to the workers (or, with a resource pool, made runnable
+        until their resources are available); the other ones are finished.'''
+        while run.ready:
+            task = run.ready.popleft()
+            if any(dep in run.submitted for dep in run.deps[task]):
+                # some of the dependencies were just re-executed, so the task
+                # must be re-executed too (if it can)
+                env.set_waiting(task)
+            new_state = env.atomically(partial(self.decide_new_state, task,
+                                               run.deps[task],
+                                               run.hard_deps[task]))
+            if new_state != TaskStatus.PENDING:
+                # the task is skipped or left out: it counts as finished
+                assert new_state != TaskStatus.WAITING
+                if new_state == TaskStatus.SKIPPED:
+                    LOGGER.debug('master: task %s has failed deps', task)
+                run.finish(task)
+            elif pool is None:
+                run.submitted.add(task)
+                self.queue.put(task)
+                run.n_running += 1
+            else:
+                run.submitted.add(task)
+                run.make_runnable(task, pool.requirements(task))
 
-        # stop workers and go home
-        for _ in range(self.n_workers):
-            self.queue.put(None)
-        for thread in threads:
-            thread.join()
+    def _dispatch(self, run, pool):
+        '''Submit the runnable tasks of `run` whose requirements can be met,
+        by decreasing priority.
+
+        The requirements of the first task that does not fit are reserved for
+        it; the following tasks may only use what is left.
+        '''
+        blocked = []
+        reserved = None
+        while run.runnable and run.n_running < self.n_workers:
+            item = heappop(run.runnable)
+            _, _, task, reqs = item
+            if pool.fits(reqs, reserved):
+                LOGGER.debug('master: starting task %s with resources %s',
+                             task, reqs)
+                pool.acquire(task, reqs)
+                self.queue.put(task)
+                run.n_running += 1
+                continue
+            blocked.append(item)
+            if reserved is None:
+                reserved = reqs
+            if pool.exhausted(reserved):
+                break
+        for item in blocked:
+            heappush(run.runnable, item)
+
+    def estimate_durations(self, tasks, env):
+        '''Estimate the durations of the tasks from the ``start_clock`` and
+        ``end_clock`` values recorded in the environment.
+
+        :param list(Task) tasks: the tasks.
+        :param Env env: the environment.
+        :returns: the estimated duration of each task, in seconds.
+        :rtype: dict(Task, float)
+        '''
+        durations = {}
+        for task in tasks:
+            if task.name not in env:
+                continue
+            start = env.get_start_clock(task)
+            end = env.get_end_clock(task)
+            if start is not None and end is not None and end >= start:
+                durations[task] = end - start
+        default = self.default_duration
+        if default is None:
+            default = median(durations.values()) if durations else 1.
+        LOGGER.debug('%d/%d tasks have a recorded duration; default '
+                     'estimate: %s seconds', len(durations), len(tasks),
+                     default)
+        for task in tasks:
+            durations.setdefault(task, default)
+        return durations
 
     class WorkerThread(threading.Thread):
         '''Workhorse class for :class:`QueueScheduling`. This class consumes
         (i.e. executes) tasks passed to it through the queue.
         '''
 
-        def __init__(self, queue, env, config, cond_var):
+        def __init__(self, queue, env, config, cond_var, *, done_queue=None,
+                     do_task=None):
+            # pylint: disable=too-many-arguments
             '''Initialize the thread.
 
             :param queue: The producer-consumer task queue.
@@ -241,12 +473,18 @@ class QueueScheduling:
             :param config: The configuration for the tasks.
             :param cond_var: A condition variable to notify when we are
                              finished running a task
+            :param done_queue: If not `None`, a queue where the completed
+                               tasks are put.
+            :param do_task: If not `None`, a callable used to execute the
+                            tasks, as ``do_task(task, env, config)``.
             '''
             super().__init__()
             self.queue = queue
             self.config = config
             self.env = env
             self.cond_var = cond_var
+            self.done_queue = done_queue
+            self.do_task = do_task
 
         def run(self):
             '''Main method: run this thread.'''
@@ -262,7 +500,11 @@ class QueueScheduling:
 
                 start = time.time()
                 try:
-                    task_result = task.do(self.env, self.config)
+                    if self.do_task is None:
+                        task_result = task.do(self.env, self.config)
+                    else:
+                        task_result = self.do_task(task, self.env,
+                                                   self.config)
                 except Exception as ex:  # pylint: disable=broad-except
                     LOGGER.exception('task %s on worker %s failed with the '
                                      'following exception:\n%s',
@@ -289,9 +531,206 @@ class QueueScheduling:
                 self.env.set_start_end_clock(task, start=start, end=end)
 
                 LOGGER.debug('worker %s: wants more!', self.name)
+                if self.done_queue is not None:
+                    self.done_queue.put(task)
                 self.queue.task_done()
 
                 # notify the master that a new task has completed
                 with self.cond_var:
                     LOGGER.debug('worker %s: notifies master', self.name)
                     self.cond_var.notify_all()
+
+
+class _EventDrivenRun:
+    # pylint: disable=too-many-instance-attributes
+    '''State of an event-driven execution of the tasks by
+    :class:`QueueScheduling`.
+
+    Each task counts its unfinished dependencies; a task becomes ready to be
+    examined when the count reaches zero.
+    '''
+
+    def __init__(self, tasks, full_graph, hard_graph, priorities):
+        '''Initialize the state of the execution.
+
+        :param list(Task) tasks: the tasks, in topological order.
+        :param DepGraph full_graph: the full dependency graph.
+        :param DepGraph hard_graph: the hard-dependency graph.
+        :param priorities: the priorities of the tasks, or `None`.
+        :type priorities: dict(Task, float) or None
+        '''
+        self.deps = {task: full_graph.dependencies(task) for task in tasks}
+        self.hard_deps = {task: hard_graph.dependencies(task)
+                          for task in tasks}
+        self.dependees = {task: [] for task in tasks}
+        for task in tasks:
+            for dep in self.deps[task]:
+                self.dependees[dep].append(task)
+        self.n_unfinished = {task: len(self.deps[task]) for task in tasks}
+        self.priorities = priorities
+        # the tasks that were submitted to the workers during this run
+        self.submitted = set()
+        ready = [task for task in tasks if not self.n_unfinished[task]]
+        if priorities is not None:
+            # submit the most urgent tasks first, since the workers may start
+            # on them before the others are submitted
+            ready.sort(key=priorities.__getitem__, reverse=True)
+        self.ready = deque(ready)
+        # heap of the tasks waiting for their resources
+        self.runnable = []
+        self.seq = count()
+        self.n_left = len(tasks)
+        self.n_running = 0
+
+    def make_runnable(self, task, reqs):
+        '''Add a task to the heap of the tasks waiting for their resources.
+
+        :param Task task: the task.
+        :param dict(str, float) reqs: its resource requirements.
+        '''
+        priority = 0. if self.priorities is None else self.priorities[task]
+        heappush(self.runnable, (-priority, next(self.seq), task, reqs))
+
+    def finish(self, task):
+        '''Mark a task as finished: decrement the counters of unfinished
+        dependencies of its dependees, and mark as ready the ones that reach
+        zero.
+
+        :param Task task: the finished task.
+        '''
+        self.n_left -= 1
+        for dependee in self.dependees[task]:
+            self.n_unfinished[dependee] -= 1
+            if not self.n_unfinished[dependee]:
+                self.ready.append(dependee)
+
+
+class TaskPriorityQueue(PriorityQueue):
+    '''A producer-consumer queue that yields the tasks by decreasing
+    priority. Tasks with the same priority are yielded in insertion order.
+    Tasks with no priority (and the `None` sentinel) come last.'''
+
+    def __init__(self, priorities, maxsize=0):
+        '''Initialize the queue.
+
+        :param dict(Task, float) priorities: the priority of each task.
+        :param int maxsize: the maximum size of the queue (see
+                            :class:`queue.Queue`).
+        '''
+        super().__init__(maxsize)
+        self.priorities = priorities
+        self.counter = count()
+
+    def _put(self, item):
+        priority = self.priorities.get(item, float('-inf'))
+        super()._put((-priority, next(self.counter), item))
+
+    def _get(self):
+        return super()._get()[2]
+
+
+class ResourcePool:
+    '''Keep track of the resources available for the execution of tasks.
+
+    >>> from valjean.cosette.task import DelayTask
+    >>> pool = ResourcePool({'cores': 4, 'licences': 1})
+    >>> big = DelayTask('big', 0., resources={'cores': 3, 'licences': 1})
+    >>> small = DelayTask('small', 0., resources={'memory': 100})
+    >>> reqs = pool.requirements(big)
+    >>> sorted(reqs.items())
+    [('cores', 3), ('licences', 1)]
+    >>> pool.fits(reqs)
+    True
+    >>> pool.acquire(big, reqs)
+    >>> pool.fits(pool.requirements(big))
+    False
+    >>> pool.fits(pool.requirements(small))  # memory is not limited
+    True
+    >>> pool.release(big)
+    >>> pool.fits(pool.requirements(big))
+    True
+    '''
+
+    def __init__(self, capacity):
+        '''Initialize the pool.
+
+        :param dict(str, int or float) capacity: the amount of each resource.
+        '''
+        self.capacity = dict(capacity)
+        self.free = dict(capacity)
+        self.in_use = {}
+
+    def requirements(self, task):
+        '''Return the requirements of `task` for the resources of the pool.
+
+        Requirements that exceed the capacity of the pool are reduced to the
+        capacity, so that the task can run (alone) when all the resources are
+        free.
+
+        :param Task task: the task.
+        :rtype: dict(str, int or float)
+        '''
+        reqs = {}
+        for name, amount in getattr(task, 'resources', {'cores': 1}).items():
+            if name not in self.capacity:
+                continue
+            if amount > self.capacity[name]:
+                LOGGER.warning('task %s requires %s %s, but only %s are '
+                               'available', task, amount, name,
+                               self.capacity[name])
+                amount = self.capacity[name]
+            reqs[name] = amount
+        return reqs
+
+    def fits(self, reqs, reserved=None):
+        '''Return `True` if the given requirements can be met by the free
+        resources, minus the `reserved` ones.
+
+        :param dict reqs: the requirements.
+        :param reserved: the reserved resources, or `None`.
+        :type reserved: dict or None
+        '''
+        reserved = {} if reserved is None else reserved
+        return all(amount <= self.free[name] - reserved.get(name, 0)
+                   for name, amount in reqs.items() if amount)
+
+    def exhausted(self, reserved):
+        '''Return `True` if no cores are left, minus the `reserved` ones.
+        Since every task requires one core unless told otherwise, it is
+        usually pointless to look for more tasks to start.'''
+        if 'cores' not in self.free:
+            return False
+        return self.free['cores'] - reserved.get('cores', 0) <= 0
+
+    def acquire(self, task, reqs):
+        '''Allocate the given resources to `task`.'''
+        for name, amount in reqs.items():
+            self.free[name] -= amount
+        self.in_use[task] = reqs
+
+    def release(self, task):
+        '''Free the resources allocated to `task`.'''
+        for name, amount in self.in_use.pop(task).items():
+            self.free[name] += amount
+
+
+def detect_capacity():
+    '''Detect the number of cores and the amount of memory (in MB) of the
+    current node.
+
+    :returns: a capacity dictionary, suitable for :class:`QueueScheduling`.
+    :rtype: dict(str, int)
+    '''
+    capacity = {}
+    try:
+        capacity['cores'] = len(os.sched_getaffinity(0))
+    except AttributeError:
+        capacity['cores'] = os.cpu_count() or 1
+    try:
+        memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        LOGGER.warning('cannot detect the amount of memory of this node')
+    else:
+        capacity['memory'] = memory // 2**20
+    LOGGER.debug('detected node capacity: %s', capacity)
+    return capacity
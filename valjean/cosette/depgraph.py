@@ -114,9 +114,7 @@ or ask for the dependencies of a node:
    >>> sorted(g['sausage'])  # equivalent, shorter syntax
    ['eggs', 'spam']
 
-or ask for the nodes that depend on another node (careful though, this
-operation has `O(N)` time complexity, `N` being the number of nodes in the
-graph):
+or ask for the nodes that depend on another node:
 
    >>> sorted(g.dependees('spam'))
    ['bacon', 'sausage']
@@ -320,12 +318,13 @@ class DepGraph:
         # the list of the graph nodes
         nodes = list(set(dependencies.keys())
                      | set(v for vs in dependencies.values() for v in vs))
+        indices = {node: i for i, node in enumerate(nodes)}
 
         # translate the dependency dictionary elements to indices
         edges = {}
         for key, values in dependencies.items():
-            new_key = nodes.index(key)
-            new_values = set(map(nodes.index, values))
+            new_key = indices[key]
+            new_values = set(map(indices.__getitem__, values))
             edges[new_key] = new_values
 
         return cls(nodes, edges)
@@ -341,6 +340,15 @@ class DepGraph:
         complete_dct = {k: set(v) for k, v in complete_dct.items()}
         return complete_dct
 
+    @staticmethod
+    def _reverse(edges):
+        '''Return the reverse adjacency of a complete edge dictionary.'''
+        redges = {key: set() for key in edges}
+        for key, vals in edges.items():
+            for val in vals:
+                redges[val].add(key)
+        return redges
+
     def __init__(self, nodes=None, edges=None):
         '''Initialize the object from a list of nodes and an edge dictionary.
 
@@ -355,6 +363,7 @@ class DepGraph:
         if nodes is None or edges is None:
             self._nodes = RList()
             self._edges = {}
+            self._redges = {}
             return
 
         # self._nodes is the list of the graph nodes
@@ -368,6 +377,9 @@ class DepGraph:
             self._edges = DepGraph._complete(edges)
         LOGGER.debug('graph completed in %s seconds', chrono)
         LOGGER.debug('full graph edges: %s', self._edges)
+        # self._redges is the reverse adjacency: it maps each node to the
+        # nodes that depend on it, and it is kept in sync with self._edges
+        self._redges = DepGraph._reverse(self._edges)
 
     def __str__(self):
         assoc_list = sorted([(str(self._nodes[k]),
@@ -455,6 +467,7 @@ class DepGraph:
         new_index = len(self._nodes)
         self._nodes.append(node)
         self._edges[new_index] = set()
+        self._redges[new_index] = set()
         return self
 
     def remove_node(self, node):
@@ -470,34 +483,42 @@ class DepGraph:
             LOGGER.warning('Cannot remove node %s: not in graph', node)
             return self
 
-        # first, we need to put the selected node at the end of the _nodes list
+        # remove the edges going in and out of the node
+        for j in self._edges.pop(i):
+            if j != i:
+                self._redges[j].discard(i)
+        for k in self._redges.pop(i):
+            if k != i:
+                self._edges[k].discard(i)
+
+        # move the last node into the hole, relabelling its edges
         last = len(self._nodes) - 1
-        self._nodes.swap(i, last)
-        # swap nodes in the _edges dictionary
-        tmp = self._edges[i]
-        self._edges[i] = self._edges[last]
-        self._edges[last] = tmp
-
-        def _swapper(k):
-            if k == i:
-                return last
-            if k == last:
-                return i
-            return k
-        for k, vals in self._edges.items():
-            self._edges[k] = set(map(_swapper, vals))
-        # now we can remove the edges
-        # remove edges from last
-        del self._edges[last]
-        # remove edges into last
-        for k, vals in self._edges.items():
-            self._edges[k] = set(n for n in vals if n != last)
+        if i != last:
+            self._nodes.swap(i, last)
+            edges = self._relabel(self._edges.pop(last), last, i)
+            redges = self._relabel(self._redges.pop(last), last, i)
+            self._edges[i] = edges
+            self._redges[i] = redges
+            for j in edges:
+                if j != i:
+                    self._redges[j] = self._relabel(self._redges[j], last, i)
+            for k in redges:
+                if k != i:
+                    self._edges[k] = self._relabel(self._edges[k], last, i)
 
         # finally, we can remove the node itself
         del self._nodes[last]
 
         return self
 
+    @staticmethod
+    def _relabel(indices, old, new):
+        '''Replace `old` with `new` in the `indices` set, in place.'''
+        if old in indices:
+            indices.remove(old)
+            indices.add(new)
+        return indices
+
     def add_dependency(self, node, on):
         '''Add a new dependency to the graph.
 
@@ -510,6 +531,7 @@ class DepGraph:
         i_node = self._nodes.index(node)
         i_on = self._nodes.index(on)
         self._edges[i_node].add(i_on)
+        self._redges[i_on].add(i_node)
         return self
 
     def remove_dependency(self, node, on):
@@ -526,6 +548,7 @@ class DepGraph:
         except KeyError as kerr:
             raise KeyError(f'trying to remove missing edge {node} -> '
                            f'{on}') from kerr
+        self._redges[i_on].discard(i_node)
         return self
 
     def invert(self):
@@ -534,12 +557,7 @@ class DepGraph:
         :returns: A new graph having the same nodes but all edges inverted.
         '''
 
-        inv_edges = {}
-        for key, vals in self._edges.items():
-            inv_edges.setdefault(key, [])
-            for val in vals:
-                inv_edges.setdefault(val, []).append(key)
-
+        inv_edges = {key: set(vals) for key, vals in self._redges.items()}
         inverted = DepGraph(self._nodes, inv_edges)
         LOGGER.debug('inverted graph: %s', inverted)
         return inverted
@@ -556,26 +574,63 @@ class DepGraph:
         result = []
         marks = {}
 
-        def _visit(node):
-            mark = marks.get(node, None)
-            if mark == self._Marks.TEMP:
-                raise DepGraphError('Dependency graph is cyclic!')
-            if mark == self._Marks.PERM:
-                return
-            marks[node] = self._Marks.TEMP
-            index = self._nodes.index(node)
-            for target in self._edges.get(index, []):
-                _visit(self._nodes[target])
-            marks[node] = self._Marks.PERM
-            result.append(node)
-
-        for node in self._nodes:
-            if node in marks:
+        # iterative depth-first search, to avoid hitting the recursion limit
+        # on deep graphs
+        for start in range(len(self._nodes)):
+            if start in marks:
                 continue
-            _visit(node)
+            marks[start] = self._Marks.TEMP
+            stack = [(start, iter(self._edges.get(start, ())))]
+            while stack:
+                index, targets = stack[-1]
+                for target in targets:
+                    mark = marks.get(target, None)
+                    if mark == self._Marks.TEMP:
+                        raise DepGraphError('Dependency graph is cyclic!')
+                    if mark is None:
+                        marks[target] = self._Marks.TEMP
+                        stack.append((target,
+                                      iter(self._edges.get(target, ()))))
+                        break
+                else:
+                    stack.pop()
+                    marks[index] = self._Marks.PERM
+                    result.append(self._nodes[index])
 
         return result
 
+    def bottom_levels(self, weights):
+        '''Compute the bottom level of each node of the graph, i.e. the weight
+        of the heaviest path that starts at the node and follows the reverse
+        dependencies. If the weights represent the durations of the tasks, the
+        bottom level of a task is the minimum time that it takes to complete
+        the task and all the tasks that depend on it, and the largest bottom
+        level is the length of the critical path of the graph.
+
+        >>> graph = DepGraph.from_dependency_dictionary(
+        ...     {'bacon': ['spam'], 'eggs': ['spam'], 'spam': []})
+        >>> levels = graph.bottom_levels({'bacon': 1, 'eggs': 3, 'spam': 2})
+        >>> sorted(levels.items())
+        [('bacon', 1), ('eggs', 3), ('spam', 5)]
+
+        This operation is `O(N+E)`, where `N` is the number of nodes and `E`
+        the number of edges of the graph.
+
+        :param dict weights: the weight of each node. Missing nodes have zero
+                             weight.
+        :returns: a dictionary associating each node to its bottom level.
+        :rtype: dict
+        '''
+        order = self.topological_sort()
+        levels = {node: weights.get(node, 0) for node in order}
+        # the dependees of a node come after the node in topological order, so
+        # the bottom level of each node is final when we reach it
+        for node in reversed(order):
+            level = levels[node]
+            for dep in self.dependencies(node):
+                levels[dep] = max(levels[dep], weights.get(dep, 0) + level)
+        return levels
+
     def copy(self):
         '''Return a copy of this graph. '''
         return DepGraph(self._nodes.copy(), self._edges.copy())
@@ -624,13 +679,12 @@ class DepGraph:
 
     def dependees(self, node):
         '''Collect the nodes that depend on the given node. This operation is
-        `O(N)`, where `N` is the number of nodes in the graph.
+        proportional to the number of dependees.
 
-        :returns: A set containing the dependees of `node`.
+        :returns: A list containing the dependees of `node`.
         '''
         i = self._nodes.index(node)
-        indices = set(n for n in range(len(self)) if i in self._edges[n])
-        return list(self._nodes[i] for i in indices)
+        return [self._nodes[k] for k in self._redges[i]]
 
     def to_graphviz(self):
         '''Convert the graph to graphviz format.
@@ -674,6 +728,7 @@ class DepGraph:
                 to_remove |= _visit(self._edges[i_node], j_node)
             for j in to_remove:
                 self._edges[i_node].remove(j)
+                self._redges[j].discard(i_node)
 
         return self
 
@@ -700,6 +755,7 @@ class DepGraph:
                 to_add |= _visit(self._edges[i_node], j_node)
             for j in to_add:
                 self._edges[i_node].add(j)
+                self._redges[j].add(i_node)
 
         return self
 
@@ -712,12 +768,8 @@ class DepGraph:
         :returns: The list of initial nodes.
         '''
 
-        index_set = set(range(len(self)))
-        itarget_set = set()
-        for vals in self._edges.values():
-            itarget_set |= set(vals)
-        index_set.difference_update(itarget_set)
-        return [self._nodes[i] for i in index_set]
+        return [self._nodes[i] for i in range(len(self))
+                if not self._redges[i]]
 
     def terminal(self):
         '''Return the terminal nodes of the graph.
@@ -728,11 +780,15 @@ class DepGraph:
         :returns: The list of terminal nodes.
         '''
 
-        return [n for n in self._nodes if len(self[n]) == 0]
+        return [self._nodes[i] for i in range(len(self))
+                if not self._edges[i]]
 
     def graft(self, node):
         '''Graft the given node into the graph.
 
+        This operation is proportional to the size of `node`, plus the number
+        of edges that are added to connect it to the rest of the graph.
+
         :param DepGraph node: A DepGraph embedded as a graph node.
         '''
 
@@ -751,16 +807,21 @@ class DepGraph:
         LOGGER.debug('Dependees = %s', dependees)
         self += node  # merge
         LOGGER.debug('Merged graph = %r', self)
+        index = self._nodes.index
+        i_terms = [index(term) for term in terms]
+        i_inits = [index(init) for init in inits]
         for dep in deps:
-            for term in terms:
-                LOGGER.debug('Adding dependency of %s on %s',
-                             term, dep)
-                self.add_dependency(term, on=dep)
+            LOGGER.debug('Adding dependencies of %s on %s', terms, dep)
+            i_dep = index(dep)
+            for i_term in i_terms:
+                self._edges[i_term].add(i_dep)
+                self._redges[i_dep].add(i_term)
         for dependee in dependees:
-            for init in inits:
-                LOGGER.debug('Adding dependency of %s on %s',
-                             dependee, init)
-                self.add_dependency(dependee, on=init)
+            LOGGER.debug('Adding dependencies of %s on %s', dependee, inits)
+            i_dependee = index(dependee)
+            self._edges[i_dependee].update(i_inits)
+            for i_init in i_inits:
+                self._redges[i_init].add(i_dependee)
         LOGGER.debug('Grafted graph = %r', self)
 
         return self
@@ -772,14 +833,17 @@ class DepGraph:
                              all nodes are flat.
         '''
         nodes = [n for n in self._nodes if isinstance(n, DepGraph)]
+        LOGGER.debug('flatten() will graft the following nodes: %s', nodes)
         while nodes:
-            LOGGER.debug('flatten() will graft the following nodes: %s',
-                         nodes)
-            for node in nodes:
-                self.graft(node)
-            if not recurse:
-                break
-            nodes = [n for n in self._nodes if isinstance(n, DepGraph)]
+            node = nodes.pop()
+            if node not in self:
+                # already grafted, because it was nested in several places
+                continue
+            self.graft(node)
+            if recurse:
+                # the DepGraph nodes of the grafted graph are now ours
+                nodes.extend(n for n in node.nodes()
+                             if isinstance(n, DepGraph))
         return self
 
     def depends(self, node1, node2, recurse=False):
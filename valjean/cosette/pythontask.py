@@ -289,7 +289,8 @@ class TaskException(Exception):
 class PythonTask(Task):
     '''Task that executes specified Python code.'''
     def __init__(self, name, func, *, args=None, kwargs=None,
-                 env_kwarg=None, config_kwarg=None, deps=None, soft_deps=None):
+                 env_kwarg=None, config_kwarg=None, deps=None, soft_deps=None,
+                 resources=None):
         # pylint: disable=too-many-arguments
         '''Initialize the task with a function, a tuple of arguments and a
         dictionary of kwargs.
@@ -314,8 +315,12 @@ class PythonTask(Task):
                           (and valjean cannot automatically discover this),
                           pass them (as a list) to the `soft_deps` parameter.
         :type soft_deps: None or collection of :class:`~.Task` objects.
+        :param resources: The resources required by this task (see
+                          :class:`~.Task`).
+        :type resources: dict(str, int or float) or None
         '''
-        super().__init__(name=name, deps=deps, soft_deps=soft_deps)
+        super().__init__(name=name, deps=deps, soft_deps=soft_deps,
+                         resources=resources)
         self.func = func
         self.args = copy.deepcopy(args) if args is not None else ()
         self.kwargs = copy.deepcopy(kwargs) if kwargs is not None else {}
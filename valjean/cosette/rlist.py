@@ -173,6 +173,15 @@ class RList(MutableSequence):
     def __delitem__(self, index):
         if index < 0:
             index += len(self)
+        if index == len(self) - 1:
+            # deleting the last element does not shift any index, O(1)
+            obj_id = self._key(self._seq[index])
+            indices = self._index[obj_id]
+            indices.remove(index)
+            if not indices:
+                del self._index[obj_id]
+            del self._seq[index]
+            return
         # Decrease all mapped indices
         delete_ids = []
         for obj_id, indices in self._index.items():
@@ -225,6 +234,12 @@ class RList(MutableSequence):
         self._seq.insert(index, value)
         self._index[self._key(value)].append(index)
 
+    def append(self, value):
+        '''Append an element at the end of the list. Contrary to
+        :meth:`insert`, this operation is `O(1)`.'''
+        self._index[self._key(value)].append(len(self._seq))
+        self._seq.append(value)
+
     def index(self, value, start=0, stop=None):
         '''Return the index of the given value, if present.
 
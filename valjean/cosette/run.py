@@ -311,7 +311,7 @@ class RunTask(PythonTask):
         return cls(name, lambda _env, _config: clis, **kwargs)
 
     def __init__(self, name, clis_closure, *, deps=None, soft_deps=None,
-                 **subprocess_args):
+                 resources=None, **subprocess_args):
         '''Initialize this task from a list of command lines.
 
         The `clis_closure` argument must be a closure. It will be invoked at
@@ -334,10 +334,14 @@ class RunTask(PythonTask):
             :meth:`Task.__init__ <valjean.cosette.task.Task.__init__>` for the
             format), or `None`.
         :type soft_deps: list(Task) or None
+        :param resources: The resources required by this task (see
+            :class:`~.Task`), for instance the number of cores used by the
+            executed commands.
+        :type resources: dict(str, int or float) or None
         '''
         super().__init__(name, self.run_task(clis_closure, name,
                                              **subprocess_args),
-                         deps=deps, soft_deps=soft_deps,
+                         deps=deps, soft_deps=soft_deps, resources=resources,
                          env_kwarg='env', config_kwarg='config')
         LOGGER.debug('Created %s task %r', self.__class__.__name__, self.name)
         LOGGER.debug('  - deps = %s', deps)
@@ -512,7 +516,9 @@ class RunTaskFactory:
         LOGGER.debug('creating factory with name: %s', self.name)
 
     def make(self, *, name=None, extra_args=None,
-             subprocess_args=None, deps=None, soft_deps=None, **kwargs):
+             subprocess_args=None, deps=None, soft_deps=None, resources=None,
+             **kwargs):
+        # pylint: disable=too-many-arguments
         '''Create a :class:`RunTask` object.
 
         :param name: the name of the task to be generated, as a string. If
@@ -531,6 +537,9 @@ class RunTaskFactory:
         :type deps: list(Task) or None
         :param soft_deps: A list of soft dependencies for the generated task.
         :type soft_deps: list(Task) or None
+        :param resources: The resources required by the generated task (see
+            :class:`~.Task`).
+        :type resources: dict(str, int or float) or None
         :param kwargs: Any remaining keyword arguments will be used to format
             the command line before execution. The environment and the
             configuration are available at formatting time as ``env`` and
@@ -564,7 +573,7 @@ class RunTaskFactory:
         task = RunTask(task_name, cli_closure,
                        deps=self.deps + deps,
                        soft_deps=self.soft_deps + soft_deps,
-                       **subprocess_args)
+                       resources=resources, **subprocess_args)
         self.cache[task_name] = task
         return task
 
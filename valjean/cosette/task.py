@@ -54,6 +54,25 @@ cannot run unless `B` has successfully completed. If `B` fails, then it makes
 no sense to run `A`.  On the other hand, if task `A` has a **soft dependency**
 on task `B`, it means that `A` will not start before `B`'s termination, but it
 makes sense to run `A` even if `B` fails.
+
+Tasks may also declare the **resources** that they need for their execution,
+as a dictionary associating resource names to amounts. The ``'cores'``
+resource represents the number of processor cores used by the task (one, by
+default); the ``'memory'`` resource represents the amount of memory used by the
+task, in MB. Any other name represents a custom resource, such as a limited
+number of software licences, or the number of tasks that are allowed to
+hammer a file system at the same time:
+
+    >>> task = DelayTask('spam', 0.)
+    >>> task.resources
+    {'cores': 1}
+    >>> task = DelayTask('eggs', 0., resources={'cores': 16, 'memory': 4096,
+    ...                                         'licences': 1})
+    >>> sorted(task.resources.items())
+    [('cores', 16), ('licences', 1), ('memory', 4096)]
+
+The scheduler never starts a task if the requested resources are not
+available (see :class:`~.QueueScheduling`).
 '''
 
 import enum
@@ -84,7 +103,7 @@ class TaskError(Exception):
 class Task(ABC):
     '''Base class for other task classes.'''
 
-    def __init__(self, name, *, deps=None, soft_deps=None):
+    def __init__(self, name, *, deps=None, soft_deps=None, resources=None):
         '''Initialize the task.
 
         :param str name: The name of the task. Task names **must** be unique!
@@ -96,6 +115,11 @@ class Task(ABC):
                           be either `None` (i.e. no dependencies) or list of
                           :class:`Task` objects.
         :type soft_deps: list(Task) or None
+        :param resources: The resources required by this task, as a
+                          dictionary associating resource names to amounts.
+                          The task requires one core by default.
+        :type resources: dict(str, int or float) or None
+        :raises ValueError: if some of the required amounts are negative.
         '''
         LOGGER.debug('creating task %s', name)
         self.name = name
@@ -118,6 +142,13 @@ class Task(ABC):
                 raise TypeError(errmsg)
             self.soft_depends_on.update(soft_deps)
 
+        self.resources = {'cores': 1}
+        if resources is not None:
+            self.resources.update(resources)
+        if any(amount < 0 for amount in self.resources.values()):
+            raise ValueError('negative resource requirements for task '
+                             f'{name}: {self.resources}')
+
     @abstractmethod
     def do(self, env, config):
         '''Perform a task.
@@ -150,13 +181,15 @@ class DelayTask(Task):
     to test scheduling algorithms under different load conditions.
     '''
 
-    def __init__(self, name, delay=1.):
+    def __init__(self, name, delay=1., *, resources=None):
         '''Initialize the task from a given delay.
 
         :param float delay: The amount of time (in seconds) that this task will
                             wait when executed.
+        :param resources: The resources required by this task (see
+                          :class:`Task`).
         '''
-        super().__init__(name)
+        super().__init__(name, resources=resources)
         self.delay = float(delay)
 
     def do(self, env, config):
@@ -33,27 +33,15 @@
 This module is composed of 2 classes:
 
   * :class:`Browser` that stores the list of dictionaries and builds an
-    :class:`Index` to facilitate selections;
-  * :class:`Index` based on :class:`collections.defaultdict` to perform
-    selections on the list of dictionaries
+    index to facilitate selections (an :class:`~.index.Index` or an
+    :class:`~.index.ArrayIndex`, from :mod:`~valjean.eponine.index`);
+  * :class:`BrowserView`, a view on a selection of the items of a
+    :class:`Browser` sharing its content and its index
 
 
-The classes :class:`Index` and :class:`Browser` are meant to be general even if
-they will be shown and used in a specific case: parsing results from Tripoli-4.
-
-
-The :class:`Index` class
-------------------------
-
-This class is based on an inheritance from :class:`collections.abc.Mapping`
-from :mod:`collections`. It implements a ``defaultdict(defaultdict(set))`` from
-:class:`collections.defaultdict`.
-
-:class:`set` contains `int` that corresponds to the index of the dictionary in
-the list of dictionaries.
-
-:class:`Index` is not supposed to be used standalone, but called from
-:class:`Browser`, but this is still possible.
+The classes :class:`~.index.Index` and :class:`Browser` are meant to be
+general even if they will be shown and used in a specific case: parsing results
+from Tripoli-4.
 
 
 The :class:`Browser` class
@@ -196,163 +184,47 @@ keywords
     valjean.eponine.browser.NoItemBrowserError: No item corresponding to the \
 selection.
 
+  * many selections can be resolved at once, in a single pass over the index
+    for all the queries using the same keys, with :func:`Browser.select_many`
+    (one item per query) or :func:`Browser.filter_many` (one
+    :class:`Browser` per query):
+
+    >>> items = com_br.select_many([{'consumer': 'Graham'},
+    ...                             {'menu': '3', 'drink': 'beer'}])
+    >>> [item['consumer'] for item in items]
+    ['Graham', 'Eric']
+    >>> [len(sbr) for sbr in com_br.filter_many([{'drink': 'beer'},
+    ...                                          {'drink': 'wine'}])]
+    [2, 0]
+
+  * errors are reported for each query:
+
+    >>> items = com_br.select_many([{'consumer': 'Graham'}, {'menu': '4'},
+    ...                             {'drink': 'beer'}])
+    Traceback (most recent call last):
+            [...]
+    valjean.eponine.browser.SelectionBrowserError: 2 queries failed:
+    query 1: No item corresponding to the selection {'menu': '4'}.
+    query 2: Several content items correspond to the selection \
+{'drink': 'beer'} (2 items).
+
 Module API
 ----------
 '''
 
 import logging
-from collections import defaultdict
-from collections.abc import Mapping, Container
+from collections.abc import Container
+import numpy as np
+from .index import Index, ArrayIndex, select_ids_many
+# still importable from here, for the environments pickled when it was defined
+# in this module
+# pylint: disable-next=unused-import
+from .index import _make_defaultdict_set  # noqa: F401
 
 
 LOGGER = logging.getLogger(__name__)
 
 
-def _make_defaultdict_set():
-    '''The sole purpose of this function is to give a name to the defaultdict
-    factory in :meth:`Index.index`. Without a name, the :class:`Index` class
-    cannot be serialized by :mod:`pickle`.
-    '''
-    return defaultdict(set)
-
-
-class Index(Mapping):
-    '''Class to describe index used in Browser.
-
-    The structure of Index is a ``defaultdict(defaultdict(set))``.  This class
-    was derived mainly for pretty-printing purposes.
-
-    Quick example of index (menu for 4 persons, identified by numbers, one has
-    no drink):
-
-    >>> from valjean.eponine.browser import Index
-    >>> myindex = Index()
-    >>> myindex.index['drink']['beer'] = {1, 4}
-    >>> myindex.index['drink']['wine'] = {2}
-    >>> myindex.index['menu']['spam'] = {1, 3}
-    >>> myindex.index['menu']['egg'] = {2}
-    >>> myindex.index['menu']['bacon'] = {4}
-    >>> myindex.dump(sort=True)
-    "{'drink': {'beer': {1, 4}, 'wine': {2}}, \
-'menu': {'bacon': {4}, 'egg': {2}, 'spam': {1, 3}}}"
-    >>> 'drink' in myindex
-    True
-    >>> 'consumer' in myindex
-    False
-    >>> len(myindex)
-    2
-    >>> for k in sorted(myindex):
-    ...    print(k, sorted(myindex[k].keys()))
-    drink ['beer', 'wine']
-    menu ['bacon', 'egg', 'spam']
-
-    The :func:`keep_only` method allows to get a sub-Index from a given set of
-    ids (int), removing all keys not involved in the corresponding ids:
-
-    >>> myindex.keep_only({2}).dump(sort=True)
-    "{'drink': {'wine': {2}}, 'menu': {'egg': {2}}}"
-    >>> menu_clients14 = myindex.keep_only({1, 4})
-    >>> sorted(menu_clients14.keys()) == ['drink', 'menu']
-    True
-    >>> list(menu_clients14['drink'].keys()) == ['beer']
-    True
-    >>> list(menu_clients14['drink'].values()) == [{1, 4}]
-    True
-    >>> sorted(menu_clients14['menu'].keys()) == ['bacon', 'spam']
-    True
-    >>> menu_clients14['menu']['spam'] == {1}
-    True
-    >>> 3 in menu_clients14['menu']['spam']
-    False
-    >>> menu_client3 = myindex.keep_only({3})
-    >>> list(menu_client3.keys()) == ['menu']
-    True
-    >>> 'drink' in menu_client3
-    False
-
-    The key ``'drink'`` has been removed from the last index as 2 did not
-    required it.
-
-    If you print an :class:`Index`, it looks like a standard dictionary (``{
-    ... }`` instead of ``defaultdict(...)``) but the keys are not sorted:
-
-    >>> print(myindex)
-    {...: {...: {...}...}}
-    '''
-
-    def __init__(self):
-        self.index = defaultdict(_make_defaultdict_set)
-
-    def __str__(self):
-        lstr = ["{"]
-        for i, (key, dset) in enumerate(list(self.index.items())):
-            lstr.append(f'{key!r}: {{')
-            for j, (dkey, ind) in enumerate(list(dset.items())):
-                lstr.append(f'{dkey!r}: {ind!r}')
-                if j < len(dset) - 1:
-                    lstr.append(', ')
-            lstr.append('}')
-            if i < len(self.index) - 1:
-                lstr.append(', ')
-        lstr.append('}')
-        return ''.join(lstr)
-
-    def __repr__(self):
-        return self.index.__repr__()
-
-    def __getitem__(self, item):
-        return self.index.__getitem__(item)
-
-    def __len__(self):
-        return len(self.index)
-
-    def __iter__(self):
-        return iter(self.index)
-
-    def __contains__(self, key):
-        return self.index.__contains__(key)
-
-    def keep_only(self, ids):
-        '''Get an :class:`Index` containing only the relevant keywords for the
-        required set of ids.
-
-        :param set(int) ids: index corresponding to the required elements of
-          the list of content items
-        :returns: Index only containing the keys involved in the ids
-        '''
-        assert isinstance(ids, set)
-        lind = Index()
-        if not ids:
-            return lind
-        for key in self.index:
-            for kwd, kset in self.index[key].items():
-                tmpset = kset & ids
-                if tmpset:
-                    lind[key][kwd] = tmpset
-        return lind
-
-    def dump(self, *, sort=False):
-        '''Dump the Index.
-
-        If ``sort == False`` (default case), returns :func:`__str__` result,
-        else returns sorted Index (alphabetic order for keys).
-        '''
-        if sort:
-            lstr = ["{"]
-            for i, (key, dset) in enumerate(sorted(self.index.items())):
-                lstr.append(f'{key!r}: {{')
-                for j, (dkey, ind) in enumerate(sorted(dset.items(), key=str)):
-                    lstr.append(f'{dkey!r}: {ind!r}')
-                    if j < len(dset) - 1:
-                        lstr.append(', ')
-                lstr.append('}')
-                if i < len(self.index) - 1:
-                    lstr.append(', ')
-            lstr.append('}')
-            return ''.join(lstr)
-        return str(self)
-
-
 class Browser(Container):
     '''Class to perform selections on results.
 
@@ -371,6 +243,10 @@ class Browser(Container):
     :param str data_key: key in the content items corresponding to results or
       data, that should not be used in index (as always present and mandatory)
     :param dict global_vars: global variables (optional, default=None)
+    :param str index_backend: ``'set'`` (default) to use an
+      :class:`~.index.Index`, ``'array'`` to use an
+      :class:`~.index.ArrayIndex` (recommended for large numbers
+      of items); browsers obtained from this one use the same backend
 
     An additional key is added at the Index construction: ``'index'`` in order
     to keep track of the order of the list and being able to do selection on
@@ -398,6 +274,17 @@ class Browser(Container):
     ...  'results': {'dish_res': ['lobster thermidor', 'Mornay sauce']}}]
     >>> com_br = Browser(orders)
 
+    * the same selections are available whatever the index backend:
+
+      >>> from valjean.eponine.index import ArrayIndex
+      >>> arr_br = Browser(orders, index_backend='array')
+      >>> isinstance(arr_br.index, ArrayIndex)
+      True
+      >>> arr_br.select_by(menu='1', drink='coffee')['consumer']
+      'Graham'
+      >>> len(arr_br.filter_by(drink='beer'))
+      2
+
     * possibility to get the item id directly (internally used method):
 
       >>> ind = com_br._filter_items_id_by(drink='coffee')
@@ -431,14 +318,21 @@ class Browser(Container):
 Index: ...)"
     '''
 
-    def __init__(self, content, data_key='results', global_vars=None):
+    def __init__(self, content, data_key='results', global_vars=None, *,
+                 index_backend='set'):
         self.content = [r.copy() for r in content]
         self.data_key = data_key
+        if index_backend not in self.INDEX_BACKENDS:
+            raise ValueError(f'Unknown index backend {index_backend!r}, '
+                             f'choose among {list(self.INDEX_BACKENDS)}')
+        self.index_backend = index_backend
         self.index = self._build_index()
         LOGGER.debug("Index: %s", self.index)
         self.globals = (global_vars.copy() if isinstance(global_vars, dict)
                         else {})
 
+    INDEX_BACKENDS = {'set': Index, 'array': ArrayIndex}
+
     def __eq__(self, other):
         return (self.content == other.content
                 and self.data_key == other.data_key
@@ -455,8 +349,12 @@ Index: ...)"
 
         :param str data_key: key in list of content items corresponding to
           results or data
-        :returns: :class:`Index`
+        :returns: :class:`~.index.Index` or :class:`~.index.ArrayIndex`
         '''
+        if self.index_backend == 'array':
+            for ielt, elt in enumerate(self.content):
+                elt['index'] = ielt
+            return ArrayIndex.from_items(self.content, self.data_key)
         index = Index()
         for ielt, elt in enumerate(self.content):
             elt['index'] = ielt
@@ -500,7 +398,94 @@ Index: ...)"
         LOGGER.debug("Nb self items (%d) + Nb other items (%d) = %d",
                      len(self), len(other), len(new_content))
         return Browser(new_content, data_key=self.data_key,
-                       global_vars=new_glob)
+                       global_vars=new_glob, index_backend=self.index_backend)
+
+    def extend(self, other):
+        '''Add in place the content of another browser at the end of this
+        one.
+
+        Contrary to :meth:`merge`, the index is not rebuilt: the ids of the
+        items of *other* are shifted by the number of items of this browser
+        and its index entries are added to the existing ones. Global variables
+        are also merged.
+
+        >>> br1 = Browser([{'drink': 'beer', 'results': 1}])
+        >>> br2 = Browser([{'drink': 'wine', 'results': 2},
+        ...                {'drink': 'beer', 'results': 3}])
+        >>> br1.extend(br2)
+        >>> len(br1)
+        3
+        >>> [item['results'] for item in br1.filter_by(drink='beer').content]
+        [1, 3]
+        >>> br1.select_by(drink='wine')['index']
+        1
+
+        A browser can be extended by itself:
+
+        >>> br2.extend(br2)
+        >>> len(br2)
+        4
+        >>> [item['results'] for item in br2.filter_by(drink='beer').content]
+        [3, 3]
+
+        :param Browser other: another browser
+        '''
+        self._extend([other])
+
+    @classmethod
+    def concat(cls, browsers):
+        '''Concatenate a list of browsers in a new one.
+
+        The index of the first browser is copied, then the ones of the other
+        browsers are added with shifted ids, so the cost is linear in the
+        total number of items (instead of quadratic for successive merges).
+        The data key and the index backend are the ones of the first browser.
+
+        :param list(Browser) browsers: browsers to concatenate
+        :rtype: Browser
+        '''
+        browsers = list(browsers)
+        if not browsers:
+            return cls([])
+        first, *others = browsers
+        res = cls(first.content, data_key=first.data_key,
+                  global_vars=first.globals,
+                  index_backend=first.index_backend)
+        res._extend(others)  # pylint: disable=protected-access
+        return res
+
+    def _extend(self, others):
+        '''Add in place the content and the index of other browsers.
+
+        :param list(Browser) others: browsers to add
+        '''
+        indexes, offsets = [], []
+        # the items and index of this browser change below, and the browser
+        # may be one of the others
+        others = [BrowserView(self) if other is self else other
+                  for other in others]
+        for other in others:
+            if self.data_key != other.data_key:
+                raise ValueError('Same data_key is required to merge Browsers')
+            if self.globals != other.globals:
+                LOGGER.debug('globals will be updated with other values')
+            self.globals.update(other.globals)
+            offset = len(self.content)
+            items = [r.copy() for r in other.content]
+            for ielt, elt in enumerate(items, offset):
+                elt['index'] = ielt
+            self.content.extend(items)
+            if (isinstance(other, BrowserView)
+                    or other.index_backend != self.index_backend):
+                # ids of the other index cannot be used as such
+                index = Browser(items, self.data_key,
+                                index_backend=self.index_backend).index
+            else:
+                index = other.index
+            indexes.append(index)
+            offsets.append(offset)
+        LOGGER.debug("Nb items after extension: %d", len(self.content))
+        self.index.extend(indexes, offsets, id_keys=('index',))
 
     def keys(self):
         '''Get the available keys in the index (so in the items list). As
@@ -540,7 +525,6 @@ Index: ...)"
         :return: set of ids
         :rtype: set(int)
         '''
-        itemids = set(range(len(self.content)))
         for kwd, kwarg in kwargs.items():
             if kwd not in self.index:
                 LOGGER.warning("%s not a valid key. Possible ones are %s",
@@ -549,7 +533,7 @@ Index: ...)"
             if kwarg not in self.index[kwd]:
                 LOGGER.warning("%s is not a valid %s", kwarg, kwd)
                 return set()
-            itemids = itemids & self.index[kwd][kwarg]
+        itemids = self.index.select_ids(kwargs, len(self.content))
         if not itemids:
             LOGGER.warning("Wrong selection, item might be not present. "
                            "Also check if requirements are consistent.")
@@ -562,7 +546,7 @@ Index: ...)"
 
         :param \\**\\kwargs: keyword arguments to specify the required item.
             More than one are allowed.
-        :returns: :class:`Index` (stripped from useless keys)
+        :returns: :class:`~.index.Index` (stripped from useless keys)
         '''
         itemids = self._filter_items_id_by(**kwargs)
         return self.index.keep_only(itemids)
@@ -586,9 +570,28 @@ Index: ...)"
         lresp = [self.content[i] for i in sorted(respids)
                  if sincl.issubset(self.content[i])
                  and not sexcl.intersection(self.content[i])]
-        sub_br = Browser(lresp, global_vars=self.globals)
+        sub_br = Browser(lresp, global_vars=self.globals,
+                         index_backend=self.index_backend)
         return sub_br
 
+    def filter_view(self, include=(), exclude=(), **kwargs):
+        '''Get a :class:`BrowserView` corresponding to selection from
+        keyword arguments.
+
+        Contrary to :meth:`filter_by`, neither the content nor the index are
+        copied: the view shares them with this browser and only stores the
+        ids of the selected items.
+
+        :param \\**\\kwargs: keyword arguments to specify the required item.
+            More than one are allowed.
+        :param tuple(str) include: metadata keys required in the content items
+            but for which the value is not necessarly known
+        :param tuple(str) exclude: metadata that should not be present in the
+            items and for which the value is not necessarly known
+        :rtype: BrowserView
+        '''
+        return BrowserView(self).filter_by(include, exclude, **kwargs)
+
     def select_by(self, *, include=(), exclude=(), **kwargs):
         '''Get an item or the list of items from content corresponding to
         selection from keyword arguments.
@@ -617,6 +620,298 @@ Index: ...)"
                 "please refine your selection using additional keywords")
         return litems[0]
 
+    def _select_ids_many(self, queries):
+        '''Get the sorted ids of the items matching each query (see
+        :func:`~.index.select_ids_many`).
+
+        :param list(dict) queries: selections
+        :rtype: list(list(int))
+        '''
+        return [sorted(self._filter_items_id_by(**query)) if ids is None
+                else ids
+                for query, ids in zip(queries, select_ids_many(
+                    self.index, len(self.content), queries))]
+
+    def _items_many(self, queries, include, exclude):
+        '''Get the content items matching each query (and the include and
+        exclude criteria).'''
+        sincl, sexcl = set(include), set(exclude)
+        return [[self.content[i] for i in ids
+                 if sincl.issubset(self.content[i])
+                 and not sexcl.intersection(self.content[i])]
+                for ids in self._select_ids_many(queries)]
+
+    def filter_many(self, queries, include=(), exclude=()):
+        '''Get the Browsers corresponding to many selections, as
+        :meth:`filter_by` would do for each of them.
+
+        Queries using the same set of keys are resolved together, in a single
+        pass over the index. No warning is emitted for the queries selecting
+        no item, the corresponding browsers are empty.
+
+        :param list(dict) queries: keyword arguments of each selection
+        :param tuple(str) include: metadata keys required in the content items
+            (for all queries)
+        :param tuple(str) exclude: metadata that should not be present in the
+            items (for all queries)
+        :returns: one browser per query
+        :rtype: list(Browser)
+        '''
+        return [Browser(items, global_vars=self.globals,
+                        index_backend=self.index_backend)
+                for items in self._items_many(queries, include, exclude)]
+
+    def select_many(self, queries, *, include=(), exclude=(),
+                    errors='raise'):
+        '''Get the content items corresponding to many selections, as
+        :meth:`select_by` would do for each of them.
+
+        Queries using the same set of keys are resolved together, in a single
+        pass over the index.
+
+        :param list(dict) queries: keyword arguments of each selection
+        :param tuple(str) include: metadata keys required in the items (for
+            all queries)
+        :param tuple(str) exclude: metadata that should not be present in the
+            items (for all queries)
+        :param str errors: if ``'raise'`` (default), raise a
+            :exc:`SelectionBrowserError` describing all the queries that
+            failed; if ``'return'``, the exception corresponding to a failed
+            query (:exc:`NoItemBrowserError` or
+            :exc:`TooManyItemsBrowserError`) is returned in place of the item
+        :raises SelectionBrowserError: if no item or more than one item
+            correspond to some queries and `errors` is ``'raise'``
+        :returns: one item per query
+        :rtype: list(dict)
+        '''
+        if errors not in ('raise', 'return'):
+            raise ValueError(f"errors should be 'raise' or 'return', "
+                             f"not {errors!r}")
+        res, failed = [], {}
+        for iquery, (query, litems) in enumerate(
+                zip(queries, self._items_many(queries, include, exclude))):
+            if len(litems) == 1:
+                res.append(litems[0])
+                continue
+            if not litems:
+                err = NoItemBrowserError(
+                    f"No item corresponding to the selection {query!r}.")
+            else:
+                err = TooManyItemsBrowserError(
+                    f"Several content items correspond to the selection "
+                    f"{query!r} ({len(litems)} items).")
+            failed[iquery] = err
+            res.append(err)
+        if failed and errors == 'raise':
+            raise SelectionBrowserError(failed)
+        return res
+
+
+class BrowserView(Browser):
+    '''View on a selection of the items of a :class:`Browser`.
+
+    The view shares the content, the index and the global variables of the
+    browser it comes from and only stores the ids of the selected items (their
+    positions in the content of the browser). Selections on a view
+    (:meth:`filter_by`, :meth:`select_by`, etc.) and merge of views of the
+    same browser only work on these ids: no content item is copied and no
+    index is rebuilt. As a consequence the ``'index'`` metadata of the items
+    are the ones of the original browser.
+
+    >>> from valjean.eponine.browser import Browser
+    >>> orders = [
+    ... {'menu': '1', 'consumer': 'Terry', 'drink': 'beer', 'results': 1},
+    ... {'menu': '2', 'consumer': 'John', 'results': 2},
+    ... {'menu': '1', 'consumer': 'Graham', 'drink': 'coffee', 'results': 3},
+    ... {'menu': '3', 'consumer': 'Eric', 'drink': 'beer', 'results': 4}]
+    >>> com_br = Browser(orders)
+    >>> beer_view = com_br.filter_view(drink='beer')
+    >>> beer_view.ids
+    [0, 3]
+    >>> beer_view.select_by(menu='3')['consumer']
+    'Eric'
+    >>> beer_view.select_by(menu='3') is com_br.content[3]
+    True
+    >>> sorted(beer_view.available_values('consumer'))
+    ['Eric', 'Terry']
+    >>> 'drink' in beer_view.filter_by(menu='2')
+    False
+    >>> beer_view.merge(com_br.filter_view(menu='2')).ids
+    [0, 1, 3]
+    >>> beer_view.merge(com_br.filter_view(menu='3')).ids
+    [0, 3]
+
+    A standalone browser, with its own content and index, can be built from a
+    view:
+
+    >>> beer_br = beer_view.to_browser()
+    >>> [item['index'] for item in beer_br.content]
+    [0, 1]
+    '''
+
+    def __init__(self, browser, ids=None):
+        '''Initialize the view.
+
+        :param Browser browser: the browser to look at (if it is a view, the
+            view is built on the browser it comes from)
+        :param list(int) ids: ids of the selected items in the content of the
+            browser (default: all the items)
+        '''
+        # pylint: disable=super-init-not-called
+        if isinstance(browser, BrowserView):
+            ids = browser.ids if ids is None else ids
+            browser = browser.browser
+        self.browser = browser
+        self.ids = (list(range(len(browser.content))) if ids is None
+                    else list(ids))
+        self.data_key = browser.data_key
+        self.index_backend = browser.index_backend
+        self.globals = browser.globals
+        self._index = None
+        self._pos = None
+
+    @property
+    def content(self):
+        '''Selected content items (shared with the original browser).'''
+        return [self.browser.content[i] for i in self.ids]
+
+    @property
+    def index(self):
+        '''Index of the original browser restricted to the selected items
+        (built at first use).'''
+        if self._index is None:
+            self._index = self.browser.index.keep_only(set(self.ids))
+        return self._index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def is_empty(self):
+        '''Check if the view is empty or not (no selected item and no
+        globals).'''
+        return not self.ids and not self.globals
+
+    def to_browser(self):
+        '''Build a standalone :class:`Browser` from the view.
+
+        :rtype: Browser
+        '''
+        return Browser(self.content, data_key=self.data_key,
+                       global_vars=self.globals,
+                       index_backend=self.index_backend)
+
+    def merge(self, other):
+        '''Merge two browsers.
+
+        If `other` is a view of the same browser, the merged view is the
+        union of the selected ids (items selected by both views appear once,
+        in the order of the content of the browser), else a new
+        :class:`Browser` is built as in :meth:`Browser.merge`.
+
+        :param Browser other: another browser or view
+        :rtype: BrowserView or Browser
+        '''
+        if ((isinstance(other, BrowserView) and other.browser is self.browser
+             and other.globals == self.globals)):
+            return BrowserView(self.browser,
+                               np.union1d(self.ids, other.ids)
+                               .astype(int).tolist())
+        return super().merge(other)
+
+    def _extend(self, others):
+        raise TypeError('BrowserView cannot be extended in place, use merge '
+                        'or to_browser')
+
+    def _filter_items_id_by(self, **kwargs):
+        '''Selection of the ids of the items (in the original browser)
+        according to kwargs criteria.
+
+        :rtype: set(int)
+        '''
+        for kwd, kwarg in kwargs.items():
+            if kwd not in self.browser.index:
+                LOGGER.warning("%s not a valid key. Possible ones are %s",
+                               kwd, sorted(self.browser.keys()))
+                return set()
+            if kwarg not in self.browser.index[kwd]:
+                LOGGER.warning("%s is not a valid %s", kwarg, kwd)
+                return set()
+        itemids = self.browser.index.select_ids(kwargs, len(self.browser))
+        itemids.intersection_update(self.ids)
+        if not itemids:
+            LOGGER.warning("Wrong selection, item might be not present. "
+                           "Also check if requirements are consistent.")
+        return itemids
+
+    def _keep(self, ids, include, exclude):
+        '''Keep the ids of the items matching the include and exclude
+        criteria, in the order of the view.'''
+        sincl, sexcl = set(include), set(exclude)
+        content = self.browser.content
+        if self._pos is None:
+            self._pos = {iid: pos for pos, iid in enumerate(self.ids)}
+        order = sorted((i for i in ids if i in self._pos),
+                       key=self._pos.__getitem__)
+        return [i for i in order
+                if sincl.issubset(content[i])
+                and not sexcl.intersection(content[i])]
+
+    def filter_by(self, include=(), exclude=(), **kwargs):
+        '''Get a view corresponding to selection from keyword arguments,
+        see :meth:`Browser.filter_by`.
+
+        :rtype: BrowserView
+        '''
+        ids = (self._filter_items_id_by(**kwargs) if kwargs
+               else set(self.ids))
+        return BrowserView(self.browser, self._keep(ids, include, exclude))
+
+    def filter_view(self, include=(), exclude=(), **kwargs):
+        '''Same as :meth:`filter_by`.
+
+        :rtype: BrowserView
+        '''
+        return self.filter_by(include, exclude, **kwargs)
+
+    def select_by(self, *, include=(), exclude=(), **kwargs):
+        '''Get the item corresponding to selection from keyword arguments,
+        see :meth:`Browser.select_by`.
+
+        :raises NoItemBrowserError: if no item corresponds to the selection
+        :raises TooManyItemsBrowserError: if more than one item corresponds to
+          the provided keywords
+        :rtype: dict
+        '''
+        ids = self.filter_by(include, exclude, **kwargs).ids
+        if not ids:
+            raise NoItemBrowserError("No item corresponding to the selection.")
+        if len(ids) > 1:
+            raise TooManyItemsBrowserError(
+                "Several content items correspond to your choice, "
+                "please refine your selection using additional keywords")
+        return self.browser.content[ids[0]]
+
+    def _ids_many(self, queries, include, exclude):
+        '''Get the ids of the items (in the original browser) matching each
+        query.'''
+        # pylint: disable=protected-access
+        return [self._keep(ids, include, exclude)
+                for ids in self.browser._select_ids_many(queries)]
+
+    def _items_many(self, queries, include, exclude):
+        content = self.browser.content
+        return [[content[i] for i in ids]
+                for ids in self._ids_many(queries, include, exclude)]
+
+    def filter_many(self, queries, include=(), exclude=()):
+        '''Get the views corresponding to many selections, see
+        :meth:`Browser.filter_many`.
+
+        :rtype: list(BrowserView)
+        '''
+        return [BrowserView(self.browser, ids)
+                for ids in self._ids_many(queries, include, exclude)]
+
 
 class TooManyItemsBrowserError(LookupError):
     '''Error to :class:`Browser` when too many items correspond to the
@@ -626,3 +921,19 @@ class TooManyItemsBrowserError(LookupError):
 
 class NoItemBrowserError(LookupError):
     '''Error to :class:`Browser` when no item corresponds to the selection.'''
+
+
+class SelectionBrowserError(LookupError):
+    '''Error to :class:`Browser` when some selections of
+    :meth:`Browser.select_many` failed.
+
+    The errors of the failed queries, :exc:`NoItemBrowserError` or
+    :exc:`TooManyItemsBrowserError`, are available in the :attr:`errors`
+    dictionary, with the indices of the queries as keys.
+    '''
+
+    def __init__(self, errors):
+        self.errors = errors
+        msg = '\n'.join(f'query {iquery}: {err}'
+                        for iquery, err in errors.items())
+        super().__init__(f'{len(errors)} queries failed:\n{msg}')
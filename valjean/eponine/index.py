@@ -0,0 +1,634 @@
+# Copyright French Alternative Energies and Atomic Energy Commission
+# Contributors: valjean developers
+# valjean-support@cea.fr
+#
+# This software is a computer program whose purpose is to analyze and
+# post-process numerical simulation results.
+#
+# This software is governed by the CeCILL license under French law and abiding
+# by the rules of distribution of free software. You can use, modify and/ or
+# redistribute the software under the terms of the CeCILL license as circulated
+# by CEA, CNRS and INRIA at the following URL: http://www.cecill.info.
+#
+# As a counterpart to the access to the source code and rights to copy, modify
+# and redistribute granted by the license, users are provided only with a
+# limited warranty and the software's author, the holder of the economic
+# rights, and the successive licensors have only limited liability.
+#
+# In this respect, the user's attention is drawn to the risks associated with
+# loading, using, modifying and/or developing or reproducing the software by
+# the user in light of its specific status of free software, that may mean that
+# it is complicated to manipulate, and that also therefore means that it is
+# reserved for developers and experienced professionals having in-depth
+# computer knowledge. Users are therefore encouraged to load and test the
+# software's suitability as regards their requirements in conditions enabling
+# the security of their systems and/or data to be ensured and, more generally,
+# to use and operate it in the same conditions as regards security.
+#
+# The fact that you are presently reading this means that you have had
+# knowledge of the CeCILL license and that you accept its terms.
+
+
+'''Indexes used by :class:`~valjean.eponine.browser.Browser` to perform
+selections on lists of dictionaries.
+
+This module is composed of 2 classes:
+
+  * :class:`Index` based on :class:`collections.defaultdict` to perform
+    selections on the list of dictionaries
+  * :class:`ArrayIndex`, an alternative to :class:`Index` based on
+    :mod:`numpy` arrays, for browsers with a large number of items
+
+and of the :func:`select_ids_many` function, resolving many selections at
+once with any of them.
+
+
+The :class:`Index` class
+------------------------
+
+This class is based on an inheritance from :class:`collections.abc.Mapping`
+from :mod:`collections`. It implements a ``defaultdict(defaultdict(set))`` from
+:class:`collections.defaultdict`.
+
+:class:`set` contains `int` that corresponds to the index of the dictionary in
+the list of dictionaries.
+
+:class:`Index` is not supposed to be used standalone, but called from
+:class:`~valjean.eponine.browser.Browser`, but this is still possible.
+
+
+The :class:`ArrayIndex` class
+-----------------------------
+
+For large numbers of items (typically more than 100 000, from merged
+listings), the :class:`ArrayIndex` can be used instead (``index_backend``
+argument of :class:`~valjean.eponine.browser.Browser`): for each key, it
+stores a :mod:`numpy` array of codes (one per item) and the dictionary of
+values corresponding to the codes. Items ids corresponding to each value are
+kept as sorted arrays, so that selections are done with vectorized operations
+on arrays instead of intersections of Python sets.
+
+
+Module API
+----------
+'''
+
+import logging
+from collections import defaultdict
+from collections.abc import Mapping
+import numpy as np
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _make_defaultdict_set():
+    '''The sole purpose of this function is to give a name to the defaultdict
+    factory in :meth:`Index.index`. Without a name, the :class:`Index` class
+    cannot be serialized by :mod:`pickle`.
+    '''
+    return defaultdict(set)
+
+
+class Index(Mapping):
+    '''Class to describe index used in Browser.
+
+    The structure of Index is a ``defaultdict(defaultdict(set))``.  This class
+    was derived mainly for pretty-printing purposes.
+
+    Quick example of index (menu for 4 persons, identified by numbers, one has
+    no drink):
+
+    >>> from valjean.eponine.index import Index
+    >>> myindex = Index()
+    >>> myindex.index['drink']['beer'] = {1, 4}
+    >>> myindex.index['drink']['wine'] = {2}
+    >>> myindex.index['menu']['spam'] = {1, 3}
+    >>> myindex.index['menu']['egg'] = {2}
+    >>> myindex.index['menu']['bacon'] = {4}
+    >>> myindex.dump(sort=True)
+    "{'drink': {'beer': {1, 4}, 'wine': {2}}, \
+'menu': {'bacon': {4}, 'egg': {2}, 'spam': {1, 3}}}"
+    >>> 'drink' in myindex
+    True
+    >>> 'consumer' in myindex
+    False
+    >>> len(myindex)
+    2
+    >>> for k in sorted(myindex):
+    ...    print(k, sorted(myindex[k].keys()))
+    drink ['beer', 'wine']
+    menu ['bacon', 'egg', 'spam']
+
+    The :func:`keep_only` method allows to get a sub-Index from a given set of
+    ids (int), removing all keys not involved in the corresponding ids:
+
+    >>> myindex.keep_only({2}).dump(sort=True)
+    "{'drink': {'wine': {2}}, 'menu': {'egg': {2}}}"
+    >>> menu_clients14 = myindex.keep_only({1, 4})
+    >>> sorted(menu_clients14.keys()) == ['drink', 'menu']
+    True
+    >>> list(menu_clients14['drink'].keys()) == ['beer']
+    True
+    >>> list(menu_clients14['drink'].values()) == [{1, 4}]
+    True
+    >>> sorted(menu_clients14['menu'].keys()) == ['bacon', 'spam']
+    True
+    >>> menu_clients14['menu']['spam'] == {1}
+    True
+    >>> 3 in menu_clients14['menu']['spam']
+    False
+    >>> menu_client3 = myindex.keep_only({3})
+    >>> list(menu_client3.keys()) == ['menu']
+    True
+    >>> 'drink' in menu_client3
+    False
+
+    The key ``'drink'`` has been removed from the last index as 2 did not
+    required it.
+
+    If you print an :class:`Index`, it looks like a standard dictionary (``{
+    ... }`` instead of ``defaultdict(...)``) but the keys are not sorted:
+
+    >>> print(myindex)
+    {...: {...: {...}...}}
+    '''
+
+    def __init__(self):
+        self.index = defaultdict(_make_defaultdict_set)
+
+    def __str__(self):
+        lstr = ["{"]
+        for i, (key, dset) in enumerate(list(self.index.items())):
+            lstr.append(f'{key!r}: {{')
+            for j, (dkey, ind) in enumerate(list(dset.items())):
+                lstr.append(f'{dkey!r}: {ind!r}')
+                if j < len(dset) - 1:
+                    lstr.append(', ')
+            lstr.append('}')
+            if i < len(self.index) - 1:
+                lstr.append(', ')
+        lstr.append('}')
+        return ''.join(lstr)
+
+    def __repr__(self):
+        return self.index.__repr__()
+
+    def __getitem__(self, item):
+        return self.index.__getitem__(item)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __contains__(self, key):
+        return self.index.__contains__(key)
+
+    def keep_only(self, ids):
+        '''Get an :class:`Index` containing only the relevant keywords for the
+        required set of ids.
+
+        :param set(int) ids: index corresponding to the required elements of
+          the list of content items
+        :returns: Index only containing the keys involved in the ids
+        '''
+        assert isinstance(ids, set)
+        lind = Index()
+        if not ids:
+            return lind
+        for key in self.index:
+            for kwd, kset in self.index[key].items():
+                tmpset = kset & ids
+                if tmpset:
+                    lind[key][kwd] = tmpset
+        return lind
+
+    def extend(self, others, offsets, id_keys=()):
+        '''Add in place the entries of other indexes, their ids being
+        shifted by the given offsets. Existing entries are not modified.
+
+        >>> ind1, ind2 = Index(), Index()
+        >>> ind1['drink']['beer'] = {0}
+        >>> ind1['index'][0] = {0}
+        >>> ind2['drink']['beer'] = {0}
+        >>> ind2['drink']['wine'] = {1}
+        >>> ind2['index'][0] = {0}
+        >>> ind2['index'][1] = {1}
+        >>> ind1.extend([ind2], [1], id_keys=('index',))
+        >>> ind1.dump(sort=True)
+        "{'drink': {'beer': {0, 1}, 'wine': {2}}, \
+'index': {0: {0}, 1: {1}, 2: {2}}}"
+
+        :param list(Index) others: indexes to add (not including this one)
+        :param list(int) offsets: offset of the ids of each index
+        :param tuple(str) id_keys: keys whose values are ids too (and should
+            also be shifted)
+        :raises ValueError: if the index is extended by itself
+        '''
+        if any(other is self for other in others):
+            raise ValueError('an index cannot be extended by itself')
+        for other, offset in zip(others, offsets):
+            for key, kdict in other.items():
+                sdict = self.index[key]
+                shift = key in id_keys
+                for val, ids in kdict.items():
+                    sdict[val + offset if shift else val].update(
+                        i + offset for i in ids)
+
+    def select_ids(self, criteria, nitems):
+        '''Get the ids of the items matching all the criteria.
+
+        The keys and values of the criteria are supposed to be in the index.
+
+        :param dict criteria: required values of the keys
+        :param int nitems: total number of items (used if no criterion)
+        :rtype: set(int)
+        '''
+        sets = sorted((self.index[key][val] for key, val in criteria.items()),
+                      key=len)
+        if not sets:
+            return set(range(nitems))
+        return sets[0].intersection(*sets[1:])
+
+    def dump(self, *, sort=False):
+        '''Dump the Index.
+
+        If ``sort == False`` (default case), returns :func:`__str__` result,
+        else returns sorted Index (alphabetic order for keys).
+        '''
+        if sort:
+            lstr = ["{"]
+            for i, (key, dset) in enumerate(sorted(self.index.items())):
+                lstr.append(f'{key!r}: {{')
+                for j, (dkey, ind) in enumerate(sorted(dset.items(), key=str)):
+                    lstr.append(f'{dkey!r}: {ind!r}')
+                    if j < len(dset) - 1:
+                        lstr.append(', ')
+                lstr.append('}')
+                if i < len(self.index) - 1:
+                    lstr.append(', ')
+            lstr.append('}')
+            return ''.join(lstr)
+        return str(self)
+
+
+class _ArrayColumn(Mapping):
+    '''Values of a key of :class:`ArrayIndex`, seen as a mapping from the
+    values to the sets of ids of the items.'''
+
+    def __init__(self, index, key):
+        self.index = index
+        self.key = key
+
+    def __getitem__(self, value):
+        return set(self.index.value_ids(self.key, value).tolist())
+
+    def __contains__(self, value):
+        return value in self.index.values[self.key]
+
+    def __iter__(self):
+        return iter(self.index.values[self.key])
+
+    def __len__(self):
+        return len(self.index.values[self.key])
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class ArrayIndex(Index):
+    '''Index based on :mod:`numpy` arrays.
+
+    For each key, the index stores an array of codes, one per item (``-1`` if
+    the item does not have the key), and the dictionary of the values
+    corresponding to the codes. The sorted arrays of ids of the items
+    corresponding to each value are built when the key is used in a selection
+    for the first time; the ids matching a selection are then obtained by
+    vectorized filtering of the smallest of these arrays with the codes of the
+    other keys.
+
+    Seen as a :class:`collections.abc.Mapping`, it behaves like
+    :class:`Index`: values of a key are mapped to sets of ids.
+
+    >>> from valjean.eponine.index import ArrayIndex
+    >>> items = [{'drink': 'beer', 'menu': 'spam'}, {'drink': 'wine'},
+    ...          {'menu': 'spam'}, {'drink': 'beer', 'menu': 'bacon'}]
+    >>> myindex = ArrayIndex.from_items(items)
+    >>> myindex.dump(sort=True)
+    "{'drink': {'beer': {0, 3}, 'wine': {1}}, \
+'menu': {'bacon': {3}, 'spam': {0, 2}}}"
+    >>> myindex.codes['drink']
+    array([ 0,  1, -1,  0], dtype=int32)
+    >>> myindex.select_ids({'drink': 'beer', 'menu': 'spam'}, len(items))
+    {0}
+    >>> myindex.keep_only({1, 2}).dump(sort=True)
+    "{'drink': {'wine': {1}}, 'menu': {'spam': {2}}}"
+    '''
+
+    def __init__(self, nitems=0):
+        # pylint: disable=super-init-not-called
+        self.nitems = nitems
+        self.codes = {}
+        self.values = {}
+        self._ids = {}
+
+    @classmethod
+    def from_items(cls, items, data_key=None):
+        '''Build the index from a list of dictionaries.
+
+        :param list(dict) items: items to index
+        :param str data_key: key of the items that should not be indexed
+        :rtype: ArrayIndex
+        '''
+        index = cls(len(items))
+        columns = {}
+        for ielt, elt in enumerate(items):
+            for key, val in elt.items():
+                if key == data_key:
+                    continue
+                values, ids, codes = columns.setdefault(key, ({}, [], []))
+                ids.append(ielt)
+                codes.append(values.setdefault(val, len(values)))
+        for key, (values, ids, codes) in columns.items():
+            index.add_column(key, values, ids, codes)
+        return index
+
+    def add_column(self, key, values, ids, codes):
+        '''Add a key to the index.
+
+        :param str key: the key
+        :param dict values: values of the key and their codes
+        :param ids: ids of the items having the key
+        :type ids: list(int) or numpy.ndarray
+        :param codes: codes of the values for these items
+        :type codes: list(int) or numpy.ndarray
+        '''
+        self.values[key] = values
+        self.codes[key] = np.full(self.nitems, -1, dtype=np.int32)
+        self.codes[key][ids] = codes
+        self._ids.pop(key, None)
+
+    def value_ids(self, key, value):
+        '''Get the sorted array of the ids of the items having the given
+        value for the given key.
+
+        :rtype: numpy.ndarray
+        '''
+        if key not in self._ids:
+            codes = self.codes[key]
+            order = np.argsort(codes, kind='stable')
+            bounds = np.cumsum(np.bincount(codes + 1,
+                                           minlength=len(self.values[key])+1))
+            self._ids[key] = np.split(order, bounds[:-1])[1:]
+        return self._ids[key][self.values[key][value]]
+
+    @property
+    def index(self):
+        '''Mapping from the keys to their values, for compatibility with
+        :class:`Index`.'''
+        return {key: _ArrayColumn(self, key) for key in self.values}
+
+    def __getitem__(self, item):
+        if item not in self.values:
+            raise KeyError(item)
+        return _ArrayColumn(self, item)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __repr__(self):
+        return repr(self.index)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_ids'] = {}
+        return state
+
+    def select_ids(self, criteria, nitems):
+        '''Get the ids of the items matching all the criteria.
+
+        The ids of the least frequent value are filtered using the codes of
+        the other keys, so the cost is proportional to the number of these
+        ids, not to the total number of items.
+
+        :param dict criteria: required values of the keys
+        :param int nitems: total number of items (used if no criterion)
+        :rtype: set(int)
+        '''
+        if not criteria:
+            return set(range(nitems))
+        arrays = {key: self.value_ids(key, val)
+                  for key, val in criteria.items()}
+        first = min(arrays, key=lambda key: len(arrays[key]))
+        ids = arrays[first]
+        for key, val in criteria.items():
+            if key != first and ids.size:
+                ids = ids[self.codes[key][ids] == self.values[key][val]]
+        return set(ids.tolist())
+
+    def keep_only(self, ids):
+        '''Get an :class:`ArrayIndex` containing only the relevant keywords
+        for the required set of ids (ids are unchanged).
+
+        :param set(int) ids: index corresponding to the required elements of
+          the list of content items
+        :rtype: ArrayIndex
+        '''
+        assert isinstance(ids, set)
+        lind = ArrayIndex(self.nitems)
+        if not ids:
+            return lind
+        mask = np.zeros(self.nitems, dtype=bool)
+        mask[list(ids)] = True
+        for key, codes in self.codes.items():
+            kept = np.flatnonzero(mask & (codes >= 0))
+            if kept.size == 0:
+                continue
+            old_codes, new_codes = np.unique(codes[kept], return_inverse=True)
+            all_values = list(self.values[key])
+            values = {all_values[code]: i for i, code in enumerate(old_codes)}
+            lind.add_column(key, values, kept,
+                            new_codes.astype(np.int32).ravel())
+        return lind
+
+    def extend(self, others, offsets, id_keys=()):
+        '''Add in place the entries of other indexes, the ids of their items
+        following the ones of this index. All the indexes are concatenated at
+        once: existing codes are kept and the codes of the other indexes are
+        translated to the codes of this one.
+
+        :param list(ArrayIndex) others: indexes to add (not including this
+            one)
+        :param list(int) offsets: offset of the ids of each index (they have
+            to follow each other)
+        :param tuple(str) id_keys: keys whose values are ids too (and should
+            also be shifted)
+        :raises ValueError: if the index is extended by itself or if the
+            indexes are not contiguous
+        '''
+        if any(other is self for other in others):
+            raise ValueError('an index cannot be extended by itself')
+        starts = np.cumsum([self.nitems] + [oth.nitems for oth in others])
+        if list(offsets) != list(starts[:-1]):
+            raise ValueError('ArrayIndex can only be extended by contiguous '
+                             'indexes')
+        keys = dict.fromkeys(self.codes)
+        for other in others:
+            keys.update(dict.fromkeys(other.codes))
+        nitems = int(starts[-1])
+        for key in keys:
+            values = self.values.setdefault(key, {})
+            codes = np.full(nitems, -1, dtype=np.int32)
+            if key in self.codes:
+                codes[:self.nitems] = self.codes[key]
+            for other, start in zip(others, starts):
+                if key not in other.codes:
+                    continue
+                shift = int(start) if key in id_keys else None
+                trans = np.array(
+                    [values.setdefault(val if shift is None else val + shift,
+                                       len(values))
+                     for val in other.values[key]] + [-1], dtype=np.int32)
+                codes[start:start+other.nitems] = trans[other.codes[key]]
+            self.codes[key] = codes
+        self.nitems = nitems
+        self._ids = {}
+
+
+def key_codes(index, key, nitems):
+    '''Get the codes of the values of `key` for all the items (``-1`` if an
+    item does not have the key) and the dictionary of the codes of the values.
+
+    >>> myindex = Index()
+    >>> myindex['drink']['beer'] = {0, 2}
+    >>> myindex['drink']['wine'] = {3}
+    >>> codes, values = key_codes(myindex, 'drink', 4)
+    >>> codes
+    array([ 0, -1,  0,  1], dtype=int32)
+    >>> values
+    {'beer': 0, 'wine': 1}
+
+    :param index: the index
+    :type index: Index or ArrayIndex
+    :param str key: the key
+    :param int nitems: total number of items
+    :rtype: tuple(numpy.ndarray, dict)
+    '''
+    if isinstance(index, ArrayIndex):
+        return index.codes[key], index.values[key]
+    codes = np.full(nitems, -1, dtype=np.int32)
+    values = {}
+    for code, (val, ids) in enumerate(index[key].items()):
+        codes[list(ids)] = code
+        values[val] = code
+    return codes, values
+
+
+def select_ids_many(index, nitems, queries):
+    '''Get the ids of the items matching each query.
+
+    Queries are grouped by set of keys. For each group, the codes of the
+    values of the keys are combined in a single integer per item and the items
+    are sorted by combined code, once: each query of the group is then
+    answered by a binary search.
+
+    >>> items = [{'drink': 'beer', 'menu': 'spam'}, {'drink': 'wine'},
+    ...          {'menu': 'spam'}, {'drink': 'beer', 'menu': 'bacon'}]
+    >>> myindex = ArrayIndex.from_items(items)
+    >>> select_ids_many(myindex, len(items),
+    ...                 [{'menu': 'spam'}, {'drink': 'beer', 'menu': 'spam'},
+    ...                  {'drink': 'water'}, {}])
+    [[0, 2], [0], [], [0, 1, 2, 3]]
+
+    If the values of the keys of a group have too many combinations to be
+    coded in an integer, the ids of its queries are ``None``: they should be
+    selected one by one with :meth:`Index.select_ids`.
+
+    :param index: the index
+    :type index: Index or ArrayIndex
+    :param int nitems: total number of items
+    :param list(dict) queries: selections
+    :returns: sorted ids for each query
+    :rtype: list(list(int) or None)
+    '''
+    groups = defaultdict(list)
+    for iquery, query in enumerate(queries):
+        groups[tuple(sorted(query))].append(iquery)
+    res = [[] for _ in queries]
+    for keys, iqueries in groups.items():
+        if any(key not in index for key in keys):
+            continue
+        if not keys:
+            for iquery in iqueries:
+                res[iquery] = list(range(nitems))
+            continue
+        group_res = _select_ids_group(index, nitems, keys,
+                                      [queries[iquery] for iquery in iqueries])
+        for iquery, ids in zip(iqueries, group_res):
+            res[iquery] = ids
+    return res
+
+
+def _sorted_codes(index, nitems, keys):
+    '''Combine the codes of the values of the keys in a single integer per
+    item (having all the keys) and sort the items by combined code.
+
+    :returns: the sorted combined codes, the corresponding ids, the
+        dictionaries of the codes of the values of each key and the number of
+        codes of each key, or ``None`` if there are too many combinations
+    '''
+    codes, values = zip(*(key_codes(index, key, nitems) for key in keys))
+    table = np.stack(codes)
+    ids = np.flatnonzero((table >= 0).all(axis=0))
+    dims = [max(len(vals), 1) for vals in values]
+    try:
+        flat = np.ravel_multi_index(table[:, ids], dims)
+    except ValueError:
+        # too many combinations of values to be coded in an integer
+        return None
+    order = np.argsort(flat, kind='stable')
+    return flat[order], ids[order], values, dims
+
+
+def _query_codes(keys, values, dims, queries):
+    '''Combine the codes of the values required by each query as
+    :func:`_sorted_codes` does for the items.
+
+    :returns: the combined code of each query, ``-1`` if one of its values is
+        not in the index
+    :rtype: numpy.ndarray
+    '''
+    qflat = np.full(len(queries), -1, dtype=np.intp)
+    valid, qcodes = [], []
+    for iquery, query in enumerate(queries):
+        if all(query[key] in vals for key, vals in zip(keys, values)):
+            valid.append(iquery)
+            qcodes.append([vals[query[key]]
+                           for key, vals in zip(keys, values)])
+    if valid:
+        qflat[valid] = np.ravel_multi_index(np.array(qcodes).T, dims)
+    return qflat
+
+
+def _select_ids_group(index, nitems, keys, queries):
+    '''Get the ids of the items matching each query, all the queries using
+    the same keys.
+
+    :rtype: list(list(int) or None)
+    '''
+    scodes = _sorted_codes(index, nitems, keys)
+    if scodes is None:
+        return [None] * len(queries)
+    flat, ids, values, dims = scodes
+    qflat = _query_codes(keys, values, dims, queries)
+    starts = np.searchsorted(flat, qflat, side='left')
+    ends = np.searchsorted(flat, qflat, side='right')
+    return [ids[start:end].tolist() for start, end in zip(starts, ends)]
@@ -602,7 +602,6 @@ Module API
 import logging
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from io import StringIO
 import numpy as np
 from .data_convertor import bins_reduction
 
@@ -621,6 +620,25 @@ ITYPE = np.int64
 FTYPE = np.float64
 
 
+def split_table(text, ncols):
+    '''Split a block of lines of whitespace-separated tokens in a
+    2-dimensions array of strings.
+
+    :param str text: lines of the table
+    :param int ncols: number of tokens per line
+    :rtype: numpy.ndarray
+    :raises ValueError: if the number of tokens is not a multiple of `ncols`
+
+    >>> table = split_table("(0,0,0) 1.e+00 2.0\\n(0,0,1) 3.e+00 4.0", 3)
+    >>> table[:, 0]
+    array(['(0,0,0)', '(0,0,1)'], dtype='<U7')
+    >>> table[:, 1:].astype(FTYPE)
+    array([[1., 2.],
+           [3., 4.]])
+    '''
+    return np.array(text.split()).reshape(-1, ncols)
+
+
 class DictBuilder(ABC):
     '''General class to build dictionaries.
 
@@ -889,17 +907,13 @@ class MeshDictBuilder(KinematicDictBuilder):
         if nb_tokens <= 3:
             return
         LOGGER.debug('coordinates to be done')
-
-        def convstr(x):
-            '''Convert coordinates string in float.'''
-            return float(x.decode('utf-8').strip('(),'))
-
-        self.coords = np.loadtxt(
-            StringIO(vals),
-            dtype=np.dtype([('u', 'f8'), ('v', 'f8'), ('w', 'f8')]),
-            usecols=list(range(1, 4)),
-            converters={1: convstr, 2: convstr, 3: convstr}).reshape(
-                self.arrays['default'].shape[:3])
+        coords = np.char.strip(split_table(vals, nb_tokens)[:, 1:4], '(),')
+        self.coords = np.empty(
+            coords.shape[0],
+            dtype=np.dtype([('u', 'f8'), ('v', 'f8'), ('w', 'f8')]))
+        for icoord, coord in enumerate('uvw'):
+            self.coords[coord] = coords[:, icoord]
+        self.coords = self.coords.reshape(self.arrays['default'].shape[:3])
 
     def _fill_mesh_array(self, meshvals, name, ebin):
         '''Fill mesh array.
@@ -910,19 +924,18 @@ class MeshDictBuilder(KinematicDictBuilder):
                      'eintegrated_mesh') for the moment
         :param int ebin: energy bin to fill in the array
         '''
-        if 'volume' in self.arrays[name].dtype.names:
-            npt = np.loadtxt(StringIO(meshvals[0]), usecols=(-3, -2, -1),
-                             dtype=self.arrays[name].dtype)
-        else:
-            npt = np.loadtxt(
-                StringIO(meshvals[0]), usecols=(-2, -1),
-                dtype=self.arrays[name].dtype)
+        array = self.arrays[name]
+        cols = array.dtype.names
+        ntoks = len(meshvals[0].rpartition('\n')[-1].split())
         try:
-            res = npt[list(npt.dtype.names)].reshape(
-                self.arrays[name].shape[:3])
+            vals = (split_table(meshvals[0], ntoks)[:, -len(cols):]
+                    .astype(FTYPE)
+                    .reshape(array.shape[:3] + (len(cols),)))
         except ValueError as verr:
             raise MeshDictBuilderException('Mesh looks incomplete') from verr
-        self.arrays[name][:, :, :, ebin, self.itime, self.imu, self.iphi] = res
+        for icol, col in enumerate(cols):
+            array[col][:, :, :, ebin, self.itime, self.imu, self.iphi] = (
+                vals[..., icol])
 
     def _fill_entropy_array(self, meshvals, ebin):
         '''Fill mesh array.
@@ -1048,21 +1061,8 @@ class SpectrumDictBuilder(KinematicDictBuilder):
                     self.bins['phi'].append(ispec['phi_angle_zone'][1])
 
             # Fill spectrum values
-            for ienergy, ivals in enumerate(ispec['spectrum_vals']):
-                if self.itime == 0 and self.imu == 0 and self.iphi == 0:
-                    self._check_bins(ispec['spectrum_vals'], ienergy)
-                    self.bins['e'].append(ivals[0])
-                index = (0, 0, 0, ienergy, self.itime, self.imu, self.iphi)
-                array = np.array(tuple(ivals[2:]),
-                                 dtype=self.arrays['default'].dtype)
-                try:
-                    self.arrays['default'][index] = array
-                except IndexError:
-                    LOGGER.error(
-                        "IndexError: all (sub-)spectra should have the same "
-                        "bins.\n"
-                        "Please make sure you run Tripoli-4 with option '-a'.")
-                    raise
+            self._fill_spectrum_array(ispec['spectrum_vals'])
+
             # Fill integrated result if exist
             if 'integrated_res' in ispec and 'integrated_res' in self.arrays:
                 iintres = ispec['integrated_res']
@@ -1071,9 +1071,37 @@ class SpectrumDictBuilder(KinematicDictBuilder):
                     (iintres['score'], iintres['sigma']),
                     dtype=self.arrays['integrated_res'].dtype))
 
-    def _check_bins(self, vals, ienergy):
-        '''Check bins validity.'''
-        if self.bins['e'] and vals[ienergy][0] != vals[ienergy-1][1]:
+    def _fill_spectrum_array(self, spectrum_vals):
+        '''Fill the default array for the current time step and angle zones
+        from all the energy bins at once.
+
+        :param spectrum_vals: spectrum rows ``[e_low, e_up, val_1, ...]``
+        :type spectrum_vals: list or numpy.ndarray
+        '''
+        vals = np.asarray(spectrum_vals, dtype=FTYPE)
+        if self.itime == 0 and self.imu == 0 and self.iphi == 0:
+            self._check_bins(vals)
+            self.bins['e'].extend(vals[:, 0])
+        array = self.arrays['default']
+        if vals.shape[0] > array.shape[3]:
+            LOGGER.error(
+                "IndexError: all (sub-)spectra should have the same "
+                "bins.\n"
+                "Please make sure you run Tripoli-4 with option '-a'.")
+            raise IndexError('too many energy bins in spectrum')
+        if vals.shape[1] - 2 != len(array.dtype.names):
+            raise SpectrumDictBuilderException(
+                f"Expected {len(array.dtype.names)} columns in spectrum, "
+                f"got {vals.shape[1] - 2}")
+        for icol, col in enumerate(array.dtype.names):
+            array[col][0, 0, 0, :vals.shape[0], self.itime, self.imu,
+                       self.iphi] = vals[:, icol+2]
+
+    def _check_bins(self, vals):
+        '''Check bins validity: the lower edge of each bin should be the upper
+        edge of the previous one.'''
+        mismatch = vals[:, 0] != np.roll(vals[:, 1], 1)
+        if mismatch[1:].any() or (self.bins['e'] and mismatch[0]):
             raise SpectrumDictBuilderException(
                 "Problem with energy bins: some bins are probably missing. "
                 "Please make sure you run Tripoli-4 with '-a' option.")
@@ -188,6 +188,28 @@ Response are constructed as:
   * perturbation results (parser :parsing_var:`perturbation`)
 
 
+Numeric tables
+``````````````
+Large regular numeric tables (spectrum rows, mesh lines) are not parsed token
+by token: the whole table is matched by a single regular expression, then
+converted with NumPy. Spectrum tables are returned as 2-dimensions
+:obj:`numpy.ndarray` (one row per bin, the ``'-'`` between bin edges is
+removed), see :func:`~.transform.convert_spectrum_table`; if the table does not
+have the expected regular layout the token-by-token parser is used instead.
+Mesh lines are kept as a string and converted in
+:mod:`~valjean.eponine.tripoli4.common`.
+
+
+Skipped responses
+`````````````````
+When a selection is given to :meth:`~.parse.Parser.parse_from_number`, the
+listing is parsed by a copy of the general parser built by
+:func:`skipping_t4gram`, where a parser consuming, without parsing them, the
+responses that do not match the selection is tried before each response. They
+are replaced by placeholders of ``'response_type'`` ``'skipped'``, so that
+indices of the other responses are unchanged.
+
+
 Other parsers
 `````````````
 Various other blocks can appear in the Tripoli-4 listing, located at the same
@@ -222,7 +244,7 @@ level as the response block. These parsers and the associated dictionary key
 
 import logging
 from pyparsing import (Word, Keyword, White, alphas, alphanums, LineEnd,
-                       Suppress, Optional, CaselessKeyword, original_text_for,
+                       Suppress, Optional, CaselessKeyword, Regex,
                        Group, OneOrMore, ZeroOrMore, Forward,
                        token_map, delimited_list, printables, replace_with)
 from pyparsing import pyparsing_common as pyparscom
@@ -236,6 +258,29 @@ LOGGER = logging.getLogger(__name__)
 _fnums = pyparscom.fnumber.set_parse_action(token_map(trans.common.FTYPE))
 _inums = pyparscom.number.set_parse_action(token_map(trans.common.ITYPE))
 
+# Regular numeric tables: whole tables matched at once
+_FNUM_RE = r'[+-]?\d+\.?\d*(?:[eE][+-]?\d+)?'
+
+
+def _spectrum_table(nvals):
+    '''Parser for a whole table of spectrum rows
+    ``bin_low - bin_up val_1 ... val_nvals``, converted to a 2-dimensions
+    array by :func:`~.transform.convert_spectrum_table`.
+
+    The table has to end with an empty line (or the end of the text), else
+    it does not match and the token by token parser should be used.
+
+    :param int nvals: number of values after the bin edges
+    '''
+    row = (rf'[ \t]*{_FNUM_RE}[ \t]+-[ \t]+{_FNUM_RE}'
+           rf'(?:[ \t]+{_FNUM_RE}){{{nvals}}}[ \t]*(?=\n|\Z)')
+    return (Regex(rf'{row}(?:\n{row})*(?=\n[ \t]*\n|\n?[ \t]*\Z)')
+            .set_parse_action(trans.convert_spectrum_table))
+
+
+# Lines of a table up to the next empty line
+_tablelines = Regex(r'\S[^\n]*(?:\n[ \t]*\S[^\n]*)*')
+
 ###################################
 #            KEYWORDS             #
 ###################################
@@ -892,7 +937,8 @@ _spectrum = (Suppress(_spectrum_kw)
              + _numdiscbatch
              + _spectrumcols
              + Optional(_spectrumunits)
-             + OneOrMore(_spectrumvals, stopOn=_endtable)('spectrum_vals'))
+             + (_spectrum_table(3)('spectrum_vals')
+                | OneOrMore(_spectrumvals, stopOn=_endtable)('spectrum_vals')))
 spectrumblock = (Group(OneOrMore
                        (Group(OneOrMore(_timestep | _muangzone | _phiangzone)
                               + _spectrum
@@ -911,8 +957,9 @@ _vovspectrum = (Suppress(_spectrum_kw)
                 + _numdiscbatch
                 + _vovspectrumcols
                 + Optional(_spectrumunits)
-                + OneOrMore(_vovspectrumvals, stopOn=_endtable)
-                ('spectrum_vals'))
+                + (_spectrum_table(4)('spectrum_vals')
+                   | OneOrMore(_vovspectrumvals, stopOn=_endtable)
+                   ('spectrum_vals')))
 vovspectrumblock = Group(Group(_vovspectrum))('vov_spectrum_res')
 
 
@@ -926,7 +973,9 @@ _nuspectrum = (Suppress(_nuspectrum_kw)
                + _numdiscbatch
                + _nuspectrumcols
                + Optional(_nuspectrumunits)
-               + OneOrMore(_nuspectrumvals, stopOn=_endtable)('spectrum_vals'))
+               + (_spectrum_table(2)('spectrum_vals')
+                  | OneOrMore(_nuspectrumvals, stopOn=_endtable)
+                  ('spectrum_vals')))
 nuspectrumblock = Group(Group(_nuspectrum + integratedres))('nu_spectrum_res')
 
 
@@ -966,8 +1015,7 @@ _mesh_energyintegrated = ((Suppress(_integratedres_name) + Suppress(':'))
 _mesh_energyline = _mesh_energyrange | _mesh_energyintegrated
 _meshres = Group(
     _mesh_energyline
-    + Group(original_text_for(
-        OneOrMore(Word(printables), stopOn=_endtable)))('mesh_vals')
+    + Group(_tablelines)('mesh_vals')
     + Optional(Group(entropy)('entropy')))
 meshblock = Group(OneOrMore(Group(_timestep
                                   + Optional(_score_mesh_unit)
@@ -1419,14 +1467,25 @@ response = (Group(_star_line
                   + responseblock)
             .set_parse_action(trans.finalize_response_dict))
 
-listresponses = Group(OneOrMore(response).set_parse_action(
-    compose2(trans.extract_all_metadata,
-             trans.index_elements('response_index'))))('list_responses')
 
-perturbation = (OneOrMore(Group(pertu_desc + listresponses)
-                          .set_parse_action(trans.propagate_all_metadata))
-                .set_parse_action(trans.index_elements('perturbation_index'))
-                ('perturbation'))
+def _listresponses(resp):
+    '''Parser for a list of responses, each parsed by `resp`.'''
+    return Group(OneOrMore(resp).set_parse_action(
+        compose2(trans.extract_all_metadata,
+                 trans.index_elements('response_index'))))('list_responses')
+
+
+def _perturbation(listresp):
+    '''Parser for the perturbation results, each parsed by `listresp`.'''
+    return (OneOrMore(Group(pertu_desc + listresp)
+                      .set_parse_action(trans.propagate_all_metadata))
+            .set_parse_action(trans.index_elements('perturbation_index'))
+            ('perturbation'))
+
+
+listresponses = _listresponses(response)
+
+perturbation = _perturbation(listresponses)
 
 
 ################################
@@ -1449,11 +1508,32 @@ t4debug_gram = (OneOrMore((intro
 #        GENERAL PARSER        #
 ################################
 
-t4gram = (OneOrMore((intro
-                     + ZeroOrMore(listresponses | ifpadjointcriticality
-                                  | autokeffblock | perturbation
-                                  | Suppress(contribpartblock))
-                     + runtime)
-                    .set_parse_action(trans.to_final_dict))
-          .set_parse_action(dump_in_logger)
-          ).set_fail_action(trans.fail_parsing)
+def _t4gram(listresp, pertu):
+    '''General parser, with the given parsers for the lists of responses and
+    the perturbation results.'''
+    return (OneOrMore((intro
+                       + ZeroOrMore(listresp | ifpadjointcriticality
+                                    | autokeffblock | pertu
+                                    | Suppress(contribpartblock))
+                       + runtime)
+                      .set_parse_action(trans.to_final_dict))
+            .set_parse_action(dump_in_logger)
+            ).set_fail_action(trans.fail_parsing)
+
+
+t4gram = _t4gram(listresponses, perturbation)
+
+
+def skipping_t4gram(skipped_response):
+    '''Build a general parser trying `skipped_response` before each response
+    (see `Skipped responses`_).
+
+    The returned parser is a new object: :data:`t4gram` and the other
+    module-level parsers are left untouched.
+
+    :param pyparsing.ParserElement skipped_response: parser consuming the
+        responses to skip
+    :rtype: pyparsing.ParserElement
+    '''
+    listresp = _listresponses(skipped_response | response)
+    return _t4gram(listresp, _perturbation(listresp))
@@ -37,17 +37,33 @@ This module also allows quick checks on outputs:
 
 Some options for debugging are available (end flag).
 
+Several batches of a listing (:meth:`Parser.parse_batches`) or several
+listings (:func:`parse_many`) can be parsed in parallel, in a pool of
+processes.
+
+The responses of a batch can also be parsed one by one with
+:meth:`Parser.iter_responses`: the result block is split in sections at the
+text level (see :func:`response_sections`), only the description of each
+response is parsed to select it, and the responses that do not match the
+selection are never parsed nor converted. The same selection can be given to
+:meth:`Parser.parse_from_number` and :meth:`Parser.parse_from_index`: the
+responses that do not match it are then skipped by the parser.
+
 .. todo::
 
    Change absolute imports in relative ones when main will be moved to
    :ref:`cambronne <cambronne-main>`.
 '''
+import re
 import logging
 import threading
-from pyparsing import ParseException, ParserElement
+from concurrent.futures import ProcessPoolExecutor
+from pyparsing import ParseException, ParserElement, Token
 
 from . import scan
-from .grammar import t4gram
+from .grammar import (t4gram, response, respintro, pertu_desc,
+                      skipping_t4gram)
+from .transform import extract_metadata
 from .common import SpectrumDictBuilderException, MeshDictBuilderException
 from ...chrono import Chrono
 from ..browser import Browser
@@ -68,14 +84,249 @@ class ParserException(Exception):
     '''An error that may be raised by the :class:`Parser` class.'''
 
 
+_SECTION_RE = re.compile(
+    r'^(?:\*+[ \t]*\n\s*(?:(?P<response>RESPONSE FUNCTION[ \t]*:)'
+    r'|IFP_ADJOINT_CRITICALITY EDITION)'
+    r'|[ \t]*(?P<perturbation>=+ Perturbation result edition)'
+    r'|[ \t]*(?:NUMBER OF CONTRIBUTING PARTICLES|\* packet length is'
+    r'|simulation time \(s\)|exploitation time \(s\)'
+    r'|elapsed time \(s\)))', re.MULTILINE)
+_RESP_HEADER_RE = re.compile(r'\*+[ \t]*\n(.*?)^\*+[ \t]*$',
+                             re.MULTILINE | re.DOTALL)
+_SCORE_MODE_RE = re.compile(r'^[ \t]*scoring mode[ \t]*:', re.MULTILINE)
+_RESPDESC_KEYS = ('response_function', 'response_name', 'score_name')
+
+
+def response_sections(text):
+    '''Split a result block in sections at the text level.
+
+    A section starts at the beginning of a response (star line followed by
+    ``RESPONSE FUNCTION``), of a perturbation edition or of any other block
+    following the responses (IFP adjoint criticality edition, contributing
+    particles, times, etc.). It ends where the next one starts.
+
+    >>> text = """ batch number : 10
+    ... ********
+    ... RESPONSE FUNCTION : FLUX
+    ... ********
+    ... results
+    ... ********
+    ... RESPONSE FUNCTION : KEFFS
+    ... ********
+    ... other results
+    ...
+    ...  simulation time (s) : 20
+    ... """
+    >>> for kind, start, end in response_sections(text):
+    ...     print(kind, text[start:end].strip().splitlines()[:2])
+    response ['********', 'RESPONSE FUNCTION : FLUX']
+    response ['********', 'RESPONSE FUNCTION : KEFFS']
+    other ['simulation time (s) : 20']
+
+    :param str text: result block
+    :returns: kind (``'response'``, ``'perturbation'`` or ``'other'``), start
+        and end of the sections in the text; the text before the first one is
+        not in a section
+    :rtype: list(tuple(str, int, int))
+    '''
+    starts = [(match.lastgroup or 'other', match.start())
+              for match in _SECTION_RE.finditer(text)]
+    ends = [start for _, start in starts[1:]] + [len(text)]
+    return [(kind, start, end) for (kind, start), end in zip(starts, ends)]
+
+
+class SkippedResponses(Token):
+    '''Pyparsing element consuming, without parsing them, the responses
+    starting at given positions in the text (see
+    :func:`~.grammar.skipping_t4gram`).
+
+    Each skipped response is replaced by a placeholder, of ``'response_type'``
+    ``'skipped'``, with as many (empty) scores as the original response in
+    order to keep the indices of the other responses unchanged.
+    '''
+
+    def __init__(self, spans):
+        '''Initialize the element.
+
+        :param dict spans: start of the skipped responses and, for each, its
+            end and its number of scores
+        '''
+        super().__init__()
+        self.spans = spans
+        self.errmsg = 'Expected a skipped response'
+        self.mayIndexError = False
+
+    def parseImpl(self, instring, loc, do_actions=True):
+        # pylint: disable=invalid-name,unused-argument
+        if loc not in self.spans:
+            raise ParseException(instring, loc, self.errmsg, self)
+        end, nscores = self.spans[loc]
+        return end, {'response_type': 'skipped',
+                     'results': [{} for _ in range(nscores)]}
+
+
+def _nb_scores(text, start, end):
+    '''Number of scores in the response between `start` and `end` in the
+    text (number of items it gives in the list of responses).'''
+    return max(1, len(_SCORE_MODE_RE.findall(text, start, end)))
+
+
+def match_selection(resp, selectors, *, partial=False):
+    '''Check if a response matches the selection, as
+    :meth:`~.browser.Browser.filter_by` would do.
+
+    :param dict resp: response (metadata)
+    :param dict selectors: required values of the metadata
+    :param bool partial: if `True`, `resp` only contains the metadata from the
+        description of the response (see :data:`~.grammar.respintro`): keys
+        not available there are considered as matching, except the ones that
+        can only be found in the description (``response_function``,
+        ``response_name`` and ``score_name``)
+    :rtype: bool
+
+    >>> resp = {'response_function': 'FLUX', 'particle': 'NEUTRON'}
+    >>> match_selection(resp, {'response_function': 'FLUX'})
+    True
+    >>> match_selection(resp, {'scoring_mode': 'SCORE_TRACK'})
+    False
+    >>> match_selection(resp, {'scoring_mode': 'SCORE_TRACK'}, partial=True)
+    True
+    >>> match_selection(resp, {'response_name': 'flux'}, partial=True)
+    False
+    '''
+    for key, val in selectors.items():
+        if key in resp:
+            if resp[key] != val:
+                return False
+        elif not partial or key in _RESPDESC_KEYS:
+            return False
+    return True
+
+
+def parse_text(gram, str_to_parse, jdd):
+    '''Parse the given string and raise exception if parsing failed.
+
+    This function does not take :data:`PYPARSING_LOCK`, it is up to the caller
+    to do it if needed (not needed in a dedicated process).
+
+    :param gram: pyparsing grammar
+    :param str str_to_parse: string to parse
+    :param str jdd: path to the Tripoli-4 output (for messages)
+    :rtype: list
+    '''
+    try:
+        # Disable packrat caching: it degrades the performance of our
+        # grammar. We have to disable it globally here, because other
+        # packages (matplotlib for example) may have enabled it
+        # globally
+        ParserElement.disable_memoization()
+        result = gram.parseString(str_to_parse).asList()
+    except ParseException as err:
+        LOGGER.error("Parsing failed in %s, you are probably trying to "
+                     "read a new response. Please update the parser "
+                     "before re-running.", jdd)
+        LOGGER.debug("Exception explanation:\n%s", err.explain(depth=None))
+        # from None allows to raise a new exception without traceback and
+        # message of the previous one here.
+        raise ParserException("Error in parsing") from None
+    except (SpectrumDictBuilderException, MeshDictBuilderException) as dbe:
+        LOGGER.error(dbe)
+        raise ParserException("Error in parsing") from None
+    return result
+
+
+def check_time_consistency(pres, times, batch_number, partial=False):
+    '''Check time consistency between parsed result and scan.
+
+    :param dict pres: parsed result
+    :param dict times: times from the scan (see :class:`~.scan.Scanner`)
+    :param int batch_number: number of the parsed batch
+    :param bool partial: if the edition is partial, only emit a warning in
+        case of inconsistency
+    :raises ParserException: if times are inconsistent
+    '''
+    if 'batch_data' not in pres:
+        raise ParserException('No batch_data in parsed result, '
+                              'something looks wrong in the T4 output.')
+    bdata = pres['batch_data']
+    try:
+        time_key = next(k for k in bdata if 'time' in k)
+    except StopIteration as sit:
+        raise ParserException(
+            'No "time" variable found in the Tripoli-4 output, '
+            'please check it.') from sit
+    if bdata[time_key] != times[time_key][batch_number]:
+        msg = (f'{time_key} looks inconsistent between parsing '
+               f'({bdata[time_key]}) and scanning '
+               f'({times[time_key][batch_number]})')
+        if partial:
+            LOGGER.warning(msg)
+        else:
+            raise ParserException(msg)
+
+
+def _parse_batch_worker(jdd, str_to_parse, batch_number, scan_info, name):
+    '''Parse one batch result block in a worker process.
+
+    :param str jdd: path to the Tripoli-4 output
+    :param str str_to_parse: result block of the batch
+    :param int batch_number: batch number
+    :param tuple scan_info: times, partial flag and global variables from the
+        scan
+    :param str name: name of the parse result
+    :rtype: ParseResult
+    '''
+    times, partial, scan_vars = scan_info
+    pres, = parse_text(t4gram, str_to_parse, jdd)
+    check_time_consistency(pres, times, batch_number, partial)
+    return ParseResult(pres, scan_vars, name)
+
+
+def _parse_file_worker(jdd, batch_index, parser_kwargs):
+    '''Scan and parse one Tripoli-4 output in a worker process.
+
+    :rtype: ParseResult
+    '''
+    return Parser(jdd, **parser_kwargs).parse_from_index(batch_index)
+
+
+def parse_many(files, *, batch_index=-1, n_workers=None, **parser_kwargs):
+    '''Scan and parse several Tripoli-4 outputs in a pool of processes.
+
+    :param list(str) files: paths to the Tripoli-4 outputs
+    :param int batch_index: index of the batch to parse in each output
+    :param n_workers: number of worker processes (default: number of CPUs);
+        with 1 the files are parsed in the current process
+    :type n_workers: int or None
+    :param parser_kwargs: keyword arguments passed to :class:`Parser`
+    :returns: the parse results, in the order of `files`
+    :rtype: list(ParseResult)
+    :raises ParserException: if the scan or the parsing of one file fails
+    '''
+    if n_workers == 1:
+        return [_parse_file_worker(jdd, batch_index, parser_kwargs)
+                for jdd in files]
+    with ProcessPoolExecutor(n_workers) as executor:
+        futures = [executor.submit(_parse_file_worker, jdd, batch_index,
+                                   parser_kwargs)
+                   for jdd in files]
+        return [future.result() for future in futures]
+
+
 class Parser:
     '''Scan Tripoli-4 listings, then parse the required batches.'''
 
     @profile
-    def __init__(self, jddname):
+    def __init__(self, jddname, *, use_mmap=False, use_index=False):
         '''Initialize the :class:`Parser` object.
 
         :param str jddname: path to the Tripoli-4 output
+        :param bool use_mmap: memory-map the Tripoli-4 output during the scan
+            and only keep byte offsets of the result blocks (recommended for
+            huge listings), see :ref:`eponine-t4-scan-mmap`
+        :param bool use_index: reuse the scan index of the Tripoli-4 output if
+            it is up to date, else write it (implies `use_mmap`), see
+            :ref:`eponine-t4-scan-index`
 
         It also initalizes the result of :class:`.scan.Scanner` to ``None``,
         then executes the scan. If this step fails an exception is raised.
@@ -96,6 +347,8 @@ class Parser:
         '''
         LOGGER.info("Parsing %s", jddname)
         self.jdd = jddname
+        self.use_mmap = use_mmap
+        self.use_index = use_index
         try:
             with Chrono() as chrono:
                 self.scan_res = self._scan()
@@ -119,7 +372,8 @@ class Parser:
 
         :rtype: Scanner
         '''
-        return scan.Scanner(self.jdd)
+        return scan.Scanner(self.jdd, use_mmap=self.use_mmap,
+                            use_index=self.use_index)
 
     def _check_scan(self, scan_res):
         '''Check existence of scan result and presence of normal end (per
@@ -144,73 +398,219 @@ class Parser:
 
     def _parse_listing_worker(self, gram, str_to_parse):
         '''Parse the given string and raise exception if parsing failed.'''
-        try:
-            with PYPARSING_LOCK:
-                # Disable packrat caching: it degrades the performance of our
-                # grammar. We have to disable it globally here, because other
-                # packages (matplotlib for example) may have enabled it
-                # globally
-                ParserElement.disable_memoization()
-                result = gram.parseString(str_to_parse).asList()
-        except ParseException as err:
-            LOGGER.error("Parsing failed in %s, you are probably trying to "
-                         "read a new response. Please update the parser "
-                         "before re-running.", self.jdd)
-            LOGGER.debug("Exception explanation:\n%s", err.explain(depth=None))
-            # from None allows to raise a new exception without traceback and
-            # message of the previous one here.
-            raise ParserException("Error in parsing") from None
-        except (SpectrumDictBuilderException, MeshDictBuilderException) as dbe:
-            LOGGER.error(dbe)
-            raise ParserException("Error in parsing") from None
-        return result
+        with PYPARSING_LOCK:
+            return parse_text(gram, str_to_parse, self.jdd)
 
     def _time_consistency(self, pres, batch_number):
         '''Check time consistency between parsed result and scan.'''
-        if 'batch_data' not in pres:
-            raise ParserException('No batch_data in parsed result, '
-                                  'something looks wrong in the T4 output.')
-        bdata = pres['batch_data']
-        try:
-            time_key = next(k for k in bdata if 'time' in k)
-        except StopIteration as sit:
-            raise ParserException(
-                'No "time" variable found in the Tripoli-4 output, '
-                'please check it.') from sit
-        if bdata[time_key] != self.scan_res.times[time_key][batch_number]:
-            msg = (f'{time_key} looks inconsistent between parsing '
-                   f'({bdata[time_key]}) and scanning '
-                   f'({self.scan_res.times[time_key][batch_number]})')
-            if self.scan_res.partial:
-                LOGGER.warning(msg)
-            else:
-                raise ParserException(msg)
+        check_time_consistency(pres, self.scan_res.times, batch_number,
+                               self.scan_res.partial)
 
-    def parse_from_number(self, batch_number, name=''):
+    def parse_from_number(self, batch_number, name='', **selectors):
         '''Parse from batch index or batch number.
 
+        If a selection is given, only the results matching it are kept, as
+        :meth:`~.browser.Browser.filter_by` would do. Responses that do not
+        match the selection are identified at the text level, from their
+        description only, and skipped by the parser (see
+        :func:`~.grammar.skipping_t4gram`): they are neither parsed nor
+        converted to datasets.
+
         :param int batch_number: number of the batch to parse
+        :param str name: name of the parse result (propagated to data)
+        :param selectors: required values of the metadata of the results
+            (``response_function``, ``response_name``, ``score_name``, etc.)
         :rtype: ParseResult
         '''
         LOGGER.debug('Using parse from Parser')
+        text = self.scan_res[batch_number]
         with Chrono() as chrono:
-            pres, = self._parse_listing_worker(
-                t4gram, self.scan_res[batch_number])
+            if selectors:
+                gram = skipping_t4gram(SkippedResponses(
+                    self._skipped_responses(text, selectors)))
+                pres, = self._parse_listing_worker(gram, text)
+                pres = self._select(pres, selectors)
+            else:
+                pres, = self._parse_listing_worker(t4gram, text)
         LOGGER.info("Successful parsing in %f s", chrono)
         self._time_consistency(pres, batch_number)
         scan_vars = self.scan_res.global_variables(batch_number)
         return ParseResult(pres, scan_vars, name)
 
-    def parse_from_index(self, batch_index=-1, name=''):
+    @staticmethod
+    def _select(pres, selectors):
+        '''Only keep the results matching the selection (skipped responses
+        are removed).'''
+        return {key: (val if key == 'batch_data'
+                      else [resp for resp in val
+                            if resp.get('response_type') != 'skipped'
+                            and match_selection(resp, selectors)])
+                for key, val in pres.items()}
+
+    def _parse_metadata(self, gram, str_to_parse):
+        '''Parse a short piece of text (response or perturbation
+        description) and return its named results.'''
+        try:
+            with PYPARSING_LOCK:
+                ParserElement.disable_memoization()
+                return gram.parse_string(str_to_parse).as_dict()
+        except ParseException as err:
+            LOGGER.error("Parsing of response metadata failed in %s",
+                         self.jdd)
+            LOGGER.debug("Exception explanation:\n%s",
+                         err.explain(depth=None))
+            raise ParserException("Error in parsing") from None
+
+    def _response_metadata(self, text):
+        '''Parse the description of the response starting the given text.
+
+        :rtype: dict
+        '''
+        header = _RESP_HEADER_RE.match(text)
+        if header is None:
+            raise ParserException(f'Missing response description in '
+                                  f'{self.jdd}')
+        meta = self._parse_metadata(respintro, header.group(1))
+        meta.update(meta.pop('compos_details', {}))
+        return meta
+
+    def _responses(self, text):
+        '''Split the result block in responses and parse their descriptions.
+
+        :param str text: result block
+        :returns: for each response, its start and end in the text, the
+            metadata from its description, the metadata of the perturbation it
+            belongs to (or `None`), the index of the list of responses it
+            belongs to and if it is the last one of this list
+        :rtype: list(tuple)
+        '''
+        sections = response_sections(text)
+        following = [kind for kind, _, _ in sections[1:]] + ['other']
+        resps, pertu_meta, run = [], None, 0
+        for (kind, start, end), next_kind in zip(sections, following):
+            if kind == 'response':
+                meta = self._response_metadata(text[start:end])
+                if pertu_meta is not None:
+                    meta.update(pertu_meta)
+                resps.append((start, end, meta, pertu_meta, run,
+                              next_kind != 'response'))
+                continue
+            run += 1
+            pertu_meta = (self._parse_metadata(pertu_desc, text[start:end])
+                          ['perturbation_desc']
+                          if kind == 'perturbation' else None)
+        return resps
+
+    def iter_responses(self, batch_number, name='', **selectors):
+        '''Parse the responses of a batch one by one.
+
+        The result block is split in responses at the text level (see
+        :func:`response_sections`). Only the description of each response is
+        parsed first: if it does not match the selection, the response is
+        skipped, else it is parsed, converted to datasets and yielded. The
+        selection is finally checked on the complete metadata of the
+        response, as :meth:`~.browser.Browser.filter_by` would do.
+
+        The yielded responses are the ones available in the
+        ``'list_responses'`` and ``'perturbation'`` items of
+        :attr:`ParseResult.res`, with the same indices (``response_index``,
+        ``perturbation_index``), even if some responses are skipped. Other
+        results (``keff_auto``, IFP adjoint criticality edition, etc.) and
+        batch data are not available here, use :meth:`parse_from_number` to
+        get them.
+
+        :param int batch_number: number of the batch to parse
+        :param str name: name of the parse result (propagated to data)
+        :param selectors: required values of the metadata of the responses
+            (``response_function``, ``response_name``, ``score_name``, etc.)
+        :returns: generator of responses
+        :rtype: generator(dict)
+        '''
+        text = self.scan_res[batch_number]
+        convertor = ParseResult({'batch_data': {}},
+                                self.scan_res.global_variables(batch_number),
+                                name)
+        run, resp_index, pertu_index = None, 0, 0
+        for start, end, meta, pertu_meta, irun, _ in self._responses(text):
+            if irun != run:
+                run, resp_index = irun, 0
+            resp_index += 1
+            if not match_selection(meta, selectors, partial=True):
+                if pertu_meta is not None:
+                    pertu_index += _nb_scores(text, start, end)
+                continue
+            resp, = self._parse_listing_worker(response, text[start:end])
+            resp['response_index'] = resp_index - 1
+            for resp in extract_metadata(resp):
+                if pertu_meta is not None:
+                    resp.update(pertu_meta)
+                    resp['perturbation_index'] = pertu_index
+                    pertu_index += 1
+                if match_selection(resp, selectors):
+                    yield convertor.convert_response(resp)
+
+    def _skipped_responses(self, text, selectors):
+        '''Find the responses that do not match the selection and that can
+        be skipped safely: the last response before another kind of block and
+        the |keff| responses (possibly followed by the ``keff_auto`` block) are
+        always kept.
+
+        :returns: start of the skipped responses and, for each, its end and
+            its number of scores
+        :rtype: dict(int, tuple(int, int))
+        '''
+        skipped = {}
+        for start, end, meta, _, _, last in self._responses(text):
+            if ((last or meta.get('response_function') == 'KEFFS'
+                 or match_selection(meta, selectors, partial=True))):
+                continue
+            skipped[start] = (end, _nb_scores(text, start, end))
+        LOGGER.debug('%d responses skipped by selection %s', len(skipped),
+                     selectors)
+        return skipped
+
+    def parse_batches(self, batch_numbers, *, n_workers=None, name=''):
+        '''Parse several batches in a pool of processes.
+
+        :param list(int) batch_numbers: numbers of the batches to parse
+        :param n_workers: number of worker processes (default: number of
+            CPUs); with 1 the batches are parsed in the current process
+        :type n_workers: int or None
+        :param str name: name given to all the parse results
+        :returns: the parse results, in the order of `batch_numbers`
+        :rtype: list(ParseResult)
+        '''
+        if n_workers == 1:
+            return [self.parse_from_number(bnum, name)
+                    for bnum in batch_numbers]
+        scan_info = (self.scan_res.times, self.scan_res.partial)
+        with Chrono() as chrono:
+            with ProcessPoolExecutor(n_workers) as executor:
+                futures = [
+                    executor.submit(
+                        _parse_batch_worker, self.jdd, self.scan_res[bnum],
+                        bnum,
+                        scan_info + (self.scan_res.global_variables(bnum),),
+                        name)
+                    for bnum in batch_numbers]
+                results = [future.result() for future in futures]
+        LOGGER.info("Successful parsing of %d batches in %f s",
+                    len(results), chrono)
+        return results
+
+    def parse_from_index(self, batch_index=-1, name='', **selectors):
         '''Parse from batch index or batch number.
 
         Per default the last batch is parsed (index = -1).
 
         :param int batch_index: index of the batch in the list of batches
+        :param str name: name of the parse result (propagated to data)
+        :param selectors: required values of the metadata of the results, see
+            :meth:`parse_from_number`
         :rtype: ParseResult
         '''
         batch_number = self.scan_res.batch_number(batch_index)
-        return self.parse_from_number(batch_number, name)
+        return self.parse_from_number(batch_number, name, **selectors)
 
     def print_stats(self):
         '''Print Tripoli-4 statistics (warnings and errors).'''
@@ -380,6 +780,15 @@ class ParseResult:
                     what=what, score=arr, sigma=sigma)
         return tdict
 
+    def convert_response(self, resp):
+        '''Convert the results of a parsed response to datasets.
+
+        :param dict resp: response from the parsing
+        :returns: the response with datasets under the ``'results'`` key
+        :rtype: dict
+        '''
+        return self._make_datasets(resp)
+
     def _make_datasets(self, resp):
         ress = {k: v for k, v in resp.items() if k != 'results'}
         res = {}
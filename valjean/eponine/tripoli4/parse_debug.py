@@ -68,14 +68,21 @@ class ParserDebug(Parser):
 
     def _scan_listing(self):
         '''Scan Tripoli-4 listing, calling :mod:`.scan`.'''
-        return scan.Scanner(self.jdd, self.end_flag)
+        return scan.Scanner(self.jdd, self.end_flag, use_mmap=self.use_mmap,
+                            use_index=self.use_index)
 
-    def parse_from_number(self, batch_number, name=''):
+    def parse_from_number(self, batch_number, name='', **selectors):
         '''Parse from batch index or batch number.
 
         Per default the last batch is parsed (index = -1).
 
+        The whole batch is parsed with the debug grammar; if a selection is
+        given, only the results matching it are kept afterwards (see
+        :meth:`.Parser.parse_from_number`).
+
         :param int batch_number: the number of the batch to parse
+        :param str name: name of the parse result (propagated to data)
+        :param selectors: required values of the metadata of the results
         :returns: list(dict)
         '''
         LOGGER.debug('Using parse from ParserDebug')
@@ -96,6 +103,8 @@ class ParserDebug(Parser):
             LOGGER.info(tcve)
             LOGGER.info('Remark: you are in parsing debug mode with an end '
                         'flag not containing "time", this is expected.')
+        if selectors:
+            pres = self._select(pres, selectors)
         scan_vars = self.scan_res.global_variables(batch_number)
         return ParseResult(pres, scan_vars, name=name)
 
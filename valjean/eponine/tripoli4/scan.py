@@ -38,6 +38,10 @@ Summary
 * Recognize beginning and end of results sections
 * Get the required number of batchs
 * Get the edition batch numbers (if exists)
+* Optionally memory-map the file and only keep byte offsets of the result
+  blocks (see :ref:`eponine-t4-scan-mmap`)
+* Optionally store the scan result in an index file next to the listing, so
+  that the listing is not scanned again (see :ref:`eponine-t4-scan-index`)
 
 
 Use of :mod:`~valjean.eponine.tripoli4.scan`
@@ -91,6 +95,53 @@ containing at least the flags precised in :ref:`eponine-t4-scan-caveats`.
    It will probably be better to directly load a test file...
 
 
+.. _eponine-t4-scan-mmap:
+
+Memory-mapped scan
+------------------
+
+Listings from long or parallel jobs can be huge (several GB). Per default the
+result block of each batch is stored as a :class:`str` in the
+:class:`Scanner`, so the whole listing ends up in memory. With
+``use_mmap=True`` the file is memory-mapped and only the byte offsets of the
+result blocks (and of the photon-electron-positron balance and homogenized
+material dumps) are kept. The corresponding strings are only built when
+requested:
+
+    >>> mresults = Scanner(os.path.join(work_dir, 'spam.res'), use_mmap=True)
+    >>> list(mresults.keys())
+    [10]
+    >>> mresults[10] == results[10]
+    True
+
+
+.. _eponine-t4-scan-index:
+
+Scan index
+----------
+
+Scanning a huge listing takes time, and the same listing is often scanned
+many times (by several tasks, or across several runs). With
+``use_index=True`` (which implies ``use_mmap=True``) the result of the scan is
+saved in an index file next to the listing (``<listing>.scanidx``). The next
+:class:`Scanner` on the same listing loads the index instead of scanning the
+file again:
+
+    >>> iresults = Scanner(os.path.join(work_dir, 'spam.res'), use_index=True)
+    >>> os.path.exists(os.path.join(work_dir, 'spam.res.scanidx'))
+    True
+    >>> iresults = Scanner(os.path.join(work_dir, 'spam.res'), use_index=True)
+    >>> iresults.from_index
+    True
+    >>> iresults[10] == results[10]
+    True
+
+The index is only used if the listing did not change since it was written: the
+path, the size, the modification time, a hash of the beginning and of the end
+of the file and the end flag have to match. Else the listing is scanned again
+and the index is rewritten.
+
+
 .. _eponine-t4-scan-caveats:
 
 Caveats
@@ -112,7 +163,11 @@ Important for the scan: results will be kept
 Module API
 ----------
 '''
+import os
+import mmap
+import pickle
 import logging
+from hashlib import sha256
 from collections.abc import Mapping
 from collections import OrderedDict
 
@@ -126,11 +181,63 @@ if 'profile' not in globals()['__builtins__']:
         return fmem
 
 
+class TextBlock:
+    '''Store the lines of a block of the listing as strings.'''
+
+    def __init__(self):
+        self.lines = []
+
+    def add(self, line, _span=None):
+        '''Add a line to the block.
+
+        :param str line: line to add
+        :param _span: byte offsets of the line (ignored)
+        '''
+        self.lines.append(line)
+
+    def value(self):
+        '''Return the block as a string.
+
+        :rtype: str
+        '''
+        return ''.join(self.lines)
+
+
+class SpanBlock:
+    '''Store a block of the listing as byte offsets in the file.
+
+    Contiguous lines are merged in the same span, so the number of stored
+    spans only depends on the number of interruptions in the block (comments,
+    photon-electron-positron balance, homogenized material dump).
+    '''
+
+    def __init__(self):
+        self.spans = []
+
+    def add(self, _line, span):
+        '''Add a line to the block from its byte offsets.
+
+        :param _line: line to add (ignored)
+        :param tuple(int, int) span: start and end offsets of the line
+        '''
+        if self.spans and self.spans[-1][1] == span[0]:
+            self.spans[-1] = (self.spans[-1][0], span[1])
+        else:
+            self.spans.append(span)
+
+    def value(self):
+        '''Return the spans of the block.
+
+        :rtype: tuple(tuple(int, int))
+        '''
+        return tuple(self.spans)
+
+
 class PhEmEpBalanceOutput:
     '''Class to store photon-electron-positron balance.'''
 
-    def __init__(self):
-        self.content = []
+    def __init__(self, block_type=TextBlock):
+        self.content = block_type()
         self.in_phemep = False
         self.count = 0
 
@@ -140,17 +247,17 @@ class PhEmEpBalanceOutput:
             if self.count == 3:
                 self.in_phemep = False
 
-    def add_line(self, line):
+    def add_line(self, line, span=None):
         '''Add line to the photon electron positron output and counts.'''
-        self.content.append(line)
+        self.content.add(line, span)
         self._count(line)
 
 
 class HomogMatOutput:
     '''Class to store the homogenized material output.'''
 
-    def __init__(self):
-        self.content = []
+    def __init__(self, block_type=TextBlock):
+        self.content = block_type()
         self.in_dump = False
         self.nb_groups = 0
         self.counting = False
@@ -174,9 +281,9 @@ class HomogMatOutput:
             self.counting = False
             self.in_dump = False
 
-    def add_line(self, line):
+    def add_line(self, line, span=None):
         '''Add line to the homogenized material output and count.'''
-        self.content.append(line)
+        self.content.add(line, span)
         self._count(line)
 
 
@@ -187,6 +294,9 @@ class BatchResultScanner:
     :param int current_batch: current batch number
     :param bool para: flag to identify outputs run in parallel
     :param str line: current line in file
+    :param span: byte offsets of the current line in file if the file is
+        memory-mapped, else `None`
+    :type span: tuple(int, int) or None
 
     .. note::
 
@@ -195,23 +305,29 @@ class BatchResultScanner:
         does not appear in the file.
       * **line** should contain "RESULTS ARE GIVEN" here. It is used to
         initialize the list of strings corresponding to the result block.
+      * if **span** is given, only byte offsets are kept for the result block
+        and the additional outputs, not the strings themselves.
 
     '''
 
-    def __init__(self, current_batch, para, line):
+    def __init__(self, current_batch, para, line, span=None):
         self.batch_counts = {'number': -1,
                              'current': current_batch,
                              'greater': 0}
-        self.result = [line]
+        block_type = TextBlock if span is None else SpanBlock
+        self.result = block_type()
+        self.result.add(line, span)
         self.para = para
-        self.phemep_balance = PhEmEpBalanceOutput()
-        self.homog_mat = HomogMatOutput()
+        self.phemep_balance = PhEmEpBalanceOutput(block_type)
+        self.homog_mat = HomogMatOutput(block_type)
 
-    def build_result(self, line):
+    def build_result(self, line, span=None):
         '''Scan line to build batch result: mainly deals with specific patterns
         and store line.
 
         :param str line: last line to be taken into account
+        :param span: byte offsets of the line in the file (memory-mapped scan)
+        :type span: tuple(int, int) or None
         '''
         if "Edition after batch number" in line:
             self.batch_counts['number'] = int(line.split()[-1])
@@ -223,15 +339,15 @@ class BatchResultScanner:
             self.homog_mat.in_dump = True
         if self.para and "number of batches used" in line:
             self._set_greater_batch_number(line)
-        self._store_line(line)
+        self._store_line(line, span)
 
-    def _store_line(self, line):
+    def _store_line(self, line, span):
         if self.phemep_balance.in_phemep:
-            self.phemep_balance.add_line(line)
+            self.phemep_balance.add_line(line, span)
         elif self.homog_mat.in_dump:
-            self.homog_mat.add_line(line)
+            self.homog_mat.add_line(line, span)
         else:
-            self.result.append(line)
+            self.result.add(line, span)
 
     def _set_greater_batch_number(self, line):
         newbatch = int(line.split()[4])
@@ -263,20 +379,183 @@ class BatchResultScanner:
         Called if end flag has been found, add last line and concatenates
         result.
 
-        :return: string build from list of strings junction
+        :return: string build from list of strings junction, or byte offsets
+            of the result block in memory-mapped scan
         '''
         LOGGER.debug("END FLAG found, batch number = %d, "
                      "current batch = %d, greater batch = %d",
                      self.batch_counts['number'],
                      self.batch_counts['current'],
                      self.batch_counts['greater'])
-        return ''.join(self.result)
+        return self.result.value()
 
 
 class ScannerException(Exception):
     '''An error that may be raised by the :class:`Scanner` class.'''
 
 
+class MappedListing:
+    '''Memory-mapped Tripoli-4 listing.
+
+    The map is opened on first use and is not pickled: it is re-opened
+    when needed after unpickling.
+
+    :param str fname: path to the listing
+    '''
+
+    def __init__(self, fname):
+        self.fname = fname
+        self._map = None
+
+    def __getstate__(self):
+        return {'fname': self.fname, '_map': None}
+
+    @property
+    def map(self):
+        '''The :class:`mmap.mmap` object (`None` for an empty file).'''
+        if self._map is None and os.path.getsize(self.fname) > 0:
+            with open(self.fname, 'rb') as fil:
+                self._map = mmap.mmap(fil.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def lines(self):
+        '''Yield the lines of the listing with their byte offsets.
+
+        :returns: generator of (`str`, (`int`, `int`))
+        '''
+        fmap = self.map
+        if fmap is None:
+            return
+        start = 0
+        while True:
+            end = fmap.find(b'\n', start) + 1 or len(fmap)
+            if end == start:
+                return
+            yield (fmap[start:end].decode('utf-8', errors='ignore'),
+                   (start, end))
+            start = end
+
+    def read(self, spans):
+        '''Build the string corresponding to the given byte offsets.
+
+        :param spans: start and end offsets of the parts to read
+        :type spans: tuple(tuple(int, int))
+        :rtype: str
+        '''
+        fmap = self.map
+        return b''.join(fmap[start:end] for start, end in spans).decode(
+            'utf-8', errors='ignore')
+
+    def close(self):
+        '''Close the memory map (it will be re-opened if needed).'''
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class LazyBlocks(Mapping):
+    '''Ordered mapping of byte offsets in a :class:`MappedListing`, the
+    corresponding strings are only built when an item is accessed.
+
+    :param MappedListing listing: memory-mapped listing
+    '''
+
+    def __init__(self, listing):
+        self.listing = listing
+        self.spans = OrderedDict()
+
+    def __setitem__(self, key, spans):
+        self.spans[key] = spans
+
+    def __getitem__(self, key):
+        return self.listing.read(self.spans[key])
+
+    def __iter__(self):
+        yield from self.spans
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __reversed__(self):
+        yield from reversed(self.spans)
+
+
+class ScanIndex:
+    '''Index file storing the result of a memory-mapped scan.
+
+    The index is written next to the listing, with the :attr:`SUFFIX`
+    extension. It is only valid for a given state of the listing, identified
+    by its path, size, modification time and a hash of its content (only the
+    first and last :attr:`HASH_CHUNK` bytes are hashed, so that checking the
+    index stays cheap for huge listings), and for a given end flag.
+
+    :param str fname: path to the listing
+    :param str end_flag: end flag used in the scan
+    '''
+
+    SUFFIX = '.scanidx'
+    VERSION = 1
+    HASH_CHUNK = 1 << 20
+
+    def __init__(self, fname, end_flag=''):
+        self.fname = fname
+        self.path = fname + self.SUFFIX
+        self.end_flag = end_flag
+
+    def key(self):
+        '''Identify the current state of the listing.
+
+        :rtype: tuple
+        '''
+        stat = os.stat(self.fname)
+        hsh = sha256()
+        with open(self.fname, 'rb') as fil:
+            hsh.update(fil.read(self.HASH_CHUNK))
+            if stat.st_size > self.HASH_CHUNK:
+                fil.seek(max(self.HASH_CHUNK, stat.st_size - self.HASH_CHUNK))
+                hsh.update(fil.read(self.HASH_CHUNK))
+        return (self.VERSION, os.path.abspath(self.fname), stat.st_size,
+                stat.st_mtime_ns, hsh.hexdigest(), self.end_flag)
+
+    def load(self):
+        '''Load the index if it exists and matches the listing.
+
+        :returns: the stored scan state or `None` if the index is missing,
+            unreadable or outdated
+        :rtype: dict or None
+        '''
+        try:
+            with open(self.path, 'rb') as fil:
+                key, state = pickle.load(fil)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError) as err:
+            LOGGER.warning('cannot load scan index %r: %s', self.path, err)
+            return None
+        if key != self.key():
+            LOGGER.info('scan index %r is outdated', self.path)
+            return None
+        LOGGER.debug('scan index loaded from %r', self.path)
+        return state
+
+    def save(self, state):
+        '''Write the index for the current state of the listing.
+
+        Failures are only logged: the index is an optimization.
+
+        :param dict state: scan state to store
+        '''
+        tmp_path = f'{self.path}.{os.getpid()}'
+        try:
+            with open(tmp_path, 'wb') as fil:
+                pickle.dump((self.key(), state), fil)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            LOGGER.warning('cannot write scan index %r: %s', self.path, err)
+            return
+        LOGGER.debug('scan index written in %r', self.path)
+
+
 class Scanner(Mapping):
     # pylint: disable=too-many-instance-attributes
     '''Class to scan the Tripoli-4 listing and keep the relevant parts of it
@@ -329,6 +608,14 @@ class Scanner(Mapping):
         keep the homogenized material dump as :class:`str` indexed by batch
         number
 
+    `use_mmap` (:class:`bool`)
+        `True` if the file is memory-mapped: only byte offsets of the result
+        blocks, photon electron positron balances and homogenized material
+        dumps are kept, strings are built on access
+
+    `from_index` (:class:`bool`)
+        `True` if the scan result was loaded from a :class:`ScanIndex`
+
 
     **Available methods:**
 
@@ -344,7 +631,8 @@ class Scanner(Mapping):
     '''
 
     @profile
-    def __init__(self, fname, end_flag=""):
+    def __init__(self, fname, end_flag="", *, use_mmap=False,
+                 use_index=False):
         '''Initialize the instance from the file `fname`, meaning reads the
         file and store the relevant parts of it, i.e. result block for each
         batch edition.
@@ -360,8 +648,16 @@ class Scanner(Mapping):
 
         :param str fname: name of the input file
         :param str end_flag: end flag of the results block in Tripoli-4 listing
+        :param bool use_mmap: memory-map the file and only store byte offsets
+            of the result blocks (for huge listings)
+        :param bool use_index: load the scan result from a :class:`ScanIndex`
+            if it is up to date, else scan the file and write the index
+            (implies `use_mmap`)
         '''
         self.fname = fname
+        self.use_mmap = use_mmap or use_index
+        self.from_index = False
+        self._listing = MappedListing(fname) if self.use_mmap else None
         self.batches = {"batches": None,
                         "packet_length": 1}
         self.tasks = 1
@@ -376,11 +672,54 @@ class Scanner(Mapping):
         self.counterrors = 0
         self.times = OrderedDict()
         self.last_generator_state = ""
-        self.phemep_balance = {}
-        self.homog_mat = {}
+        self.phemep_balance = self._new_blocks()
+        self.homog_mat = self._new_blocks()
         self._fatal_error = []
-        self._collres = OrderedDict()
-        self._get_collres()
+        self._collres = self._new_blocks()
+        index = ScanIndex(fname, end_flag) if use_index else None
+        state = index.load() if index else None
+        if state is not None:
+            self._restore_state(state)
+        else:
+            self._get_collres()
+            if index:
+                index.save(self._index_state())
+
+    def _new_blocks(self):
+        '''Container for blocks indexed by batch number.'''
+        if self.use_mmap:
+            return LazyBlocks(self._listing)
+        return OrderedDict()
+
+    _INDEXED_VARS = ('batches', 'tasks', 'normalend', 'para', 'partial',
+                     'countwarnings', 'counterrors', 'times',
+                     'last_generator_state', '_fatal_error')
+    _INDEXED_BLOCKS = ('phemep_balance', 'homog_mat', '_collres')
+
+    def _index_state(self):
+        '''State of the memory-mapped scan to be stored in the index.'''
+        state = {var: getattr(self, var) for var in self._INDEXED_VARS}
+        state.update({blocks: getattr(self, blocks).spans
+                      for blocks in self._INDEXED_BLOCKS})
+        return state
+
+    def _restore_state(self, state):
+        '''Restore the scan result from the state stored in the index.'''
+        for var in self._INDEXED_VARS:
+            setattr(self, var, state[var])
+        for blocks in self._INDEXED_BLOCKS:
+            getattr(self, blocks).spans = state[blocks]
+        self.from_index = True
+
+    def _lines(self):
+        '''Yield the lines of the file with their byte offsets (`None` if
+        the file is not memory-mapped).'''
+        if self.use_mmap:
+            yield from self._listing.lines()
+            return
+        with open(self.fname, errors='ignore', encoding='utf-8') as fil:
+            for line in fil:
+                yield line, None
 
     def _check_input_data(self, line):
         '''Get some parameters from introdcution of the results file, i.e.
@@ -447,11 +786,11 @@ class Scanner(Mapping):
     def _additional_outputs(self, batch_scan):
         bnum = batch_scan.batch_counts['number']
         if batch_scan.phemep_balance.count == 3:
-            self.phemep_balance[bnum] = ''.join(
-                batch_scan.phemep_balance.content)
+            self.phemep_balance[bnum] = (
+                batch_scan.phemep_balance.content.value())
         if (batch_scan.homog_mat.nb_corr_lines != 0
                 and not batch_scan.homog_mat.in_dump):
-            self.homog_mat[bnum] = ''.join(batch_scan.homog_mat.content)
+            self.homog_mat[bnum] = batch_scan.homog_mat.content.value()
 
     @profile
     def _get_collres(self):
@@ -461,57 +800,56 @@ class Scanner(Mapping):
         generator_state = []
         current_batch = 0
         _batch_scan = None
-        with open(self.fname, errors='ignore', encoding='utf-8') as fil:
-            for line in fil:
-                if line.lstrip().startswith("//"):  # comment in the jdd
-                    continue
-                if line.lstrip().startswith("!!!"):
-                    continue
-                self._set_counters_and_flags(line)
-                if _batch_scan:
-                    _batch_scan.build_result(line)
-                    end_flag = self._is_end_flag(line)
-                    if end_flag:
-                        LOGGER.debug('end flag "%s" found', end_flag)
-                        # check batch number has to be before get result to
-                        # modify batch number before storage if necessary...
-                        _batch_scan.check_batch_number()
-                        batch_number = _batch_scan.batch_counts['number']
-                        self._collres[batch_number] = _batch_scan.get_result()
-                        self._additional_outputs(_batch_scan)
-                        _batch_scan = None
-                        # ordered dictionary -> unique keys, so only last kept
-                        self._add_time(end_flag, line)
-                        continue
-                elif self._fatal_error:
-                    self._fatal_error.append(line)
-                elif not self.times:
-                    self._check_input_data(line)
+        for line, span in self._lines():
+            if line.lstrip().startswith("//"):  # comment in the jdd
+                continue
+            if line.lstrip().startswith("!!!"):
+                continue
+            self._set_counters_and_flags(line)
+            if _batch_scan:
+                _batch_scan.build_result(line, span)
+                end_flag = self._is_end_flag(line)
+                if end_flag:
+                    LOGGER.debug('end flag "%s" found', end_flag)
+                    # check batch number has to be before get result to
+                    # modify batch number before storage if necessary...
+                    _batch_scan.check_batch_number()
+                    batch_number = _batch_scan.batch_counts['number']
+                    self._collres[batch_number] = _batch_scan.get_result()
+                    self._additional_outputs(_batch_scan)
+                    _batch_scan = None
+                    # ordered dictionary -> unique keys, so only last kept
+                    self._add_time(end_flag, line)
                     continue
-                elif "RESULTS ARE GIVEN" in line:
-                    _batch_scan = BatchResultScanner(current_batch, self.para,
-                                                     line)
-                elif (self.partial and line.startswith(' number of batch')
-                      or line.startswith(' batch number :')):
-                    current_batch = int(line.split()[-1])
-                elif self._is_end_flag(line):
-                    check_current_batch = (
-                        current_batch == list(self._collres.keys())[-1]
-                        if self._collres else False)
-                    if not self.para and not check_current_batch:
-                        continue
-                    # still needed to be sure "elapsed time" appears in
-                    # parallel jobs
-                    self._add_time(self._is_end_flag(line), line)
-                elif ("Type and parameters of random generator "
-                      "at the end of simulation:" in line):
-                    generator_state.append('')
+            elif self._fatal_error:
+                self._fatal_error.append(line)
+            elif not self.times:
+                self._check_input_data(line)
+                continue
+            elif "RESULTS ARE GIVEN" in line:
+                _batch_scan = BatchResultScanner(current_batch, self.para,
+                                                 line, span)
+            elif (self.partial and line.startswith(' number of batch')
+                  or line.startswith(' batch number :')):
+                current_batch = int(line.split()[-1])
+            elif self._is_end_flag(line):
+                check_current_batch = (
+                    current_batch == list(self._collres.keys())[-1]
+                    if self._collres else False)
+                if not self.para and not check_current_batch:
                     continue
-                elif generator_state:
-                    generator_state.append(line)
-                    if "COUNTER" in line:
-                        self.last_generator_state = ''.join(generator_state)
-                        generator_state = []
+                # still needed to be sure "elapsed time" appears in
+                # parallel jobs
+                self._add_time(self._is_end_flag(line), line)
+            elif ("Type and parameters of random generator "
+                  "at the end of simulation:" in line):
+                generator_state.append('')
+                continue
+            elif generator_state:
+                generator_state.append(line)
+                if "COUNTER" in line:
+                    self.last_generator_state = ''.join(generator_state)
+                    generator_state = []
         if not self._collres and _batch_scan:
             raise ScannerException("No scan result built: "
                                    "no end flag found in the file")
@@ -115,6 +115,24 @@ def convert_spectrum(toks, spectrum_type):
     return common.convert_spectrum(toks, spectrumcols)
 
 
+def convert_spectrum_table(toks):
+    '''Convert a whole spectrum table to a 2-dimensions :obj:`numpy.ndarray`.
+
+    Each line of the table is ``bin_low - bin_up val_1 ... val_n``, the number
+    of columns is the same for all lines (ensured by the grammar). The
+    conversion is done at once by NumPy instead of token by token.
+
+    :param toks: spectrum table as a single string
+    :type toks: |parseres|
+    :returns: list containing the array of shape ``(number of lines, n+2)``
+        (the ``'-'`` column is dropped)
+    '''
+    text = toks[0]
+    ncols = len(text.split('\n', 1)[0].split())
+    table = np.array(text.split()).reshape(-1, ncols)
+    return [np.delete(table, 1, axis=1).astype(common.FTYPE)]
+
+
 def convert_mesh(toks):
     '''Convert mesh to :obj:`numpy` object using
     :mod:`~valjean.eponine.tripoli4.common`.
@@ -288,7 +306,7 @@ def convert_generic_adjoint(toks):
     :type toks: |parseres|
     :returns: list(dict) compatible with
       :class:`~valjean.eponine.browser.Browser` and
-      :class:`~valjean.eponine.browser.Index`.
+      :class:`~valjean.eponine.index.Index`.
 
     .. seealso::
 
@@ -309,7 +327,7 @@ def convert_generic_kinetic(toks):
     :type toks: |parseres|
     :returns: list(dict) compatible with
       :class:`~valjean.eponine.browser.Browser` and
-      :class:`~valjean.eponine.browser.Index`.
+      :class:`~valjean.eponine.index.Index`.
 
     .. seealso::
 
@@ -213,6 +213,12 @@ sequence of tasks and running them::
     >>> print(env[extract_task.name]['result'])
     20
 
+All the decorators accept a selection, with the same keywords as
+:meth:`~.browser.Browser.filter_by` (for instance
+``use.using_browser(echo_factory, 10, response_function='FLUX')``): only the
+matching results are then parsed and injected, the other responses are skipped
+by the parser (see :meth:`~.Parser.parse_from_number`).
+
 
 Module API
 ==========
@@ -234,62 +240,71 @@ def partial(func, *args, **kwargs):
     return partial_func
 
 
-def make_parser(filename):
+def make_parser(filename, *, use_index=False):
     '''Create a Parser object and scan a Tripoli-4 output file.
 
     :param str filename: the name of the file to parse.
-    :param int batch: the number of the batch to parse; see
-                      :meth:`~.Parser.__init__`.
+    :param bool use_index: reuse the scan index of the file if it is up to
+        date; see :meth:`~.Parser.__init__`.
     :raises ValueError: if parsing fails.
     :returns: the parser
     :rtype: Parser
     '''
     try:
-        parser = Parser(filename)
+        parser = Parser(filename, use_index=use_index)
     except ParserException as tpe:
         raise TaskException(f'cannot build parser {filename}: {tpe}') from None
     return parser
 
 
-def parse_batch_number(parser, *, batch_number):
+def parse_batch_number(parser, *, batch_number, **selectors):
     '''Parse a batch result from Tripoli-4.
 
     :param int batch_number: batch number
+    :param selectors: only parse the results matching the selection, see
+        :meth:`~.Parser.parse_from_number`
     :rtype: ParseResult
     '''
     try:
-        pres = parser.parse_from_number(batch_number=batch_number)
+        pres = parser.parse_from_number(batch_number=batch_number,
+                                        **selectors)
     except ParserException as t4pe:
         raise TaskException(f'cannot parse {parser.jdd}: {t4pe}') from None
     return pres
 
 
-def parse_batch_index(parser, *, batch_index=-1):
+def parse_batch_index(parser, *, batch_index=-1, **selectors):
     '''Parse a batch result from Tripoli-4.
 
     :param int batch_index: index of the batch in the list of batches
+    :param selectors: only parse the results matching the selection, see
+        :meth:`~.Parser.parse_from_number`
     :rtype: ParseResult
     '''
     try:
-        pres = parser.parse_from_index(batch_index=batch_index)
+        pres = parser.parse_from_index(batch_index=batch_index, **selectors)
     except ParserException as t4pe:
         raise TaskException(f'cannot parse {parser.jdd}: {t4pe}') from None
     return pres
 
 
-def using_parser(factory):
+def using_parser(factory, *, use_index=False):
     '''Construct a decorator that injects Tripoli-4 parser into a Python
     function.
 
     :param factory: a factory producing Tripoli-4 runs.
     :type factory: :class:`~.RunTaskFactory`
+    :param bool use_index: reuse the scan index of the Tripoli-4 output if it
+        is up to date (see :ref:`eponine-t4-scan-index`).
     :returns: a decorator (see the module docstring for more information).
     '''
     use_run = UseRun.from_factory(factory)
+    if use_index:
+        return use_run.map(partial(make_parser, use_index=True))
     return use_run.map(make_parser)
 
 
-def using_parse_result(factory, batch_number):
+def using_parse_result(factory, batch_number, **selectors):
     '''Construct a decorator that injects the raw Tripoli-4 parse results into
     a Python function.
 
@@ -297,23 +312,29 @@ def using_parse_result(factory, batch_number):
     :type factory: :class:`~.RunTaskFactory`
     :param int batch_number: the number of the batch to parse; see
         :meth:`~.Parser.__init__`.
+    :param selectors: only parse the results matching the selection (same
+        keywords as :meth:`~.browser.Browser.filter_by`); see
+        :meth:`~.Parser.parse_from_number`.
     :returns: a decorator (see the module docstring for more information).
     '''
     use_parser = using_parser(factory)
     return use_parser.map(partial(parse_batch_number,
-                                  batch_number=batch_number))
+                                  batch_number=batch_number, **selectors))
 
 
-def using_last_parse_result(factory):
+def using_last_parse_result(factory, **selectors):
     '''Construct a decorator that injects the last raw Tripoli-4 parse results
     into a Python function.
 
     :param factory: a factory producing Tripoli-4 runs.
     :type factory: :class:`~.RunTaskFactory`
+    :param selectors: only parse the results matching the selection; see
+        :func:`using_parse_result`.
     :returns: a decorator (see the module docstring for more information).
     '''
     use_parser = using_parser(factory)
-    return use_parser.map(partial(parse_batch_index, batch_index=-1))
+    return use_parser.map(partial(parse_batch_index, batch_index=-1,
+                                  **selectors))
 
 
 def to_browser(result):
@@ -326,7 +347,7 @@ def to_browser(result):
     return result.to_browser()
 
 
-def using_browser(factory, batch_number):
+def using_browser(factory, batch_number, **selectors):
     '''Construct a decorator that injects an
     :class:`~.browser.Browser` to the Tripoli-4 parse results into a
     Python function.
@@ -335,20 +356,25 @@ def using_browser(factory, batch_number):
     :type factory: :class:`~.RunTaskFactory`
     :param int batch_number: the number of the required batch (will be parsed
         then transformed in  :class:`~.browser.Browser`)
+    :param selectors: only parse the results matching the selection, the
+        browser then only contains them; see :func:`using_parse_result`.
     :returns: a decorator (see the module docstring for more information).
     '''
-    use_parse_result = using_parse_result(factory, batch_number=batch_number)
+    use_parse_result = using_parse_result(factory, batch_number=batch_number,
+                                          **selectors)
     return use_parse_result.map(to_browser)
 
 
-def using_last_browser(factory):
+def using_last_browser(factory, **selectors):
     '''Construct a decorator that injects a
     :class:`~.browser.Browser` to the Tripoli-4 last parse results
     into a Python function.
 
     :param factory: a factory producing Tripoli-4 runs.
     :type factory: :class:`~.RunTaskFactory`
+    :param selectors: only parse the results matching the selection; see
+        :func:`using_parse_result`.
     :returns: a decorator (see the module docstring for more information).
     '''
-    use_parse_result = using_last_parse_result(factory)
+    use_parse_result = using_last_parse_result(factory, **selectors)
     return use_parse_result.map(to_browser)
@@ -35,12 +35,98 @@ computes a SHA-256 hash for any object implementing a `self.data()` generator.
 The `self.data()` method is expected to yield bytestrings representing the
 internal state of the object. The hash computed by :func:`fingerprint`
 represents the state of the object in a compact way.
+
+Composite objects (for instance tests on datasets, or tests wrapping other
+tests) may yield the fingerprints of their children instead of re-yielding
+the bytes of the children, so that each child is hashed only once when
+fingerprints are memoized (see below). The children are hashed with the
+algorithm of the enclosing :func:`fingerprint` call (see `Hash algorithms`_).
+
+Memoization
+-----------
+
+Computing the fingerprint of an object holding big arrays is costly. In the
+scope of the :func:`memoized_fingerprints` context manager, fingerprints are
+stored by identity of the objects and are only computed once per object. The
+objects must not be modified in this scope:
+
+>>> class MyObject:
+...     def __init__(self, x):
+...         self.x = x
+...     def data(self):
+...         print('hashing')
+...         yield str(self.x).encode('utf-8')
+>>> obj = MyObject(42)
+>>> with memoized_fingerprints():
+...     fpr1 = fingerprint(obj)
+...     fpr2 = fingerprint(obj)
+hashing
+>>> fpr1 == fpr2
+True
+
+Hash algorithms
+---------------
+
+SHA-256 is used by default. `BLAKE2b`_ is also available; it is faster on
+64-bit platforms and its digest size can be chosen:
+
+.. _BLAKE2b: https://www.blake2.net/
+
+>>> obj = MyObject('some_string')
+>>> fingerprint(obj, algorithm='blake2b', digest_size=16)
+hashing
+'f7024536f70a23a4e821edc31bb4e23b'
+
+If no algorithm is given, :func:`fingerprint` uses the algorithm and digest
+size of the enclosing call, if it is called while hashing another object:
+
+>>> class MyComposite:
+...     def __init__(self, child):
+...         self.child = child
+...     def data(self):
+...         yield fingerprint(self.child).encode('utf-8')
+>>> with memoized_fingerprints():
+...     fpr = fingerprint(MyComposite(obj), algorithm='blake2b',
+...                       digest_size=16)
+...     child_fpr = fingerprint(obj, algorithm='blake2b', digest_size=16)
+hashing
 '''
 
-from hashlib import sha256
+from contextlib import contextmanager
+from hashlib import sha256, blake2b
+import threading
+
+
+#: available hash algorithms
+ALGORITHMS = ('sha256', 'blake2b')
+
+# default algorithm and digest size
+_DEFAULT_HASH = ('sha256', 32)
+
+_LOCAL = threading.local()
+
+
+@contextmanager
+def memoized_fingerprints():
+    '''Context manager memoizing the fingerprints computed in the current
+    thread, by identity of the objects.
+
+    The memoized objects are kept alive until the end of the outermost scope,
+    so that their identities cannot be reused by other objects. They must not
+    be modified in the scope. Nested scopes share the memo of the outermost
+    one.
+    '''
+    if getattr(_LOCAL, 'memo', None) is not None:
+        yield
+        return
+    _LOCAL.memo = {}
+    try:
+        yield
+    finally:
+        _LOCAL.memo = None
 
 
-def fingerprint(obj):
+def fingerprint(obj, *, algorithm=None, digest_size=None):
     '''Compute the fingerprint of `obj`.
 
     Example:
@@ -57,10 +143,43 @@ def fingerprint(obj):
     >>> fingerprint(obj)
     '539a374ff43dce2e894fd4061aa545e6f7f5972d40ee9a1676901fb92125ffee'
 
+    :param algorithm: hash algorithm, among :data:`ALGORITHMS` (default:
+        the algorithm of the enclosing call if `obj` is hashed while hashing
+        another object, ``'sha256'`` otherwise)
+    :type algorithm: str or None
+    :param digest_size: size of the digest in bytes (only used by the
+        ``'blake2b'`` algorithm, at most 64; default: the digest size of the
+        enclosing call if `algorithm` is not given either, 32 otherwise)
+    :type digest_size: int or None
     :returns: a hash representing `obj`
     :rtype: str
     '''
-    hasher = sha256()
-    for data in obj.data():
-        hasher.update(data)
-    return hasher.hexdigest()
+    if algorithm is None:
+        algorithm, outer_size = getattr(_LOCAL, 'hash_params', _DEFAULT_HASH)
+        if digest_size is None:
+            digest_size = outer_size
+    elif digest_size is None:
+        digest_size = _DEFAULT_HASH[1]
+    memo = getattr(_LOCAL, 'memo', None)
+    if memo is not None:
+        key = (id(obj), algorithm, digest_size)
+        if key in memo:
+            return memo[key][1]
+    if algorithm == 'sha256':
+        hasher = sha256()
+    elif algorithm == 'blake2b':
+        hasher = blake2b(digest_size=digest_size)
+    else:
+        raise ValueError(f'unknown hash algorithm {algorithm!r}, choose '
+                         f'among {ALGORITHMS}')
+    outer_params = getattr(_LOCAL, 'hash_params', _DEFAULT_HASH)
+    _LOCAL.hash_params = (algorithm, digest_size)
+    try:
+        for data in obj.data():
+            hasher.update(data)
+    finally:
+        _LOCAL.hash_params = outer_params
+    fpr = hasher.hexdigest()
+    if memo is not None:
+        memo[key] = (obj, fpr)
+    return fpr
@@ -53,7 +53,7 @@ from ...cosette.task import TaskStatus, close_dependency_graph
 from ...cosette.use import Use
 from ..test import Test, TestResult
 from ..eval_test_task import EvalTestTask
-from ...eponine.browser import Index
+from ...eponine.index import Index
 
 
 LOGGER = logging.getLogger(__name__)
@@ -32,16 +32,25 @@
 task that evaluates a collection of :class:`~.gavroche.test.Test` objects and
 transforms them into :class:`~.gavroche.test.TestResult` objects, which can be
 subsequently processed for inclusion in a test report.
+
+Test results are stored in a :class:`~.ResultCache` under the output root, so
+that unchanged tests are not evaluated again by the next runs.
 '''
 
 import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from ..chunks import chunk_size
+from ..fingerprint import fingerprint, memoized_fingerprints
 from ..path import ensure, sanitize_filename
 from ..cosette.task import TaskStatus
 from ..cosette.use import from_env
 from ..cosette.pythontask import PythonTask
 from ..gavroche.test import Test, TestResultFailed
+from ..gavroche.result_cache import ResultCache, rebind
 
 
 LOGGER = logging.getLogger(__name__)
@@ -62,26 +71,167 @@ def actually_eval_test(test):
     return res
 
 
+def evaluate_tests_batched(tests):
+    '''Evaluate a list of tests, in batches when possible.
+
+    Tests whose class provides an ``evaluate_batch`` class method (for
+    instance :class:`~.TestStudent` and :class:`~.TestChi2`) are grouped by
+    class and evaluated together with vectorized calls; the other ones are
+    evaluated one by one with :func:`actually_eval_test`. Tests that cannot be
+    batched, or whose batch raises a numerical or data error, are also
+    evaluated one by one (with a warning in the latter case), so that their
+    failures are reported as :class:`~.TestResultFailed` as usual.
+
+    :param list(Test) tests: the tests to evaluate
+    :returns: the results, in the order of the tests
+    :rtype: list(TestResult)
+    '''
+    results = [None] * len(tests)
+    batches = defaultdict(list)
+    for itest, test in enumerate(tests):
+        if hasattr(type(test), 'evaluate_batch'):
+            batches[type(test)].append(itest)
+        else:
+            results[itest] = actually_eval_test(test)
+    for test_class, itests in batches.items():
+        LOGGER.debug('evaluating %d tests of type %s in batch', len(itests),
+                     test_class.__name__)
+        try:
+            batch_res = test_class.evaluate_batch([tests[i] for i in itests])
+        except (ValueError, TypeError, IndexError, ArithmeticError) as ex:
+            LOGGER.warning('batch evaluation of %d tests of type %s failed '
+                           '(%s: %s), evaluating them one by one',
+                           len(itests), test_class.__name__,
+                           type(ex).__name__, ex)
+            batch_res = [None] * len(itests)
+        for itest, res in zip(itests, batch_res):
+            results[itest] = (actually_eval_test(tests[itest]) if res is None
+                              else res)
+    return results
+
+
+def evaluate_tests_sharded(tests, *, n_workers=None, chunksize=None):
+    '''Evaluate a list of tests in chunks, in a pool of processes.
+
+    Each chunk of consecutive tests is evaluated in a worker process with
+    :func:`evaluate_tests_batched`; the results are bound back to the given
+    tests (and not to the copies sent to the workers, see
+    :func:`~.result_cache.rebind`). If a chunk cannot be evaluated in a worker
+    (for instance because a test cannot be pickled), it is evaluated in the
+    current process, so that test failures are still reported as
+    :class:`~.TestResultFailed`.
+
+    :param list(Test) tests: the tests to evaluate
+    :param n_workers: number of worker processes (default: number of CPUs);
+        with 1 the tests are evaluated in the current process
+    :type n_workers: int or None
+    :param chunksize: number of tests per chunk (default: the tests are split
+        in four chunks per worker)
+    :type chunksize: int or None
+    :returns: the results, in the order of the tests
+    :rtype: list(TestResult)
+    '''
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = chunk_size(len(tests), n_workers)
+    if n_workers == 1 or len(tests) <= chunksize:
+        return evaluate_tests_batched(tests)
+    chunks = [tests[start:start+chunksize]
+              for start in range(0, len(tests), chunksize)]
+    LOGGER.debug('evaluating %d tests in %d chunks with %d workers',
+                 len(tests), len(chunks), n_workers)
+    results = []
+    with ProcessPoolExecutor(n_workers) as executor:
+        futures = [executor.submit(evaluate_tests_batched, chunk)
+                   for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                chunk_res = future.result()
+            except Exception as ex:  # pylint: disable=broad-except
+                LOGGER.warning('evaluation of %d tests in a worker failed '
+                               '(%s), evaluating them in the main process',
+                               len(chunk), ex)
+                results.extend(evaluate_tests_batched(chunk))
+                continue
+            for test, res in zip(chunk, chunk_res):
+                rebind(res, test)
+            results.extend(chunk_res)
+    return results
+
+
+def evaluate_tests_cached(tests, cache, *, n_workers=1, chunksize=None):
+    '''Evaluate a list of tests, reusing the results stored in a cache.
+
+    Only the tests that are not in the cache are evaluated (see
+    :func:`evaluate_tests_sharded`); their results are then stored in the
+    cache (which is not pruned, see :meth:`~.ResultCache.evict`). Tests that
+    are not
+    :attr:`~.Test.cacheable` are always evaluated and their results are not
+    stored.
+
+    :param list(Test) tests: the tests to evaluate
+    :param cache: the cache of results, or `None` to evaluate all the tests
+    :type cache: ResultCache or None
+    :param n_workers: number of worker processes
+    :type n_workers: int or None
+    :param chunksize: number of tests per chunk
+    :type chunksize: int or None
+    :returns: the results, in the order of the tests
+    :rtype: list(TestResult)
+    '''
+    if cache is None:
+        return evaluate_tests_sharded(tests, n_workers=n_workers,
+                                      chunksize=chunksize)
+    with memoized_fingerprints():
+        fprs = [fingerprint(test) if test.cacheable else None
+                for test in tests]
+    results = [None if fpr is None else cache.get(test, fpr)
+               for test, fpr in zip(tests, fprs)]
+    missing = [itest for itest, res in enumerate(results) if res is None]
+    LOGGER.debug('%d results found in the cache, %d tests to evaluate',
+                 len(tests) - len(missing), len(missing))
+    if not missing:
+        return results
+    new_results = evaluate_tests_sharded([tests[i] for i in missing],
+                                         n_workers=n_workers,
+                                         chunksize=chunksize)
+    for itest, res in zip(missing, new_results):
+        results[itest] = res
+        if fprs[itest] is not None:
+            cache.put(tests[itest], res, fprs[itest])
+    return results
+
+
 class EvalTestTask(PythonTask):
     '''Class that evaluates a list of tests and stores the resulting
     :class:`~.TestResult` objects in the environment.'''
 
     @classmethod
-    def from_test_task(cls, test_task, name=None):
+    def from_test_task(cls, test_task, name=None, *, n_workers=1,
+                       chunksize=None):
         '''This method instantiates an :class:`EvalTestTask` that will evaluate
         all the tests generated by a given task.
 
         :param Task test_task: a task that is expected to generate a list of
                                tests as a result.
+        :param n_workers: number of processes used to evaluate the tests,
+            see :func:`evaluate_tests_sharded`
+        :type n_workers: int or None
+        :param chunksize: number of tests evaluated per process at a time
+        :type chunksize: int or None
         '''
         test_task_name = test_task.name
         if name is None:
             eval_task_name = test_task_name + '.eval'
         else:
             eval_task_name = name
-        return cls(eval_task_name, test_task_name, deps=[test_task])
+        return cls(eval_task_name, test_task_name, deps=[test_task],
+                   n_workers=n_workers, chunksize=chunksize)
 
-    def __init__(self, name, test_task_name, *, deps=None, soft_deps=None):
+    def __init__(self, name, test_task_name, *, deps=None, soft_deps=None,
+                 n_workers=1, chunksize=None):
+        # pylint: disable=too-many-arguments
         '''Direct instantiation of an :class:`EvalTestTask`.
 
         :param str name: the name of this task.
@@ -91,6 +241,12 @@ class EvalTestTask(PythonTask):
         :type deps: list(Task) or None
         :param soft_deps: the list of soft dependencies for this task.
         :type soft_deps: list(Task) or None
+        :param n_workers: number of processes used to evaluate the tests
+            (default: 1, the tests are evaluated in the task thread; `None`
+            means the number of CPUs), see :func:`evaluate_tests_sharded`
+        :type n_workers: int or None
+        :param chunksize: number of tests evaluated per process at a time
+        :type chunksize: int or None
         '''
         def evaluate(*, env, config):
             tests = from_env(env=env, task_name=test_task_name, key='result')
@@ -103,7 +259,9 @@ class EvalTestTask(PythonTask):
                                     f'{self.name!r}, but one of the list '
                                     'elements is a {type(test)}')
 
-            results = [actually_eval_test(test) for test in tests]
+            cache = ResultCache.from_config(config)
+            results = evaluate_tests_cached(tests, cache, n_workers=n_workers,
+                                            chunksize=chunksize)
 
             output_dir = Path(config.query('path', 'output-root'),
                               sanitize_filename(self.name))
@@ -117,14 +275,20 @@ class EvalTestTask(PythonTask):
                          env_kwarg='env', config_kwarg='config')
 
 
-def evaluate_tests(test_fn, name=None):
+def evaluate_tests(test_fn, name=None, *, n_workers=1, chunksize=None):
     '''Create an :class:`EvalTestTask` objects for the given test.
 
     :param test_fn: a function that produces tests, wrapped in a
         :class:`~valjean.cosette.use.Use` decorator.
     :type test_fn: valjean.cosette.use.Use
     :param str name: the name of the :class:`EvalTestTask` object.
+    :param n_workers: number of processes used to evaluate the tests
+    :type n_workers: int or None
+    :param chunksize: number of tests evaluated per process at a time
+    :type chunksize: int or None
     :returns: the task that evaluates your tests.
     :rtype: EvalTestTask
     '''
-    return EvalTestTask.from_test_task(test_fn.get_task(), name=name)
+    return EvalTestTask.from_test_task(test_fn.get_task(), name=name,
+                                       n_workers=n_workers,
+                                       chunksize=chunksize)
@@ -0,0 +1,263 @@
+# Copyright French Alternative Energies and Atomic Energy Commission
+# Contributors: valjean developers
+# valjean-support@cea.fr
+#
+# This software is a computer program whose purpose is to analyze and
+# post-process numerical simulation results.
+#
+# This software is governed by the CeCILL license under French law and abiding
+# by the rules of distribution of free software. You can use, modify and/ or
+# redistribute the software under the terms of the CeCILL license as circulated
+# by CEA, CNRS and INRIA at the following URL: http://www.cecill.info.
+#
+# As a counterpart to the access to the source code and rights to copy, modify
+# and redistribute granted by the license, users are provided only with a
+# limited warranty and the software's author, the holder of the economic
+# rights, and the successive licensors have only limited liability.
+#
+# In this respect, the user's attention is drawn to the risks associated with
+# loading, using, modifying and/or developing or reproducing the software by
+# the user in light of its specific status of free software, that may mean that
+# it is complicated to manipulate, and that also therefore means that it is
+# reserved for developers and experienced professionals having in-depth
+# computer knowledge. Users are therefore encouraged to load and test the
+# software's suitability as regards their requirements in conditions enabling
+# the security of their systems and/or data to be ensured and, more generally,
+# to use and operate it in the same conditions as regards security.
+#
+
+'''On-disk cache of :class:`~.TestResult` objects, keyed by the fingerprint of
+the tests.
+
+The :func:`~valjean.fingerprint.fingerprint` of a :class:`~.Test` represents
+its datasets and parameters, so a test whose fingerprint did not change
+between two :program:`valjean` runs does not need to be evaluated again: its
+result can be loaded from the cache.
+
+    >>> import numpy as np
+    >>> from valjean.eponine.dataset import Dataset
+    >>> from valjean.gavroche.test import TestEqual
+    >>> from valjean.gavroche.result_cache import ResultCache
+    >>> dset = Dataset(np.array([1., 2.]), np.array([0.1, 0.1]))
+    >>> test = TestEqual(dset, dset, name='equal')
+    >>> cache = ResultCache('result-cache')
+    >>> cache.get(test) is None
+    True
+    >>> cache.put(test, test.evaluate())
+    >>> cached = cache.get(test)
+    >>> bool(cached), cached.test is test
+    (True, True)
+
+Results are stored as pickle files named after the fingerprints of the tests,
+salted with the version of :program:`valjean`: results computed by another
+version, where the tests may be evaluated differently, are not reused.
+When a result is read from the cache, its file is touched, so that the cache
+can be pruned from the least recently used entries (see
+:meth:`ResultCache.evict`) when it holds too many entries or when it takes too
+much space on disk:
+
+    >>> small_cache = ResultCache('result-cache', max_entries=0)
+    >>> small_cache.evict()
+    1
+    >>> small_cache.get(test) is None
+    True
+
+Failed results (:class:`~.TestResultFailed`) are never stored, as they may
+come from an environment problem rather than from the tested data.
+
+Only the tests whose fingerprint represents all the inputs of their evaluation
+can be cached: they are marked by the :attr:`~.Test.cacheable` attribute. The
+other ones, as the diagnostic tests of :mod:`~.diagnostics.stats` that
+classify the results of other tasks, are always evaluated again.
+
+The cache is used by :class:`~.EvalTestTask`; it is located in the
+``result-cache`` directory under the output root and can be disabled with the
+``--no-result-cache`` option of ``valjean run``, which prunes it once, at the
+end of the run.
+'''
+
+import logging
+import os
+import pickle
+from pathlib import Path
+
+from hashlib import sha256
+
+from .. import __version__
+from ..fingerprint import fingerprint
+from .test import Test, TestResult, TestResultFailed
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ResultCache:
+    '''Content-addressed cache of test results on disk.'''
+
+    #: name of the cache directory under the output root
+    DIRNAME = 'result-cache'
+
+    def __init__(self, root, *, max_entries=None, max_size=None,
+                 salt=__version__):
+        '''Initialize the cache.
+
+        :param root: directory of the cache (created when the first result
+            is stored)
+        :type root: str or pathlib.Path
+        :param max_entries: maximum number of results kept by
+            :meth:`evict` (default: no limit)
+        :type max_entries: int or None
+        :param max_size: maximum total size of the cached results in bytes
+            kept by :meth:`evict` (default: no limit)
+        :type max_size: int or None
+        :param str salt: string combined with the fingerprints of the tests
+            to name the cached results (default: the version of
+            :program:`valjean`)
+        '''
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.salt = salt
+
+    @classmethod
+    def from_config(cls, config):
+        '''Build the cache from the configuration of a :program:`valjean` run.
+
+        The cache is located in the :attr:`DIRNAME` directory of the output
+        root. Its size is limited by the ``result_cache_size`` command-line
+        argument (in MB), if any.
+
+        :param Config config: the configuration object
+        :returns: the cache, or `None` if it was disabled from the command
+            line (``--no-result-cache``)
+        :rtype: ResultCache or None
+        '''
+        args = config['args'] if 'args' in config else {}
+        if not args.get('result_cache', True):
+            return None
+        max_size = args.get('result_cache_size')
+        root = Path(config.query('path', 'output-root'), cls.DIRNAME)
+        return cls(root, max_size=None if max_size is None
+                   else int(max_size * 1024**2))
+
+    def path(self, fpr):
+        '''Path of the file of a cached result.
+
+        :param str fpr: fingerprint of the test
+        :rtype: pathlib.Path
+        '''
+        key = sha256(f'{self.salt}:{fpr}'.encode('utf-8')).hexdigest()
+        return self.root / key[:2] / f'{key}.pickle'
+
+    def get(self, test, fpr=None):
+        '''Get the cached result of a test.
+
+        The test of the returned result is the given one (the test stored in
+        the cache has the same fingerprint, but may differ by its labels). The
+        results of the sub-tests of composite tests (as
+        :class:`~.TestBonferroni`) are rebound to the sub-tests of the given
+        test as well.
+
+        :param Test test: the test
+        :param str fpr: fingerprint of the test, if already known
+        :returns: the result, or `None` if it is not in the cache
+        :rtype: TestResult or None
+        '''
+        path = self.path(fingerprint(test) if fpr is None else fpr)
+        try:
+            with path.open('rb') as pfile:
+                result = pickle.load(pfile)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as ex:  # pylint: disable=broad-except
+            LOGGER.warning('cannot read cached result %s: %s', path, ex)
+            return None
+        rebind(result, test)
+        return result
+
+    def put(self, test, result, fpr=None):
+        '''Store the result of a test in the cache.
+
+        :param Test test: the test
+        :param TestResult result: its result
+        :param str fpr: fingerprint of the test, if already known
+        '''
+        if isinstance(result, TestResultFailed):
+            return
+        path = self.path(fingerprint(test) if fpr is None else fpr)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        try:
+            with tmp_path.open('wb') as pfile:
+                pickle.dump(result, pfile)
+            os.replace(tmp_path, path)
+        except Exception as ex:  # pylint: disable=broad-except
+            LOGGER.warning('cannot cache result of test %r: %s', test.name, ex)
+            _remove(tmp_path)
+
+    def entries(self):
+        '''Get the cached results.
+
+        :returns: the paths of the cached results, with their last access time
+            and their size in bytes, least recently used first
+        :rtype: list(tuple(pathlib.Path, float, int))
+        '''
+        entries = []
+        for path in self.root.glob('*/*.pickle'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
+    def evict(self):
+        '''Remove the least recently used results until the cache holds at
+        most `max_entries` results and `max_size` bytes.
+
+        :returns: the number of removed results
+        :rtype: int
+        '''
+        if self.max_entries is None and self.max_size is None:
+            return 0
+        entries = self.entries()
+        n_entries = len(entries)
+        size = sum(entry[2] for entry in entries)
+        removed = 0
+        for path, _, entry_size in entries:
+            if ((self.max_entries is None or n_entries <= self.max_entries)
+                    and (self.max_size is None or size <= self.max_size)):
+                break
+            _remove(path)
+            n_entries -= 1
+            size -= entry_size
+            removed += 1
+        LOGGER.debug('%d results removed from the cache', removed)
+        return removed
+
+
+def _remove(path):
+    '''Remove a file, if it exists.'''
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def rebind(result, test):
+    '''Bind `result` to `test`, and the result of its sub-test, if any, to the
+    sub-test of `test`, recursively.
+
+    This is used for results whose test is a copy of `test`: results loaded
+    from the cache or evaluated in another process.
+
+    :param TestResult result: the result
+    :param Test test: the test
+    '''
+    result.test = test
+    sub_result = getattr(result, 'first_test_res', None)
+    sub_test = getattr(test, 'test', None)
+    if isinstance(sub_result, TestResult) and isinstance(sub_test, Test):
+        rebind(sub_result, sub_test)
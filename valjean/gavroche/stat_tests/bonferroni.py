@@ -314,6 +314,7 @@ done per dimension).
 '''
 
 import numpy as np
+from ...fingerprint import fingerprint
 from ..test import Test, TestResult
 
 
@@ -428,12 +429,17 @@ class TestBonferroni(Test):
             for pval in test_res.pvalue]
         return TestResultBonferroni(self, test_res, null_hyp_reject)
 
+    @property
+    def cacheable(self):
+        '''The results can be cached if the ones of the corrected test can.'''
+        return self.test.cacheable
+
     def data(self):
         '''Generator yielding objects supporting the buffer protocol that (as a
         whole) represent a serialized version of `self`.'''
         yield from super().data()
         yield self.__class__.__name__.encode('utf-8')
-        yield from self.test.data()
+        yield fingerprint(self.test).encode('utf-8')
         yield float(self.alpha).hex().encode('utf-8')
 
 
@@ -564,10 +570,15 @@ class TestHolmBonferroni(Test):
                   for pvals in test_res.pvalue]
         return TestResultHolmBonferroni(self, test_res, *zip(*hb_res))
 
+    @property
+    def cacheable(self):
+        '''The results can be cached if the ones of the corrected test can.'''
+        return self.test.cacheable
+
     def data(self):
         '''Generator yielding objects supporting the buffer protocol that (as a
         whole) represent a serialized version of `self`.'''
         yield from super().data()
         yield self.__class__.__name__.encode('utf-8')
-        yield from self.test.data()
+        yield fingerprint(self.test).encode('utf-8')
         yield float(self.alpha).hex().encode('utf-8')
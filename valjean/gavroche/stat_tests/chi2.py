@@ -241,6 +241,18 @@ And when we have at least one empty bin, using the ``ignore_empty`` argument:
 >>> bool(tchi2_res)
 True
 
+Many tests can be evaluated at once with :meth:`TestChi2.evaluate_batch`, the
+comparisons of datasets of the same shape being stacked to compute the χ²
+values and the p-values in a few vectorized calls:
+
+>>> tests = [TestChi2(ds1, ds2, name='comp'),
+...          TestChi2(ds7, ds8, ignore_empty=True, name='comp2d')]
+>>> results = TestChi2.evaluate_batch(tests)
+>>> print(f'{results[1].chi2[0]:.7f}')
+5.3401639
+>>> [bool(res) for res in results]
+[True, True]
+
 .. note::
 
     A RuntimeWarning is emitted if zero bins are used during calculation.
@@ -269,7 +281,8 @@ True
 '''
 import numpy as np
 from scipy.stats import chi2 as schi2
-from ..test import TestDataset, TestResult
+from ..test import (scatter_comparisons, stack_comparisons, TestDataset,
+                    TestResult)
 
 
 class TestResultChi2(TestResult):
@@ -318,6 +331,8 @@ class TestChi2(TestDataset):
     '''Test class for χ², inheritate from :class:`~valjean.gavroche.test.Test`.
     '''
 
+    cacheable = True
+
     def __init__(self, dsref, *datasets, name, description='', labels=None,
                  alpha=0.01, ignore_empty=False):
         # pylint: disable=too-many-arguments
@@ -420,6 +435,49 @@ class TestChi2(TestDataset):
                   for _chi2, _ndf in zip(chi2, self.ndf)]
         return TestResultChi2(self, chi2, pvalue)
 
+    @classmethod
+    def evaluate_batch(cls, tests):
+        '''Evaluate many χ² tests at once.
+
+        The comparisons of all the tests are grouped by shape and the values,
+        errors and nonzero bins of the datasets are stacked, so that the χ²
+        values and the p-values are computed with a few vectorized calls for
+        the whole group. The results are then scattered back into
+        :class:`TestResultChi2` objects, in the order of the tests. The χ²
+        values are the same as the ones of :meth:`evaluate`, up to rounding
+        errors in the sums.
+
+        Tests on datasets that cannot be compared (inconsistent shapes) are
+        not evaluated here: their result is `None` and they should be
+        evaluated with :meth:`evaluate` to get the corresponding error.
+
+        :param list(TestChi2) tests: the tests to evaluate
+        :rtype: list(TestResultChi2)
+        '''
+        def check(ds1, ds2):
+            # pylint: disable=protected-access
+            ds1._check_datasets_consistency(ds2, 'subtract')
+
+        _, groups = stack_comparisons(tests, check)
+        scattered = scatter_comparisons(
+            tests, [(keys, cls._evaluate_group(tests, keys, arrays))
+                    for keys, arrays in groups.values()])
+        return [None if res is None else TestResultChi2(test, *res)
+                for test, res in zip(tests, scattered)]
+
+    @classmethod
+    def _evaluate_group(cls, tests, keys, arrays):
+        '''Compute the χ² values and the p-values of a group of comparisons
+        of the same shape (see :func:`~.stack_comparisons`).'''
+        val1, err1, val2, err2 = arrays
+        nzbs = np.stack([tests[itest].nonzero_bins[ids]
+                         for itest, ids in keys])
+        ratio2 = (val1 - val2)**2 / (err1**2 + err2**2)
+        chi2 = np.sum(np.where(nzbs, ratio2, 0.),
+                      axis=tuple(range(1, val1.ndim)))
+        ndf = np.array([tests[itest].ndf[ids] for itest, ids in keys])
+        return chi2, cls.pvalue(chi2, ndf)
+
     def data(self):
         '''Generator yielding objects supporting the buffer protocol that (as a
         whole) represent a serialized version of `self`.'''
@@ -307,6 +307,24 @@ True
   [ True  True  True]]]
 
 
+Many tests can be evaluated at once with :meth:`TestStudent.evaluate_batch`:
+the comparisons of datasets of the same shape are stacked and the Student
+statistics and the p-values are computed in a few vectorized calls. This is
+much faster than calling :meth:`TestStudent.evaluate` on each test when there
+are thousands of small tests:
+
+>>> tests = [TestStudent(ds1, ds2, name='comp'),
+...          TestStudent(ds1, ds2, ndf=1000, name='comp_ndf'),
+...          TestStudent(ds3, ds5, ds4, name='comp_arr')]
+>>> results = TestStudent.evaluate_batch(tests)
+>>> print(f'{results[1].tstud[0]:.7f}, {results[1].pvalue[0]:.7f}')
+0.2321192, 0.8164929
+>>> [bool(res) for res in results]
+[True, True, False]
+>>> print(np.array2string(results[2].oracles()))
+[[ True  True False  True False]
+ [ True  True  True  True  True]]
+
 .. warning::
     If the errors are equal to 0, so the Student denominator is 0, AND the
     values are equal, so the numerator is also 0, the Student value is set to
@@ -326,7 +344,8 @@ True
 import logging
 import numpy as np
 from scipy.stats import t, norm
-from ..test import check_bins, TestDataset, TestResult
+from ..test import (check_bins, scatter_comparisons, stack_comparisons,
+                    TestDataset, TestResult)
 
 
 LOGGER = logging.getLogger(__name__)
@@ -408,6 +427,8 @@ class TestResultStudent(TestResult):
 class TestStudent(TestDataset):
     '''Class to build the Student's t-test.'''
 
+    cacheable = True
+
     def __init__(self, dsref, *datasets, name, description='', labels=None,
                  alpha=0.01, ndf=None):
         # pylint: disable=too-many-arguments
@@ -448,6 +469,77 @@ class TestStudent(TestDataset):
         pval = [self.pvalue(tstud, self.ndf) for tstud in tstuds]
         return TestResultStudent(self, tstuds, pval)
 
+    @classmethod
+    def evaluate_batch(cls, tests):
+        '''Evaluate many Student's t-tests at once.
+
+        The comparisons of all the tests are grouped by shape and the values
+        and errors of the datasets are stacked, so that Student's t-statistics
+        and p-values are computed with a few vectorized calls for the whole
+        group (see :meth:`student_test_arrays`). The results are then
+        scattered back into :class:`TestResultStudent` objects, in the order
+        of the tests.
+
+        Tests on datasets that cannot be compared (inconsistent bins or shapes)
+        are not evaluated here: their result is `None` and they should be
+        evaluated with :meth:`evaluate` to get the corresponding error.
+
+        :param list(TestStudent) tests: the tests to evaluate
+        :rtype: list(TestResultStudent)
+        '''
+        _, groups = stack_comparisons(tests, cls._check_datasets)
+        scattered = scatter_comparisons(
+            tests, [(keys, cls._evaluate_group(tests, keys, arrays))
+                    for keys, arrays in groups.values()])
+        return [None if res is None else TestResultStudent(test, *res)
+                for test, res in zip(tests, scattered)]
+
+    @classmethod
+    def _evaluate_group(cls, tests, keys, arrays):
+        '''Compute Student's t-statistics and the p-values of a group of
+        comparisons of the same shape (see :func:`~.stack_comparisons`).'''
+        tstud = cls.student_test_arrays(*arrays)
+        ndfs = [tests[itest].ndf for itest, _ in keys]
+        pval = np.empty_like(tstud, dtype=float)
+        rows = np.array([ndf is None for ndf in ndfs])
+        pval[rows] = cls.pvalue(tstud[rows], None)
+        if not rows.all():
+            ndf = np.array([ndf for ndf in ndfs if ndf is not None])
+            pval[~rows] = cls.pvalue(
+                tstud[~rows], ndf.reshape((-1,) + (1,) * (tstud.ndim - 1)))
+        return tstud, pval
+
+    @staticmethod
+    def _check_datasets(ds1, ds2):
+        '''Check that the datasets can be compared, raise if not.'''
+        check_bins(ds1, ds2)
+        # pylint: disable=protected-access
+        ds1._check_datasets_consistency(ds2, 'subtract')
+
+    @staticmethod
+    def student_test_arrays(val1, err1, val2, err2):
+        '''Compute Student's t-test for arrays of values and errors
+        (**static method**).
+
+        This is the array version of :meth:`student_test`, the same special
+        cases (0 / 0, both errors or both values being nan) giving a 0 value.
+        It is typically used on stacked datasets.
+
+        :param numpy.ndarray val1: values of the first datasets
+        :param numpy.ndarray err1: errors of the first datasets
+        :param numpy.ndarray val2: values of the second datasets
+        :param numpy.ndarray err2: errors of the second datasets
+        :rtype: numpy.ndarray
+        '''
+        diff = val1 - val2
+        error = np.sqrt(err1**2 + err2**2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            studentt = np.asarray(diff / error, dtype=float)
+        studentt[(diff == 0) & (error == 0)] = 0
+        studentt[(diff == 0) & np.isnan(err1) & np.isnan(err2)] = 0
+        studentt[np.isnan(val1) & np.isnan(val2)] = 0
+        return studentt
+
     @staticmethod
     def student_test(ds1, ds2):
         '''Compute Student's t-test or Student distribution for the given
@@ -73,7 +73,9 @@ However, they are approximately equal:
     True
 '''
 from abc import ABC, abstractmethod
+from collections import defaultdict
 import numpy as np
+from ..fingerprint import fingerprint
 
 
 class CheckBinsException(Exception):
@@ -122,6 +124,104 @@ def check_bins(*datasets):
         raise CheckBinsException(f'Inconsistent coordinates: \n{datasets_str}')
 
 
+def stack_comparisons(tests, check):
+    '''Stack the values and the errors of the datasets compared by a list of
+    :class:`TestDataset`, grouped by shape.
+
+    Each comparison (reference dataset of a test, one of the other datasets of
+    the test) becomes a row of the stacked arrays of its shape. Tests for which
+    `check` raises on any comparison are not stacked.
+
+    >>> from valjean.eponine.dataset import Dataset
+    >>> ds1, ds2 = Dataset(np.array([1., 2.]), np.array([.1, .2])), \
+Dataset(np.array([1.5, 2.5]), np.array([.1, .1]))
+    >>> ds3 = Dataset(3., .3)
+    >>> tests = [TestEqual(ds1, ds2, ds1, name='eq1'),
+    ...          TestEqual(ds3, ds3, name='eq2'),
+    ...          TestEqual(ds1, ds3, name='eq3')]
+    >>> def check(dsref, dset):
+    ...     if dsref.shape != dset.shape:
+    ...         raise ValueError('not the same shape')
+    >>> rejected, groups = stack_comparisons(tests, check)
+    >>> rejected
+    {2}
+    >>> sorted(groups)
+    [(), (2,)]
+    >>> keys, (vref, _, val, _) = groups[(2,)]
+    >>> keys
+    [(0, 0), (0, 1)]
+    >>> print(np.array2string(val))
+    [[1.5 2.5]
+     [1.  2. ]]
+
+    :param list(TestDataset) tests: the tests
+    :param check: function called on the reference dataset and each dataset
+        of the tests, raising if they cannot be compared
+    :returns: the set of the indices of the rejected tests and a dictionary
+        giving for each shape the list of the comparisons (index of the test,
+        index of the dataset in the test) and the stacked arrays of the
+        reference values, of the reference errors, of the values and of the
+        errors
+    :rtype: tuple(set(int), dict)
+    '''
+    rejected = set()
+    pairs = defaultdict(list)
+    for itest, test in enumerate(tests):
+        try:
+            for dset in test.datasets:
+                check(test.dsref, dset)
+        except Exception:  # pylint: disable=broad-except
+            rejected.add(itest)
+            continue
+        for ids, dset in enumerate(test.datasets):
+            pairs[np.shape(dset.value)].append((itest, ids))
+    groups = {}
+    for shape, keys in pairs.items():
+        refs = [tests[itest].dsref for itest, _ in keys]
+        dsets = [tests[itest].datasets[ids] for itest, ids in keys]
+        groups[shape] = (keys, (np.stack([ds.value for ds in refs]),
+                                np.stack([ds.error for ds in refs]),
+                                np.stack([ds.value for ds in dsets]),
+                                np.stack([ds.error for ds in dsets])))
+    return rejected, groups
+
+
+def scatter_comparisons(tests, group_results):
+    '''Scatter the results computed on the groups of comparisons of
+    :func:`stack_comparisons` back to the tests.
+
+    >>> from valjean.eponine.dataset import Dataset
+    >>> ds1, ds2 = Dataset(np.array([1., 2.]), np.array([.1, .2])), \
+Dataset(3., .3)
+    >>> tests = [TestEqual(ds1, ds1, ds1, name='eq1'),
+    ...          TestEqual(ds2, ds2, name='eq2'),
+    ...          TestEqual(ds1, ds2, name='eq3')]
+    >>> scatter_comparisons(tests, [([(0, 1), (1, 0), (0, 0)],
+    ...                              (np.array([10, 20, 30]),
+    ...                               np.array([1, 2, 3])))])
+    [([30, 10], [3, 1]), ([20], [2]), None]
+
+    :param list(TestDataset) tests: the tests
+    :param group_results: for each group, the comparisons (index of the test,
+        index of the dataset in the test) and the arrays of results, with one
+        row per comparison
+    :type group_results: list(tuple(list(tuple(int, int)), tuple))
+    :returns: for each test, the lists of the rows of each array of results
+        corresponding to its datasets, or `None` if the test was not in the
+        groups (rejected by :func:`stack_comparisons`)
+    :rtype: list(tuple(list) or None)
+    '''
+    scattered = [None] * len(tests)
+    for keys, arrays in group_results:
+        for row, (itest, ids) in enumerate(keys):
+            if scattered[itest] is None:
+                scattered[itest] = tuple([None] * len(tests[itest].datasets)
+                                         for _ in arrays)
+            for res, array in zip(scattered[itest], arrays):
+                res[ids] = array[row]
+    return scattered
+
+
 class Test(ABC):
     '''Generic class for comparing any kind of results.
 
@@ -164,6 +264,11 @@ class Test(ABC):
         # labels intentionally excluded; this makes it possible to put any type
         # of items in the label values, and not just strings
 
+    #: whether the results of the test can be stored in a
+    #: :class:`~.ResultCache`; only tests whose :meth:`data` represents all
+    #: the inputs of the evaluation should set it to `True`
+    cacheable = False
+
     # tell pytest that this class and derived classes should NOT be collected
     # as tests
     __test__ = False
@@ -196,9 +301,12 @@ class TestDataset(Test):
         whole) represent a serialized version of `self`.'''
         yield from super().data()
         yield self.__class__.__name__.encode('utf-8')
-        yield from self.dsref.data()
+        # fingerprints of the datasets, so that datasets shared by several
+        # tests are only hashed once when fingerprints are memoized; they use
+        # the hash algorithm of the fingerprint of the test
+        yield fingerprint(self.dsref).encode('utf-8')
         for dataset in self.datasets:
-            yield from dataset.data()
+            yield fingerprint(dataset).encode('utf-8')
 
     @abstractmethod
     def evaluate(self):
@@ -274,6 +382,8 @@ class TestResultEqual(TestResult):
 class TestEqual(TestDataset):
     '''Test if the datasets values are equal. Errors are ignored.'''
 
+    cacheable = True
+
     def evaluate(self):
         '''Evaluation of :class:`~.TestEqual`.
 
@@ -318,6 +428,8 @@ class TestApproxEqual(TestDataset):
     Errors are ignored.
     '''
 
+    cacheable = True
+
     def __init__(self, dsref, *datasets, name, description='', labels=None,
                  rtol=1e-5, atol=1e-8):
         # pylint: disable=too-many-arguments
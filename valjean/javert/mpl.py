@@ -542,15 +542,52 @@ side-by-side bars and stacked bars.
     >>> mplplt = mpl.MplPlot(pltbar)
     >>> fig, _ = mplplt.draw()
 
+Rendering many plots
+--------------------
+
+Creating a figure and its subplots is a large part of the time needed to save
+a small plot. When many plots have to be saved, an :class:`MplRenderer` can be
+used: it keeps one figure per layout (figure size, number of subplots, grid
+specifications, ...) and clears and reuses it for the next plot with the same
+layout. Plots are written to a temporary file first, so that an interrupted
+rendering does not leave a truncated file behind.
+
+    >>> with mpl.MplRenderer() as renderer:
+    ...     renderer.save(mplplt, 'bar.png')
+    ...     renderer.save(mpl.MplPlot(pltbar), 'bar_again.png')
+    >>> len(renderer.figures)
+    0
+
+An :class:`MplRenderPool` spreads the rendering over a set of worker processes,
+each of them owning an :class:`MplRenderer` and the Agg backend. Plots are
+grouped by layout before being sent to the workers, so that most of them are
+drawn on a reused figure. Starting the workers is costly too, so the same
+pool can render several sets of plots until it is closed. A plot that cannot
+be drawn does not prevent the other ones from being saved; the failures are
+returned:
+
+    >>> with mpl.MplRenderPool(2) as pool:
+    ...     pool.render([(mplplt, 'bar.png'),
+    ...                  (mpl.MplPlot(pltbar), 'bar2.png')])
+    ...     pool.render([(mplplt, 'bar3.png')])
+    []
+    []
+
 Module API
 ----------
 '''
 import logging
+import os
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from itertools import cycle, chain
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as mplcol
 
+from ..chunks import chunk_size
+
 
 LOGGER = logging.getLogger(__name__)
 
@@ -669,14 +706,53 @@ class MplPlot:
                     'hspace': 0.4*data.backend_kw['nrows']}
         return splts_kwargs
 
-    def initialize_figure(self):
+    #: keyword arguments of :func:`matplotlib.pyplot.subplots` that describe
+    #: the subplots of a figure (the other ones describe the figure itself)
+    SUBPLOTS_KW = ('nrows', 'ncols', 'sharex', 'sharey', 'squeeze',
+                   'subplot_kw', 'gridspec_kw', 'width_ratios',
+                   'height_ratios')
+
+    def layout(self):
+        '''Return the keyword arguments used to build the figure and its
+        subplots.
+
+        :returns: the keyword arguments of :meth:`matplotlib.figure.Figure`
+            and of :meth:`matplotlib.figure.Figure.subplots`
+        :rtype: tuple(dict, dict)
+        '''
+        kwargs = {**self.figure_properties(self.data), **self.data.backend_kw,
+                  'constrained_layout': True}
+        subplots_kw = {key: kwargs.pop(key) for key in self.SUBPLOTS_KW
+                       if key in kwargs}
+        return kwargs, subplots_kw
+
+    def layout_key(self):
+        '''Return a hashable key describing the layout of the figure.
+
+        Plots with the same key can be drawn on the same figure object, see
+        :meth:`draw` and :class:`MplRenderer`.
+
+        :rtype: str
+        '''
+        fig_kw, subplots_kw = self.layout()
+        return repr((self.style.style, sorted(fig_kw.items()),
+                     sorted(subplots_kw.items())))
+
+    def initialize_figure(self, fig=None):
         '''Construct the figure and its subplots.
 
+        :param fig: if given, this figure is cleared and reused instead of
+            creating a new one; it must have been created for a plot with the
+            same :meth:`layout_key`
+        :type fig: matplotlib.figure.Figure or None
         :rtype: tuple(matplotlib.figure.Figure, list(matplotlib.axes.Axes))
         '''
-        fig, splts = plt.subplots(
-            **self.figure_properties(self.data), **self.data.backend_kw,
-            constrained_layout=True)
+        fig_kw, subplots_kw = self.layout()
+        if fig is None:
+            fig, splts = plt.subplots(**fig_kw, **subplots_kw)
+        else:
+            fig.clf()
+            splts = fig.subplots(**subplots_kw)
         if self.data.nb_plots == 1:
             splts = np.array([splts])
         return fig, splts
@@ -703,9 +779,11 @@ class MplPlot:
                         and self.data.subplots[i].ptype != 'pie')):
                 plt.setp(splt.get_legend(), visible=False)
 
-    def draw(self):
+    def draw(self, fig=None):
         '''Draw the plot.
 
+        :param fig: figure to reuse, see :meth:`initialize_figure`
+        :type fig: matplotlib.figure.Figure or None
         :rtype: tuple(matplotlib.figure.Figure, list(matplotlib.axes.Axes))
         '''
         if any(s.ptype not in MplPlot.PTYPES for s in self.data.subplots):
@@ -713,7 +791,7 @@ class MplPlot:
             raise MplPlotException(
                 f"ptype from {ptypes} not taken into account. Expected ones "
                 f"are {self.PTYPES}.")
-        fig, splts = self.initialize_figure()
+        fig, splts = self.initialize_figure(fig)
         fmts = self.style.styles_sequence(self.data.curves_index())
         for splt, sdat in zip(splts.flatten(), self.data.subplots):
             if sdat.ptype == '1D':
@@ -745,6 +823,199 @@ class MplPlot:
             plt.close(fig)
 
 
+class MplRenderer:
+    '''Draw and save :class:`MplPlot` objects, reusing the figures.
+
+    The renderer keeps at most `max_figures` figures, indexed by the
+    :meth:`~MplPlot.layout_key` of the plots drawn on them. A plot with the
+    same layout as a previous one is drawn on the cleared figure of the
+    previous plot instead of a new one. The least recently used figures are
+    closed when the limit is reached.
+    '''
+
+    def __init__(self, max_figures=8):
+        '''Construct a renderer.
+
+        :param int max_figures: maximum number of figures kept alive
+        '''
+        self.max_figures = max_figures
+        self.figures = OrderedDict()
+
+    def save(self, plot, name='fig.png'):
+        '''Draw the plot and save it under the given name.
+
+        The plot is written to a temporary file in the same directory, which
+        is then renamed to `name`.
+
+        :param MplPlot plot: the plot to save
+        :param str name: name of the output file. Expected extensions: png,
+            pdf, svg, eps.
+        '''
+        LOGGER.debug('drawing figure %s', name)
+        key = plot.layout_key()
+        fig = self.figures.pop(key, None)
+        try:
+            fig, _ = plot.draw(fig)
+        except Exception:
+            if fig is not None:
+                plt.close(fig)
+            raise
+        base, ext = os.path.splitext(name)
+        tmp_name = f'{base}.{os.getpid()}.tmp{ext}'
+        fig.savefig(tmp_name)
+        os.replace(tmp_name, name)
+        self.figures[key] = fig
+        while len(self.figures) > self.max_figures:
+            _, old_fig = self.figures.popitem(last=False)
+            plt.close(old_fig)
+
+    def save_many(self, items):
+        '''Draw and save several plots.
+
+        A plot that cannot be drawn or saved is skipped, and the other plots
+        are saved anyway.
+
+        :param items: the plots and the names of their output files
+        :type items: list(tuple(MplPlot, str))
+        :returns: the names of the files of the plots that could not be saved,
+            with the corresponding error messages
+        :rtype: list(tuple(str, str))
+        '''
+        failures = []
+        for plot, name in items:
+            try:
+                self.save(plot, name)
+            except Exception as err:  # pylint: disable=broad-except
+                failures.append((name, f'{type(err).__name__}: {err}'))
+        return failures
+
+    def close(self):
+        '''Close all the figures kept by the renderer.'''
+        while self.figures:
+            _, fig = self.figures.popitem()
+            plt.close(fig)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
+
+
+#: the renderer of the current worker process of an :class:`MplRenderPool`
+_WORKER_RENDERER = None
+
+
+def _init_render_worker(max_figures):
+    '''Initialize a worker process of an :class:`MplRenderPool` (on its first
+    batch: the `initializer` argument of
+    :class:`~concurrent.futures.ProcessPoolExecutor` needs Python 3.7).'''
+    global _WORKER_RENDERER  # pylint: disable=global-statement
+    plt.switch_backend('Agg')
+    # draw an empty figure once, to load the fonts before the first plot
+    fig = plt.figure()
+    fig.canvas.draw()
+    plt.close(fig)
+    _WORKER_RENDERER = MplRenderer(max_figures)
+
+
+def _render_batch(batch, max_figures):
+    '''Save a batch of plots with the renderer of the worker process.'''
+    if _WORKER_RENDERER is None:
+        _init_render_worker(max_figures)
+    return _WORKER_RENDERER.save_many(batch)
+
+
+class MplRenderPool:
+    '''A pool of worker processes saving :class:`MplPlot` objects.
+
+    Each worker uses the Agg backend and owns an :class:`MplRenderer`. The
+    workers are started by the first call to :meth:`render` and stay alive
+    until :meth:`close` is called, so that the same pool can render several
+    sets of plots. If a worker process dies, the plots it was rendering are
+    reported as failed and the workers are started again by the next call to
+    :meth:`render`.
+    '''
+
+    def __init__(self, n_workers, *, max_figures=8):
+        '''Construct the pool.
+
+        :param int n_workers: number of worker processes
+        :param int max_figures: maximum number of figures kept alive by each
+            worker, see :class:`MplRenderer`
+        '''
+        self.n_workers = n_workers
+        self.max_figures = max_figures
+        self.executor = None
+
+    def batches(self, items):
+        '''Split the plots to render in batches of plots with the same
+        layout.
+
+        Batches are small enough to keep all the workers busy: at most a
+        quarter of the share of each worker.
+
+        :param items: the plots and the names of their output files
+        :type items: list(tuple(MplPlot, str))
+        :rtype: list(list(tuple(MplPlot, str)))
+        '''
+        by_layout = defaultdict(list)
+        for plot, name in items:
+            by_layout[plot.layout_key()].append((plot, name))
+        size = chunk_size(len(items), self.n_workers)
+        return [group[start:start+size]
+                for group in by_layout.values()
+                for start in range(0, len(group), size)]
+
+    def render(self, items):
+        '''Draw and save the plots.
+
+        A plot that cannot be drawn or saved does not prevent the other plots
+        from being saved.
+
+        :param items: the plots and the names of their output files
+        :type items: list(tuple(MplPlot, str))
+        :returns: the names of the files of the plots that could not be saved,
+            with the corresponding error messages
+        :rtype: list(tuple(str, str))
+        '''
+        batches = self.batches(items)
+        if not batches:
+            return []
+        LOGGER.debug('rendering %d plots in %d batches', len(items),
+                     len(batches))
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.n_workers)
+        futures = [self.executor.submit(_render_batch, batch, self.max_figures)
+                   for batch in batches]
+        failures = []
+        broken = False
+        for batch, future in zip(batches, futures):
+            try:
+                failures.extend(future.result())
+            except BrokenProcessPool as err:
+                broken = True
+                failures.extend((name, f'worker process died: {err}')
+                                for _, name in batch)
+        if broken:
+            LOGGER.warning('a plot rendering process died, the workers will '
+                           'be restarted')
+            self.close()
+        return failures
+
+    def close(self):
+        '''Stop the worker processes.'''
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
+
+
 class _MplLegend:
     '''Class to store the legend content.'''
 
@@ -310,16 +310,200 @@ def pad_range(limits, log, padding=0.05):
     return limits[0] - delta, limits[1] + delta
 
 
+#: maximum number of points of a 1D curve in the plots built by
+#: :func:`post_treatment` (``None`` to disable the reduction), see
+#: :func:`downsample`
+MAX_POINTS_1D = 2000
+
+#: maximum number of bins per axis of a 2D curve in the plots built by
+#: :func:`post_treatment` (``None`` to disable the reduction), see
+#: :func:`downsample`
+MAX_BINS_2D = 400
+
+
+def _bucket_extrema(lows, highs, size):
+    '''Return, for each bucket of `size` consecutive elements, the indices of
+    the minimum of `lows` and of the maximum of `highs`, in increasing order.
+
+    NaN elements are only selected if the whole bucket is NaN.
+    '''
+    nbuckets = -(-lows.size // size)
+    padded = np.full((2, nbuckets * size), np.nan)
+    padded[0, :lows.size] = lows
+    padded[1, :highs.size] = highs
+    padded = padded.reshape(2, nbuckets, size)
+    nans = np.isnan(padded)
+    lowest = np.where(nans[0], np.inf, padded[0]).argmin(axis=1)
+    highest = np.where(nans[1], -np.inf, padded[1]).argmax(axis=1)
+    offsets = np.arange(nbuckets) * size
+    first = np.minimum(np.minimum(lowest, highest) + offsets, lows.size - 1)
+    second = np.minimum(np.maximum(lowest, highest) + offsets, lows.size - 1)
+    return first, second
+
+
+def downsample_1d(curve, max_points=MAX_POINTS_1D):
+    '''Reduce the number of points of a 1D curve, preserving its extrema.
+
+    The bins are grouped in buckets of consecutive bins, and each bucket is
+    represented by two points: the bins of the bucket with the lowest and the
+    highest value (or the lowest ``value - error`` and the highest ``value +
+    error`` if the curve has errors, so that the error envelope is kept). The
+    two points keep their order and their errors. If the bins are given by
+    their edges, each bucket is split into two bins of equal width, so that
+    all the curves of a subplot keep the same bins.
+
+    Curves with at most `max_points` points or with string bins are returned
+    unchanged.
+
+    >>> import numpy as np
+    >>> from valjean.javert.templates import CurveElements
+    >>> values = np.sin(np.linspace(0, 20, 1000))
+    >>> values[437] = 5
+    >>> curve = CurveElements(values=values, bins=[np.arange(1001)],
+    ...                       legend='spam', errors=np.full(1000, 0.1))
+    >>> small = downsample_1d(curve, max_points=100)
+    >>> small.values.size, small.bins[0].size, small.errors.size
+    (100, 101, 100)
+    >>> np.max(small.values) == 5
+    True
+    >>> small.bins[0][0], small.bins[0][-1]
+    (0.0, 1000.0)
+    >>> downsample_1d(curve) is curve
+    True
+
+    :param CurveElements curve: the curve to reduce
+    :param int max_points: maximum number of points of the reduced curve
+    :rtype: CurveElements
+    '''
+    values, bins = curve.values, curve.bins[0]
+    if values.size <= max(max_points, 2) or bins.dtype.kind == 'U':
+        return curve
+    size = -(-values.size // max(max_points // 2, 1))
+    nbuckets = -(-values.size // size)
+    errors = curve.errors
+    if errors is None:
+        first, second = _bucket_extrema(values, values, size)
+    else:
+        first, second = _bucket_extrema(values - errors, values + errors,
+                                        size)
+    indices = np.stack([first, second], axis=1).ravel()
+    if bins.size == values.size + 1:
+        starts = bins[np.arange(nbuckets) * size]
+        stops = bins[np.minimum((np.arange(nbuckets) + 1) * size,
+                                values.size)]
+        new_bins = np.append(
+            np.stack([starts, 0.5 * (starts + stops)], axis=1).ravel(),
+            bins[-1])
+    else:
+        new_bins = bins[indices]
+    return CurveElements(
+        values=values[indices], bins=[new_bins], legend=curve.legend,
+        index=curve.index,
+        errors=None if errors is None else errors[indices])
+
+
+def _block_bins(bins, size, nblocks, nvalues):
+    '''Return the bins of an axis whose values are aggregated in blocks of
+    `size` values.'''
+    starts = np.arange(nblocks) * size
+    if bins.size == nvalues + 1:
+        return np.append(bins[starts], bins[-1])
+    return np.add.reduceat(bins, starts) / np.diff(np.append(starts, nvalues))
+
+
+def downsample_2d(curve, max_bins=MAX_BINS_2D):
+    '''Reduce the number of bins of a 2D curve by aggregating blocks of
+    neighbouring bins.
+
+    Each axis with more than `max_bins` bins is split in blocks of consecutive
+    bins; the values (and the bin centers, if the bins are not given by their
+    edges) are averaged over each block, and the errors are combined as the
+    error on the average. Axes with string bins are not reduced.
+
+    >>> import numpy as np
+    >>> from valjean.javert.templates import CurveElements
+    >>> values = np.arange(1000 * 30, dtype=float).reshape(1000, 30)
+    >>> curve = CurveElements(values=values, legend='egg',
+    ...                       bins=[np.arange(1001), np.arange(30)])
+    >>> small = downsample_2d(curve, max_bins=100)
+    >>> small.values.shape, small.bins[0].size, small.bins[1].size
+    ((100, 30), 101, 30)
+    >>> np.isclose(small.values.mean(), values.mean())
+    True
+
+    :param CurveElements curve: the curve to reduce
+    :param int max_bins: maximum number of bins per axis of the reduced curve
+    :rtype: CurveElements
+    '''
+    values, errors, bins = curve.values, curve.errors, list(curve.bins)
+    reduced = False
+    for axis, nvalues in enumerate(curve.values.shape):
+        if nvalues <= max(max_bins, 1) or bins[axis].dtype.kind == 'U':
+            continue
+        size = -(-nvalues // max_bins)
+        nblocks = -(-nvalues // size)
+        starts = np.arange(nblocks) * size
+        counts = np.diff(np.append(starts, nvalues))
+        shape = [1] * values.ndim
+        shape[axis] = nblocks
+        counts = counts.reshape(shape)
+        values = np.add.reduceat(values, starts, axis=axis) / counts
+        if errors is not None:
+            errors = np.sqrt(np.add.reduceat(errors**2, starts,
+                                             axis=axis)) / counts
+        bins[axis] = _block_bins(bins[axis], size, nblocks, nvalues)
+        reduced = True
+    if not reduced:
+        return curve
+    return CurveElements(values=values, bins=bins, legend=curve.legend,
+                         index=curve.index, errors=errors)
+
+
+def downsample(templates, *, max_points=MAX_POINTS_1D,
+               max_bins_2d=MAX_BINS_2D):
+    '''Reduce the size of the curves of the given templates.
+
+    The cost of drawing a plot grows with the number of points of its curves,
+    while a plot with more points than the pixels of the figure does not look
+    different from a reduced version of itself. This function applies
+    :func:`downsample_1d` to the 1D curves and :func:`downsample_2d` to the
+    2D curves. Since the extrema of each curve are kept, bins failing a test
+    (for instance large Student t-statistics) stay visible on the reduced
+    plots.
+
+    :param list(PlotTemplate) templates: the templates, modified in place
+    :param max_points: maximum number of points of 1D curves, ``None`` for
+        no reduction
+    :type max_points: int or None
+    :param max_bins_2d: maximum number of bins per axis of 2D curves, ``None``
+        for no reduction
+    :type max_bins_2d: int or None
+    :returns: the templates
+    :rtype: list(PlotTemplate)
+    '''
+    for templ in templates:
+        for splt in templ.subplots:
+            if splt.ptype == '1D' and max_points is not None:
+                splt.curves = [downsample_1d(crv, max_points)
+                               for crv in splt.curves]
+            elif splt.ptype == '2D' and max_bins_2d is not None:
+                splt.curves = [downsample_2d(crv, max_bins_2d)
+                               for crv in splt.curves]
+    return templates
+
+
 def post_treatment(templates, result):
     '''Post-treatment of plots after template generate.
 
-    For example add names from test result if not done before, suppress zero
-    bins at range edges, etc.
+    For example add names from test result if not done before, reduce the
+    size of large curves (see :func:`downsample`), suppress zero bins at range
+    edges, etc.
     '''
     LOGGER.debug('calling post_treatment for %s', result.__class__)
     if 'Bonferroni' in result.__class__.__name__:
         LOGGER.debug('post already applied')
         return templates
+    downsample(templates, max_points=MAX_POINTS_1D, max_bins_2d=MAX_BINS_2D)
     for templ in templates:
         for splt in templ.subplots:
             if splt.ptype not in ('1D', '2D'):
@@ -36,24 +36,25 @@ syntax.
 .. _reStructuredText: https://docutils.sourceforge.io/rst.html
 .. _reStructuredText primer: https://
     docutils.sourceforge.io/docs/user/rst/quickstart.html
-.. _pkg_resources: https://setuptools.pypa.io/en/latest/pkg_resources.html
 '''
 
 import logging
-from datetime import datetime
+import pickle
 from collections import defaultdict
 from pathlib import Path
 import multiprocessing as mp
-import pkg_resources as pkg
-import numpy as np
+from multiprocessing.pool import MaybeEncodingError
 
-from ..fingerprint import fingerprint
+from ..chunks import chunk_size
+from ..fingerprint import fingerprint, memoized_fingerprints
 from ..path import ensure, sanitize_filename
 from ..cosette.task import TaskStatus
 from ..cosette.pythontask import PythonTask
 from ..gavroche.test import TestResult
 from .formatter import Formatter
 from .mpl import MplPlot
+from .rst_table import RstTable
+from .rst_writer import FormattedRst, LazyFormattedRst
 from .test_report import TestReport, TestReportTask
 from .verbosity import Verbosity
 
@@ -65,10 +66,18 @@ class Rst:
     '''Class to convert :class:`~.TestResult` objects into `reStructuredText`_
     format.'''
 
-    def __init__(self, representation, *, n_workers=None):
+    def __init__(self, representation, *, n_workers=None,
+                 format_workers=None):
         '''Initialize a class instance with the given representation.
 
         :param Representation representation: A representation.
+        :param n_workers: number of subprocesses to use to write out the plots
+            in parallel (see :class:`~.FormattedRst`).
+        :type n_workers: int or None
+        :param format_workers: number of subprocesses to use to format the
+            test results (see :meth:`format_report_parallel`). If `None` is
+            given, the test results are formatted in the current process.
+        :type format_workers: int or None
         '''
         self.representation = representation
         self.formatter = RstFormatter()
@@ -76,6 +85,7 @@ class Rst:
         self.tree_dict = defaultdict(list)
         self.text_dict = defaultdict(list)
         self.n_workers = n_workers
+        self.format_workers = format_workers
 
     def clear(self):
         '''Clear the content of `self`.'''
@@ -83,19 +93,33 @@ class Rst:
         self.tree_dict.clear()
         self.text_dict.clear()
 
-    def format_report(self, *, report, author, version):
+    def format_report(self, *, report, author, version, lazy=False):
         '''Format a report.
 
         Most of the work is actually done in the :meth:`format_report_rec`
         method.
 
         :param TestReport report: the report to format.
+        :param bool lazy: if true, nothing is formatted here and a
+            :class:`~.LazyFormattedRst` is returned: the report will be
+            formatted section by section while it is written, which bounds the
+            memory used for large reports.
         :returns: the formatted report.
-        :rtype: FormattedRst
+        :rtype: FormattedRst or LazyFormattedRst
         '''
+        if lazy:
+            return LazyFormattedRst(author=author, title=report.title,
+                                    version=version, report=report,
+                                    rst=Rst(self.representation),
+                                    n_workers=self.n_workers)
+
         self.clear()
 
-        self.format_report_rec(report=report, tree=())
+        with memoized_fingerprints():
+            if self.format_workers is not None and self.format_workers > 1:
+                self.format_report_parallel(report=report)
+            else:
+                self.format_report_rec(report=report, tree=())
 
         fmt_report = FormattedRst(author=author, title=report.title,
                                   version=version,
@@ -116,7 +140,7 @@ class Rst:
         of the tree nodes. This method performs a recursive, pre-order,
         depth-first traversal of the tree and fills the ``tree_dict`` and
         ``text_dict`` dictionaries with the information that is necessary
-        to instantiate the final :class:`FormattedRst` object.
+        to instantiate the final :class:`~.FormattedRst` object.
 
         Given a report object, this method constructs a dictionary key by
         concatenating in a tuple the titles of the parent reports and the
@@ -184,7 +208,7 @@ six-cent-six cyprès.
             False
 
         The ``tree_dict`` and ``text_dict`` dictionaries contain most
-        of the information required by :class:`FormattedRst` to write out the
+        of the information required by :class:`~.FormattedRst` to write out the
         report in the form of a `reStructuredText`_ file tree (see
         :meth:`~.FormattedRst.write`).
         '''
@@ -208,6 +232,75 @@ six-cent-six cyprès.
                                 f'TestReport content, found {type(stuff)} '
                                 'instead')
 
+    def format_report_parallel(self, *, report):
+        '''Format a report, formatting the test results in a pool of
+        processes.
+
+        The report tree is first traversed as in :meth:`format_report_rec`,
+        formatting the section headers and leaving a placeholder for each
+        test result. The test results are then split in chunks, which are
+        formatted by :attr:`format_workers` subprocesses (representation of
+        the results and formatting of the templates). Finally the formatted
+        results and their plots are put back in place, in the order of the
+        report: the ``tree_dict``, ``text_dict`` and ``plots`` attributes are
+        the same as in sequential mode.
+
+        If the representation or the results cannot be sent to the
+        subprocesses, or if the pool fails, the report is formatted
+        sequentially with :meth:`format_report_rec`.
+
+        :param TestReport report: the report to format.
+        '''
+        results = []
+        self._format_structure_rec(report=report, tree=(), results=results)
+        size = chunk_size(len(results), self.format_workers)
+        chunks = [results[start:start+size]
+                  for start in range(0, len(results), size)]
+        LOGGER.info('formatting %d test results in %d chunks using %d '
+                    'subprocesses', len(results), len(chunks),
+                    self.format_workers)
+        try:
+            with mp.Pool(self.format_workers) as pool:
+                formatted = pool.starmap(
+                    _format_results, [(self.representation, chunk)
+                                      for chunk in chunks])
+        except (pickle.PicklingError, MaybeEncodingError, AttributeError,
+                TypeError, OSError) as err:
+            LOGGER.warning('parallel formatting of the report failed (%s), '
+                           'falling back to sequential formatting', err)
+            self.clear()
+            self.format_report_rec(report=report, tree=())
+            return
+        res_lines = []
+        for chunk_lines, chunk_plots in formatted:
+            res_lines.extend(chunk_lines)
+            self.plots.update(chunk_plots)
+        for tree, lines in self.text_dict.items():
+            self.text_dict[tree] = [
+                line for item in lines
+                for line in (res_lines[item.index]
+                             if isinstance(item, _ResultSlot) else (item,))]
+
+    def _format_structure_rec(self, *, report, tree, results):
+        '''Format the report sections as :meth:`format_report_rec` does, but
+        leave placeholders for the test results, which are appended to
+        `results`.'''
+        report_text = self.format_section(report, depth=len(tree))
+        self.text_dict[tree].extend(report_text)
+        for stuff in report.content:
+            if isinstance(stuff, TestReport):
+                subtree = tree + (stuff.title,)
+                self.tree_dict[tree].append(subtree)
+                self._format_structure_rec(report=stuff, tree=subtree,
+                                           results=results)
+            elif isinstance(stuff, TestResult):
+                self.text_dict[tree].append(_ResultSlot(len(results)))
+                results.append(stuff)
+            else:
+                raise TypeError('expected TestReport or TestResult in '
+                                f'TestReport content, found {type(stuff)} '
+                                'instead')
+
     def format_section(self, section, *, depth):
         '''Format a report section.
 
@@ -228,7 +321,22 @@ six-cent-six cyprès.
         :returns: the formatted test result.
         :rtype: str
         '''
-        lines = [self.formatter.anchor(fingerprint(result.test)),
+        return [str(item) for item in self.format_result_items(result)]
+
+    def format_result_items(self, result):
+        '''Format one test result, leaving the formatted templates as they
+        are.
+
+        This is :meth:`format_result` without the conversion of the formatted
+        templates (:class:`~.RstTable`, :class:`RstPlot`, :class:`RstText`) to
+        strings, so that large tables can be streamed (see
+        :meth:`~.RstTable.write`).
+
+        :param TestResult result: A :class:`~.TestResult`.
+        :returns: the lines of text and the formatted templates.
+        :rtype: list
+        '''
+        items = [self.formatter.anchor(fingerprint(result.test)),
                  self.formatter.text(result.test.description), '']
         res_repr = self.representation(result)
         if (not res_repr
@@ -237,17 +345,36 @@ six-cent-six cyprès.
             return []
         for template in res_repr:
             fmt = self.formatter.template(template)
-            lines.append(str(fmt))
+            items.append(fmt)
             if isinstance(fmt, RstPlot):
                 self.plots[fmt.fingerprint] = fmt.mpl_plot
-        LOGGER.debug('formatted result: %s', lines)
-        return lines
+        LOGGER.debug('formatted result: %s', items)
+        return items
+
+
+class _ResultSlot:
+    '''Placeholder for a formatted test result in a section text.'''
+
+    def __init__(self, index):
+        self.index = index
+
+
+def _format_results(representation, results):
+    '''Format a chunk of test results in a subprocess.
+
+    :returns: the formatted results and the plots they reference
+    :rtype: tuple(list(list(str)), dict)
+    '''
+    rst = Rst(representation)
+    with memoized_fingerprints():
+        lines = [rst.format_result(result) for result in results]
+    return lines, rst.plots
 
 
 class RstFormatter(Formatter):
     '''Class that dispatches the task of formatting templates as
     `reStructuredText`_. The concrete formatting is handled by separate classes
-    (:class:`RstTable`...).
+    (:class:`~.RstTable`...).
     '''
 
     HEADER_CHARS = ('=', '-', '`', "'", '"')
@@ -313,246 +440,6 @@ class RstFormatter(Formatter):
         return RstText(text)
 
 
-class RstTable:
-    '''Convert a :class:`~.TableTemplate` into a `reStructuredText`_ table.'''
-
-    HIGHLIGHT_ROLE = 'hl'
-    COL_SEP = '  '
-
-    def __init__(self, table, num_fmt='{:11.6g}'):
-        '''Construct an :class:`RstTable` from the given
-        :class:`~.templates.TableTemplate`.
-
-        :param TableTemplate table: The table to convert.
-        :param str num_fmt: A :func:`format` string to specify how numerical
-                            table entries should be represented. The default
-                            value for this option is ``'{:11.6g}'``.
-        '''
-        self.table = table
-        self.num_fmt = num_fmt
-
-    def __str__(self):
-        '''Yield the table, as a reST string. This is probably the method that
-        you want to call.'''
-        columns = self.table.columns
-        highlights = self.table.highlights
-        rows = list(self.format_columns(columns, highlights, self.num_fmt))
-        table = self.tabularize(self.table.headers, rows, indent=4)
-        header = ('.. role:: ' + RstTable.HIGHLIGHT_ROLE + '\n\n'
-                  '.. table::\n    :widths: auto\n\n')
-        return header + table + '\n'
-
-    @classmethod
-    def tabularize(cls, headers, rows, *, indent=0):
-        '''Transform a list of headers and a list of rows into a nice reST
-        table.
-
-        The `headers` argument must be a list of strings. The `rows` argument
-        represents the table rows, as a list of lists of strings. Each sublist
-        represents a table row, and it must have the same length as `headers`,
-        or terrible things will happen.
-
-        The column widths are automatically computed to accommodate the largest
-        template in each column. Smaller templates are automatically
-        right-justified.
-
-        .. doctest::
-
-            >>> headers = ['name', 'quest', 'favourite colour']
-            >>> rows = [['Lancelot', 'to seek the Holy Grail', 'blue'],
-            ...         ['Galahad', 'to seek the Holy Grail', 'yellow']]
-            >>> table = RstTable.tabularize(headers, rows)
-            >>> print(table)
-            ========  ======================  ================
-              name            quest           favourite colour
-            ========  ======================  ================
-            Lancelot  to seek the Holy Grail              blue
-             Galahad  to seek the Holy Grail            yellow
-            ========  ======================  ================
-            <BLANKLINE>
-
-        You can also indent the table by a given amount of spaces with the
-        `indent` keyword argument:
-
-        .. doctest::
-
-            >>> table = RstTable.tabularize(headers, rows, indent=4)
-            >>> print(table)
-                ========  ======================  ================
-                  name            quest           favourite colour
-                ========  ======================  ================
-                Lancelot  to seek the Holy Grail              blue
-                 Galahad  to seek the Holy Grail            yellow
-                ========  ======================  ================
-            <BLANKLINE>
-
-        :param list(str) headers: The table headers.
-        :param list(list(str)) rows: The table rows.
-        :returns: The reST table, as a string.
-        '''
-        widths = cls.compute_column_widths(headers, rows)
-        LOGGER.debug('widths: %s', widths)
-
-        sep_row = cls.COL_SEP.join('='*w for w in widths)
-        header_row = cls.COL_SEP.join(f'{header:^{w}}'
-                                      for w, header in zip(widths, headers))
-        lines = [' '*indent + sep_row, header_row, sep_row]
-        lines.extend(cls.concat_rows(widths, rows))
-        lines.append(sep_row)
-        lines.append('')  # in order to get 2 tables
-        lines_sep = '\n' + ' '*indent
-        return lines_sep.join(lines)
-
-    @staticmethod
-    def transpose(columns):
-        r'''Given a matrix as a list of columns, yield the matrix rows.
-        (Equivalently, if the matrix is given as a list of rows, yield the
-        columns). For instance, consider the following list:
-
-            >>> matrix = [(11, 21, 31), (12, 22, 32), (13, 23, 33)]
-            >>> for column in matrix:
-            ...     print(' '.join(str(elem) for elem in column))
-            11 21 31
-            12 22 32
-            13 23 33
-
-        If the tuples are interpreted as columns, `matrix` represents the
-        following matrix:
-
-        .. math::
-
-            \begin{pmatrix}11&12&13\\21&22&23\\31&32&33\end{pmatrix}
-
-        Transposing it yields:
-
-            >>> transposed = RstTable.transpose(matrix)
-            >>> for row in transposed:
-            ...     print(' '.join(str(elem) for elem in row))
-            11 12 13
-            21 22 23
-            31 32 33
-
-        .. note::
-
-            The matrix elements returned by :meth:`transpose` are actually
-            0-dimensional :class:`numpy.ndarray` objects. For the purpose of
-            their further manipulation this is of little consequence, as they
-            transparently support most numerical operations.
-
-        :param columns: An iterable yielding columns
-        :type columns: list(list) or list(tuple) or list(numpy.ndarray)
-        :raises ValueError: if the columns do not have the same length.
-        :returns: a generator for the rows of the transposed matrix.
-        '''
-        LOGGER.debug('columns: %s, %s', type(columns), len(columns))
-        try:
-            yield from np.nditer(columns)
-        except ValueError as exc:
-            raise ValueError('all columns must have the same length') from exc
-
-    @classmethod
-    def format_columns(cls, columns, highlights, num_fmt):
-        '''Transform a bunch of columns (containing arbitrary data: floats,
-        bools, ints, strings...) into an iterable of lists of (optionally
-        highlighted) strings representing the table **rows**.
-
-        Example:
-
-            >>> cols = [('European swallow', 'African swallow'),
-            ...         (27.7, 35.1),
-            ...         ('km/h', 'km/h')]
-            >>> highs = [[False, False], [False, True], [False, True]]
-            >>> for row in RstTable.format_columns(cols, highs, '{:13.8f}'):
-            ...     print(row)
-            ['European swallow', '  27.70000000', 'km/h']
-            ['African swallow', ':hl:`35.10000000`', ':hl:`km/h`']
-
-        :param columns: An iterable yielding columns. The table columns may
-                        contain any kind of data; if the data type is numeric,
-                        it will be formatted according to the `num_fmt`
-                        argument; other types will just get stringified
-                        (:class:`str`).
-        :param highlights: An iterable yielding a collection of bools for each
-                           column.  The `j`-th element of the `i`-th iteration
-                           decides whether the element in the `j`-th column of
-                           the `i`-th row should be highlighted.
-        :param num_fmt: The format string to be used for numerical types.
-        :returns: a generator yielding lists of strings, representing the table
-                  rows.
-        '''
-        def _format_val(val):
-            try:
-                type_ = val.dtype.type
-            except AttributeError:
-                return str(val)
-            if issubclass(type_, (float, np.inexact)):
-                return num_fmt.format(val)
-            return str(val)
-        for row, hlrow in zip(cls.transpose(columns),
-                              cls.transpose(highlights)):
-            yield [cls.highlight(_format_val(val), high)
-                   for val, high in zip(row, hlrow)]
-
-    @staticmethod
-    def compute_column_widths(headers, rows):
-        '''Compute the width of the columns that are necessary to accommodate
-        all the headers and table rows.
-
-            >>> headers = ['swallow sub-species', 'airspeed', 'laden']
-            >>> rows = [['European', '27.7 km/h', 'no'],
-            ...         ['European', '22.0 km/h', 'yes'],
-            ...         ['African', '35.1 km/h', 'no'],
-            ...         ['African', '26.2 km/h', 'yes']]
-            >>> RstTable.compute_column_widths(headers, rows)
-            [19, 9, 5]
-            >>> [len('swallow sub-species'), len('27.7 km/h'), len('laden')]
-            [19, 9, 5]
-
-        :param list(str) headers: A list of column headers.
-        :param list(list(str)) rows: A list of table rows.
-        :returns: a list of integers indicating how wide each columns must be
-                  to accommodate all the table elements and the headers.
-        :rtype: list(int)
-        '''
-        col_widths = [len(header) for header in headers]
-        for row in rows:
-            for i, val in enumerate(row):
-                col_widths[i] = max(col_widths[i], len(val))
-        return col_widths
-
-    @classmethod
-    def highlight(cls, val, flag):
-        '''Wrap `val` in highlight reST markers if flag is `True`.
-
-        >>> RstTable.highlight('dis', False)
-        'dis'
-        >>> RstTable.highlight('DAT', True)
-        ':hl:`DAT`'
-        '''
-        if flag:
-            return f':{cls.HIGHLIGHT_ROLE}:`{val.strip()}`'
-        return val
-
-    @classmethod
-    def concat_rows(cls, widths, rows, just='>'):
-        '''Concatenate the given rows and justify them according to the `just`
-        parameter (see the :ref:`python:formatspec`). The columns widths (for
-        justification) must be provided using the `width` argument.
-
-        :param list(int) widths: The list of columns widths.
-        :param list(list(str)) rows: The list of rows; each row must be a list
-                                     of strings.
-        :param str just: A format character for the justification (usually one
-                         of '<', '^', '>').
-        :returns: the concatenated, justified rows.
-        :rtype: str
-        '''
-        for row in rows:
-            centered = list(f'{val:{just}{width}}'
-                            for width, val in zip(widths, row))
-            yield cls.COL_SEP.join(centered)
-
-
 class RstPlot:
     '''This class models a plot in an `reStructuredText`_ document. It converts
     a :class:`~.PlotTemplate` object into an :class:`~.MplPlot`, and it
@@ -585,202 +472,34 @@ class RstText:
         return self.text.text
 
 
-class FormattedRst:
-    '''This class represents a formatted rst document tree, which typically
-    consists of an index file and of several sections.
-    '''
-    def __init__(self, *, author, title, version,
-                 tree_dict, text_dict, plots, n_workers=None):
-        # pylint: disable=too-many-arguments
-        '''Create a :class:`FormattedRst` object. The `author`, `title` and
-        `version` arguments are expected to be strings and are
-        self-explanatory.
-
-        The `tree_dict` and `text_dict` arguments must be dictionaries.  The
-        `tree_dict` dictionary represents the tree structure of the
-        `reStructuredText`_ document, and the `text_dict` represent the
-        contents of each section. The report sections, which appear as keys in
-        both dictionaries, are expected to be tuples of strings, with each
-        string representing an additional layer in the document hierarchy. The
-        section contents (the values of `text_dict`) are expected to be lists
-        of strings to be written to disk.
-
-        Finally, the `plots` argument is a list of the plots referenced by the
-        text sections. The plots will be written to disk with filenames of the
-        form :samp:`plot_{fingerprint}.png`, where `fingerprint` is the plot
-        fingerprint.
-
-        :param str author: the author of this report.
-        :param str title: the title of this report.
-        :param str version: the version number for this report.
-        :param dict tree_dict: dictionary mapping tuples of sections to lists
-            of tuples of sections.
-        :param dict text_dict: dictionary mapping tuples of sections to lists
-            of strings.
-        :param plots: list of plots to be written to disk.
-        :type plots: list(MplPlot)
-        :param n_workers: number of subprocesses to use to write out the plots
-            in parallel.  If `None` is given, write the plots in sequential
-            mode.
-        :type n_workers: int or None
-        '''
-        if not isinstance(tree_dict, dict):
-            raise TypeError("expecting a dictionary as 'tree_dict'"
-                            f", got {type(tree_dict)}")
-        if not isinstance(text_dict, dict):
-            raise TypeError("expecting a dictionary as 'text_dict'"
-                            f", got {type(tree_dict)}")
-
-        self.author = author
-        self.title = title
-        self.version = version
-        self.tree_dict = tree_dict.copy()
-        self.text_dict = text_dict.copy()
-        self.plots = plots.copy()
-        self.n_workers = n_workers
-
-    def write(self, path):
-        '''Write the text files and the plots into the directory specified by
-        `path`.
-
-        :param path: path to the directory that will be written to. It is OK if
-                     the directory does not exist.
-        :type path: str or pathlib.Path
-        '''
-        path = Path(path)
-
-        self.setup(path)
-        self._write_rec(tree=(), path=path)
-
-        items = [(plot, str(path / 'figures'
-                            / f'plot_{fingerprint}.png'))
-                 for fingerprint, plot in self.plots.items()]
-        if self.n_workers is not None:
-            LOGGER.info('writing %d plots using %d subprocesses',
-                        len(items), self.n_workers)
-            with mp.Pool(self.n_workers) as pool:
-                pool.map(self._static_writer, items)
-        else:
-            LOGGER.info('writing %d plots in sequential mode', len(items))
-            for item in items:
-                self._static_writer(item)
-
-    @staticmethod
-    def _static_writer(plot_path_pair):
-        plot_path_pair[0].save(plot_path_pair[1])
-
-    def _write_rec(self, *, tree, path):
-
-        if tree:
-            tree_path = self.tree_to_path(base=path, tree=tree)
-        else:
-            tree_path = path / 'index'
-
-        LOGGER.note('writing tree_path: %s', tree_path)
-        ensure(tree_path.parent, is_dir=True)
-
-        subtrees = self.tree_dict[tree]
-        write_path = tree_path.with_name(tree_path.name + '.rst')
-        with write_path.open('w') as tree_file:
-            text = '\n'.join(self.text_dict[tree])
-            tree_file.write(text)
-            if subtrees:
-                toc = self.toc('Contents', subtrees)
-                tree_file.write(toc)
-
-        for subtree in subtrees:
-            self._write_rec(tree=subtree, path=path)
-
-    @staticmethod
-    def tree_to_path(*, base, tree):
-        '''Convert a tree to a file path.
-
-        :param base: the base path for all subtrees.
-        :type base: pathlib.Path
-        :param tuple(str) tree: a sequence of tree nodes, starting from the
-                          tree root.
-        '''
-        paths = [sanitize_filename(node) for node in tree]
-        return base.joinpath(*paths)
-
-    def toc(self, toc_title, subtrees):
-        '''Build an rst table of contents.
-
-        :param str toc_title: the title for the table of contents (e.g.
-                              ``'Contents'``).
-        '''
-        lines = ['\n\n.. toctree::\n    :titlesonly:\n    '
-                 f':caption: {toc_title}:\n']
-        for subtree in subtrees:
-            # need to remove upper level to subtree in toc else they appear N
-            # times in the toc, depending on level, breaking the links
-            fname = str(self.tree_to_path(base=Path(''), tree=subtree[-2:]))
-            line = ' '*4 + fname
-            lines.append(line)
-        lines.append('')
-        lines.append('')
-        return '\n'.join(lines)
-
-    def setup(self, path):
-        '''Set up the output directory for :meth:`write`.
-
-        :param pathlib.Path path: the path to the directory.
-        '''
-        ensure(path, is_dir=True)
-        ensure(path / '.static', is_dir=True)
-        ensure(path / '.templates', is_dir=True)
-        ensure(path / 'figures', is_dir=True)
-        year = datetime.now().year
-        self.configure(resource='conf.py.template', dest=path / 'conf.py',
-                       author=self.author, project=self.title,
-                       version=self.version, theme='alabaster',
-                       theme_options={}, year=year)
-        self.configure(resource='valjean.css',
-                       dest=path / '.static' / 'valjean.css',
-                       formatting=False)
-
-    @staticmethod
-    def configure(resource, dest, formatting=True, **kwargs):
-        '''Copy a package resource to the specified destination, optionally
-        formatting the resource content using :meth:`str.format`.
-
-        For more information about resources, see `pkg_resources`_.
-
-        :param str resource: the name of the resource.
-        :param pathlib.Path dest: the destination path.
-        :param bool formatting: whether formatting should be applied.
-        :param dict kwargs: any additional keyword arguments will be passed to
-                            the formatting.
-        '''
-        assert pkg.resource_exists('valjean.javert.resources.rst', resource)
-        res_template = pkg.resource_string('valjean.javert.resources.rst',
-                                           resource).decode('utf-8')
-        res_str = res_template.format(**kwargs) if formatting else res_template
-        with dest.open('w') as res_file:
-            res_file.write(res_str)
-
-
 class RstTestReportTask(PythonTask):
     '''Task class that transforms a list of tests into a test report.
     :class:`~.TestResult` objects in the environment.'''
 
     @classmethod
     def from_tasks(cls, name, *, make_report, eval_tasks, representation,
-                   author, version, kwargs=None, deps=None, soft_deps=None):
+                   author, version, kwargs=None, deps=None, soft_deps=None,
+                   lazy=False, format_workers=None):
         # pylint: disable=too-many-arguments
         '''Construct an :class:`RstTestReportTask` from a list of test
         evaluation tasks and a function to classify test results and put them
         in test reports.
+
+        If `lazy` is true, the report is formatted section by section while it
+        is written (see :class:`~.LazyFormattedRst`). If `format_workers` is
+        larger than 1, the test results are formatted in a pool of
+        `format_workers` processes (see :meth:`Rst.format_report_parallel`).
         '''
         report_name = 'report-' + name
         report_task = TestReportTask(report_name, make_report=make_report,
                                      eval_tasks=eval_tasks, kwargs=kwargs)
         return cls(name, report_task=report_task,
                    representation=representation, author=author,
-                   version=version, deps=deps, soft_deps=soft_deps)
+                   version=version, deps=deps, soft_deps=soft_deps,
+                   lazy=lazy, format_workers=format_workers)
 
     def __init__(self, name, *, report_task, representation, author, version,
-                 deps=None, soft_deps=None):
+                 deps=None, soft_deps=None, lazy=False, format_workers=None):
         # pylint: disable=too-many-arguments
 
         def write_rst(*, env, config):
@@ -792,9 +511,10 @@ class RstTestReportTask(PythonTask):
             else:
                 n_workers = None
                 LOGGER.debug('will write the report in sequential mode')
-            rst = Rst(representation, n_workers=n_workers)
+            rst = Rst(representation, n_workers=n_workers,
+                      format_workers=format_workers)
             fmt_report = rst.format_report(report=report, author=author,
-                                           version=version)
+                                           version=version, lazy=lazy)
             report_root = Path(config.query('path', 'report-root'))
             report_path = report_root / sanitize_filename(self.name)
             ensure(report_path, is_dir=True)
@@ -0,0 +1,446 @@
+# Copyright French Alternative Energies and Atomic Energy Commission
+# Contributors: valjean developers
+# valjean-support@cea.fr
+#
+# This software is a computer program whose purpose is to analyze and
+# post-process numerical simulation results.
+#
+# This software is governed by the CeCILL license under French law and abiding
+# by the rules of distribution of free software. You can use, modify and/ or
+# redistribute the software under the terms of the CeCILL license as circulated
+# by CEA, CNRS and INRIA at the following URL: http://www.cecill.info.
+#
+# As a counterpart to the access to the source code and rights to copy, modify
+# and redistribute granted by the license, users are provided only with a
+# limited warranty and the software's author, the holder of the economic
+# rights, and the successive licensors have only limited liability.
+#
+# In this respect, the user's attention is drawn to the risks associated with
+# loading, using, modifying and/or developing or reproducing the software by
+# the user in light of its specific status of free software, that may mean that
+# it is complicated to manipulate, and that also therefore means that it is
+# reserved for developers and experienced professionals having in-depth
+# computer knowledge. Users are therefore encouraged to load and test the
+# software's suitability as regards their requirements in conditions enabling
+# the security of their systems and/or data to be ensured and, more generally,
+# to use and operate it in the same conditions as regards security.
+#
+# The fact that you are presently reading this means that you have had
+# knowledge of the CeCILL license and that you accept its terms.
+
+
+'''This module provides the :class:`RstTable` class, which converts tables to
+reStructuredText_ format. It is used by the :mod:`~valjean.javert.rst` module.
+
+.. _reStructuredText: https://docutils.sourceforge.io/rst.html
+'''
+
+import logging
+import re
+from itertools import chain
+import numpy as np
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RstTable:
+    '''Convert a :class:`~.TableTemplate` into a `reStructuredText`_ table.
+
+    The table is formatted column by column: the numerical columns are
+    formatted with a single string-formatting operation per column, and the
+    rows are assembled by chunks of :attr:`CHUNK_ROWS` rows. The text can be
+    obtained as a whole with :func:`str`, or chunk by chunk with
+    :meth:`iter_text` and :meth:`write`, which do not build the whole table
+    in memory.
+
+    Tables are not truncated by default. If a maximum number of cells is
+    given (`max_cells`, or :attr:`MAX_CELLS` for all the tables), larger tables
+    are truncated: only the first rows are formatted, a warning is logged and a
+    note saying how many rows were left out is added after the table.
+
+        >>> import numpy as np
+        >>> from valjean.javert.templates import TableTemplate
+        >>> table = TableTemplate(np.arange(5), np.arange(5) * 0.5,
+        ...                       headers=['egg', 'spam'])
+        >>> print(RstTable(table, num_fmt='{:4.1f}', max_cells=6))
+        .. role:: hl
+        <BLANKLINE>
+        .. table::
+            :widths: auto
+        <BLANKLINE>
+            ===  ====
+            egg  spam
+            ===  ====
+              0   0.0
+              1   0.5
+              2   1.0
+            ===  ====
+        <BLANKLINE>
+        <BLANKLINE>
+        *Table truncated: only the first 3 rows out of 5 are shown.*
+        <BLANKLINE>
+    '''
+
+    HIGHLIGHT_ROLE = 'hl'
+    COL_SEP = '  '
+
+    #: default maximum number of cells of a table (`None`: no limit), see
+    #: :class:`RstTable`
+    MAX_CELLS = None
+
+    #: number of rows assembled at once by :meth:`iter_text`
+    CHUNK_ROWS = 10000
+
+    #: format specifications that can be applied with the ``%`` operator
+    _PRINTF_SPEC = re.compile(r'\{:([+ ]?#?0?\d*(?:\.\d+)?[eEfFgG])\}')
+
+    def __init__(self, table, num_fmt='{:11.6g}', *, max_cells=None):
+        '''Construct an :class:`RstTable` from the given
+        :class:`~.templates.TableTemplate`.
+
+        :param TableTemplate table: The table to convert.
+        :param str num_fmt: A :func:`format` string to specify how numerical
+                            table entries should be represented. The default
+                            value for this option is ``'{:11.6g}'``.
+        :param max_cells: The maximum number of cells of the table; larger
+                          tables are truncated. If ``None``,
+                          :attr:`MAX_CELLS` is used (no truncation by
+                          default).
+        :type max_cells: int or None
+        '''
+        self.table = table
+        self.num_fmt = num_fmt
+        self.max_cells = self.MAX_CELLS if max_cells is None else max_cells
+
+    def __str__(self):
+        '''Yield the table, as a reST string. This is probably the method that
+        you want to call.'''
+        return ''.join(self.iter_text())
+
+    def write(self, stream):
+        '''Write the table, as a reST string, to the given stream.
+
+        :param stream: a text stream (for instance an open file).
+        '''
+        for text in self.iter_text():
+            stream.write(text)
+
+    def iter_text(self):
+        '''Yield the table as a sequence of reST strings, whose concatenation
+        is :code:`str(self)`.
+
+        :raises ValueError: if the columns do not have the same length.
+        :rtype: generator(str)
+        '''
+        ncols = len(self.table.columns)
+        try:
+            arrays = [array.ravel() for array in np.broadcast_arrays(
+                *self.table.columns, *self.table.highlights)]
+        except ValueError as exc:
+            raise ValueError('all columns must have the same length') from exc
+        nrows = arrays[0].size if arrays else 0
+        max_rows = nrows
+        if self.max_cells is not None and nrows * ncols > self.max_cells:
+            max_rows = max(1, self.max_cells // ncols)
+            LOGGER.warning('table with %d cells truncated to %d rows',
+                           nrows * ncols, max_rows)
+        columns = [self.format_column(column[:max_rows], highlight[:max_rows],
+                                      self.num_fmt)
+                   for column, highlight in zip(arrays[:ncols],
+                                                arrays[ncols:])]
+        yield ('.. role:: ' + RstTable.HIGHLIGHT_ROLE + '\n\n'
+               '.. table::\n    :widths: auto\n\n')
+        yield from self.iter_tabularize(self.table.headers, columns, indent=4)
+        yield '\n'
+        if max_rows < nrows:
+            yield (f'\n*Table truncated: only the first {max_rows} rows out '
+                   f'of {nrows} are shown.*\n')
+
+    @classmethod
+    def tabularize(cls, headers, rows, *, indent=0):
+        '''Transform a list of headers and a list of rows into a nice reST
+        table.
+
+        The `headers` argument must be a list of strings. The `rows` argument
+        represents the table rows, as a list of lists of strings. Each sublist
+        represents a table row, and it must have the same length as `headers`,
+        or terrible things will happen.
+
+        The column widths are automatically computed to accommodate the largest
+        template in each column. Smaller templates are automatically
+        right-justified.
+
+        .. doctest::
+
+            >>> headers = ['name', 'quest', 'favourite colour']
+            >>> rows = [['Lancelot', 'to seek the Holy Grail', 'blue'],
+            ...         ['Galahad', 'to seek the Holy Grail', 'yellow']]
+            >>> table = RstTable.tabularize(headers, rows)
+            >>> print(table)
+            ========  ======================  ================
+              name            quest           favourite colour
+            ========  ======================  ================
+            Lancelot  to seek the Holy Grail              blue
+             Galahad  to seek the Holy Grail            yellow
+            ========  ======================  ================
+            <BLANKLINE>
+
+        You can also indent the table by a given amount of spaces with the
+        `indent` keyword argument:
+
+        .. doctest::
+
+            >>> table = RstTable.tabularize(headers, rows, indent=4)
+            >>> print(table)
+                ========  ======================  ================
+                  name            quest           favourite colour
+                ========  ======================  ================
+                Lancelot  to seek the Holy Grail              blue
+                 Galahad  to seek the Holy Grail            yellow
+                ========  ======================  ================
+            <BLANKLINE>
+
+        :param list(str) headers: The table headers.
+        :param list(list(str)) rows: The table rows.
+        :returns: The reST table, as a string.
+        '''
+        columns = [list(column) for column in zip(*rows)]
+        if not columns:
+            columns = [[] for _ in headers]
+        return ''.join(cls.iter_tabularize(headers, columns, indent=indent))
+
+    @classmethod
+    def iter_tabularize(cls, headers, columns, *, indent=0):
+        '''Transform a list of headers and a list of columns into a reST
+        table, yielded by chunks of at most :attr:`CHUNK_ROWS` rows.
+
+        This is the column-wise version of :meth:`tabularize`:
+
+            >>> headers = ['name', 'favourite colour']
+            >>> columns = [['Lancelot', 'Galahad'], ['blue', 'yellow']]
+            >>> chunks = list(RstTable.iter_tabularize(headers, columns))
+            >>> print(''.join(chunks))
+            ========  ================
+              name    favourite colour
+            ========  ================
+            Lancelot              blue
+             Galahad            yellow
+            ========  ================
+            <BLANKLINE>
+
+        :param list(str) headers: The table headers.
+        :param list(list(str)) columns: The table columns; they must all have
+            the same length.
+        :param int indent: The indentation of the table.
+        :returns: a generator yielding pieces of the reST table.
+        :rtype: generator(str)
+        '''
+        widths = [max(len(header), max(map(len, column), default=0))
+                  for header, column in zip(headers, columns)]
+        LOGGER.debug('widths: %s', widths)
+
+        prefix = ' ' * indent
+        sep_row = cls.COL_SEP.join('='*w for w in widths)
+        header_row = cls.COL_SEP.join(f'{header:^{w}}'
+                                      for w, header in zip(widths, headers))
+        yield (f'{prefix}{sep_row}\n{prefix}{header_row}\n'
+               f'{prefix}{sep_row}\n')
+        row_fmt = prefix + cls.COL_SEP.join(f'%{w}s' for w in widths) + '\n'
+        nrows = len(columns[0]) if columns else 0
+        for start in range(0, nrows, cls.CHUNK_ROWS):
+            chunk = [column[start:start+cls.CHUNK_ROWS] for column in columns]
+            yield (row_fmt * len(chunk[0])
+                   % tuple(chain.from_iterable(zip(*chunk))))
+        # the last empty line separates consecutive tables
+        yield f'{prefix}{sep_row}\n{prefix}'
+
+    @classmethod
+    def format_column(cls, column, highlight, num_fmt):
+        '''Transform a column (containing arbitrary data: floats, bools, ints,
+        strings...) into a list of (optionally highlighted) strings.
+
+        Floating-point columns are formatted according to `num_fmt`; other
+        columns are stringified (:class:`str`). If `num_fmt` is a simple
+        format specification (for instance ``'{:11.6g}'``), the whole column
+        is formatted with a single ``%`` operation.
+
+            >>> RstTable.format_column(np.array([27.7, 35.1]), [False, True],
+            ...                        '{:13.8f}')
+            ['  27.70000000', ':hl:`35.10000000`']
+            >>> RstTable.format_column(np.array(['km/h', 'm/s']),
+            ...                        [True, False], '{:13.8f}')
+            [':hl:`km/h`', 'm/s']
+
+        :param numpy.ndarray column: The column.
+        :param highlight: A collection of bools, saying whether each element
+            of the column should be highlighted.
+        :param str num_fmt: The format string to be used for numerical types.
+        :returns: the formatted column.
+        :rtype: list(str)
+        '''
+        column = np.asarray(column).ravel()
+        if column.dtype.kind == 'f':
+            match = cls._PRINTF_SPEC.fullmatch(num_fmt)
+            if match:
+                printf_fmt = '%' + match.group(1) + '\0'
+                formatted = (printf_fmt * column.size
+                             % tuple(column.tolist())).split('\0')[:-1]
+            else:
+                formatted = [num_fmt.format(val) for val in column]
+        elif column.dtype.kind == 'c':
+            formatted = [num_fmt.format(val) for val in column]
+        else:
+            formatted = column.astype(str).tolist()
+        for index in np.flatnonzero(highlight):
+            formatted[index] = cls.highlight(formatted[index], True)
+        return formatted
+
+    @staticmethod
+    def transpose(columns):
+        r'''Given a matrix as a list of columns, yield the matrix rows.
+        (Equivalently, if the matrix is given as a list of rows, yield the
+        columns). For instance, consider the following list:
+
+            >>> matrix = [(11, 21, 31), (12, 22, 32), (13, 23, 33)]
+            >>> for column in matrix:
+            ...     print(' '.join(str(elem) for elem in column))
+            11 21 31
+            12 22 32
+            13 23 33
+
+        If the tuples are interpreted as columns, `matrix` represents the
+        following matrix:
+
+        .. math::
+
+            \begin{pmatrix}11&12&13\\21&22&23\\31&32&33\end{pmatrix}
+
+        Transposing it yields:
+
+            >>> transposed = RstTable.transpose(matrix)
+            >>> for row in transposed:
+            ...     print(' '.join(str(elem) for elem in row))
+            11 12 13
+            21 22 23
+            31 32 33
+
+        .. note::
+
+            The matrix elements returned by :meth:`transpose` are actually
+            0-dimensional :class:`numpy.ndarray` objects. For the purpose of
+            their further manipulation this is of little consequence, as they
+            transparently support most numerical operations.
+
+        :param columns: An iterable yielding columns
+        :type columns: list(list) or list(tuple) or list(numpy.ndarray)
+        :raises ValueError: if the columns do not have the same length.
+        :returns: a generator for the rows of the transposed matrix.
+        '''
+        LOGGER.debug('columns: %s, %s', type(columns), len(columns))
+        try:
+            yield from np.nditer(columns)
+        except ValueError as exc:
+            raise ValueError('all columns must have the same length') from exc
+
+    @classmethod
+    def format_columns(cls, columns, highlights, num_fmt):
+        '''Transform a bunch of columns (containing arbitrary data: floats,
+        bools, ints, strings...) into an iterable of lists of (optionally
+        highlighted) strings representing the table **rows**.
+
+        Example:
+
+            >>> cols = [('European swallow', 'African swallow'),
+            ...         (27.7, 35.1),
+            ...         ('km/h', 'km/h')]
+            >>> highs = [[False, False], [False, True], [False, True]]
+            >>> for row in RstTable.format_columns(cols, highs, '{:13.8f}'):
+            ...     print(row)
+            ['European swallow', '  27.70000000', 'km/h']
+            ['African swallow', ':hl:`35.10000000`', ':hl:`km/h`']
+
+        :param columns: An iterable yielding columns. The table columns may
+                        contain any kind of data; if the data type is numeric,
+                        it will be formatted according to the `num_fmt`
+                        argument; other types will just get stringified
+                        (:class:`str`).
+        :param highlights: An iterable yielding a collection of bools for each
+                           column.  The `j`-th element of the `i`-th iteration
+                           decides whether the element in the `j`-th column of
+                           the `i`-th row should be highlighted.
+        :param num_fmt: The format string to be used for numerical types.
+        :returns: a generator yielding lists of strings, representing the table
+                  rows.
+        '''
+        def _format_val(val):
+            try:
+                type_ = val.dtype.type
+            except AttributeError:
+                return str(val)
+            if issubclass(type_, (float, np.inexact)):
+                return num_fmt.format(val)
+            return str(val)
+        for row, hlrow in zip(cls.transpose(columns),
+                              cls.transpose(highlights)):
+            yield [cls.highlight(_format_val(val), high)
+                   for val, high in zip(row, hlrow)]
+
+    @staticmethod
+    def compute_column_widths(headers, rows):
+        '''Compute the width of the columns that are necessary to accommodate
+        all the headers and table rows.
+
+            >>> headers = ['swallow sub-species', 'airspeed', 'laden']
+            >>> rows = [['European', '27.7 km/h', 'no'],
+            ...         ['European', '22.0 km/h', 'yes'],
+            ...         ['African', '35.1 km/h', 'no'],
+            ...         ['African', '26.2 km/h', 'yes']]
+            >>> RstTable.compute_column_widths(headers, rows)
+            [19, 9, 5]
+            >>> [len('swallow sub-species'), len('27.7 km/h'), len('laden')]
+            [19, 9, 5]
+
+        :param list(str) headers: A list of column headers.
+        :param list(list(str)) rows: A list of table rows.
+        :returns: a list of integers indicating how wide each columns must be
+                  to accommodate all the table elements and the headers.
+        :rtype: list(int)
+        '''
+        col_widths = [len(header) for header in headers]
+        for row in rows:
+            for i, val in enumerate(row):
+                col_widths[i] = max(col_widths[i], len(val))
+        return col_widths
+
+    @classmethod
+    def highlight(cls, val, flag):
+        '''Wrap `val` in highlight reST markers if flag is `True`.
+
+        >>> RstTable.highlight('dis', False)
+        'dis'
+        >>> RstTable.highlight('DAT', True)
+        ':hl:`DAT`'
+        '''
+        if flag:
+            return f':{cls.HIGHLIGHT_ROLE}:`{val.strip()}`'
+        return val
+
+    @classmethod
+    def concat_rows(cls, widths, rows, just='>'):
+        '''Concatenate the given rows and justify them according to the `just`
+        parameter (see the :ref:`python:formatspec`). The columns widths (for
+        justification) must be provided using the `width` argument.
+
+        :param list(int) widths: The list of columns widths.
+        :param list(list(str)) rows: The list of rows; each row must be a list
+                                     of strings.
+        :param str just: A format character for the justification (usually one
+                         of '<', '^', '>').
+        :returns: the concatenated, justified rows.
+        :rtype: str
+        '''
+        for row in rows:
+            centered = list(f'{val:{just}{width}}'
+                            for width, val in zip(widths, row))
+            yield cls.COL_SEP.join(centered)
@@ -0,0 +1,552 @@
+# Copyright French Alternative Energies and Atomic Energy Commission
+# Contributors: valjean developers
+# valjean-support@cea.fr
+#
+# This software is a computer program whose purpose is to analyze and
+# post-process numerical simulation results.
+#
+# This software is governed by the CeCILL license under French law and abiding
+# by the rules of distribution of free software. You can use, modify and/ or
+# redistribute the software under the terms of the CeCILL license as circulated
+# by CEA, CNRS and INRIA at the following URL: http://www.cecill.info.
+#
+# As a counterpart to the access to the source code and rights to copy, modify
+# and redistribute granted by the license, users are provided only with a
+# limited warranty and the software's author, the holder of the economic
+# rights, and the successive licensors have only limited liability.
+#
+# In this respect, the user's attention is drawn to the risks associated with
+# loading, using, modifying and/or developing or reproducing the software by
+# the user in light of its specific status of free software, that may mean that
+# it is complicated to manipulate, and that also therefore means that it is
+# reserved for developers and experienced professionals having in-depth
+# computer knowledge. Users are therefore encouraged to load and test the
+# software's suitability as regards their requirements in conditions enabling
+# the security of their systems and/or data to be ensured and, more generally,
+# to use and operate it in the same conditions as regards security.
+#
+# The fact that you are presently reading this means that you have had
+# knowledge of the CeCILL license and that you accept its terms.
+
+
+'''This module provides the classes writing formatted reports as trees of
+reStructuredText_ files, with their plots: :class:`FormattedRst`, which holds
+the formatted text of a report, and :class:`LazyFormattedRst`, which formats
+the report section by section while writing it. They are built by
+:meth:`~.Rst.format_report`.
+
+.. _reStructuredText: https://docutils.sourceforge.io/rst.html
+.. _pkg_resources: https://setuptools.pypa.io/en/latest/pkg_resources.html
+'''
+
+import logging
+import json
+import os
+from datetime import datetime
+from hashlib import sha256
+from pathlib import Path
+import pkg_resources as pkg
+
+from ..fingerprint import memoized_fingerprints
+from ..path import ensure, sanitize_filename
+from ..gavroche.test import TestResult
+from .mpl import MplRenderer, MplRenderPool
+from .rst_table import RstTable
+from .test_report import TestReport
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _NoRenderPool:
+    '''Context manager giving no pool, for sequential drawing of the plots
+    (as :func:`contextlib.nullcontext`, which needs Python 3.7).'''
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *_exc_info):
+        pass
+
+
+class FormattedRst:
+    '''This class represents a formatted rst document tree, which typically
+    consists of an index file and of several sections.
+    '''
+    def __init__(self, *, author, title, version,
+                 tree_dict, text_dict, plots, n_workers=None):
+        # pylint: disable=too-many-arguments
+        '''Create a :class:`FormattedRst` object. The `author`, `title` and
+        `version` arguments are expected to be strings and are
+        self-explanatory.
+
+        The `tree_dict` and `text_dict` arguments must be dictionaries.  The
+        `tree_dict` dictionary represents the tree structure of the
+        `reStructuredText`_ document, and the `text_dict` represent the
+        contents of each section. The report sections, which appear as keys in
+        both dictionaries, are expected to be tuples of strings, with each
+        string representing an additional layer in the document hierarchy. The
+        section contents (the values of `text_dict`) are expected to be lists
+        of strings to be written to disk.
+
+        Finally, the `plots` argument is a list of the plots referenced by the
+        text sections. The plots will be written to disk with filenames of the
+        form :samp:`plot_{fingerprint}.png`, where `fingerprint` is the plot
+        fingerprint.
+
+        :param str author: the author of this report.
+        :param str title: the title of this report.
+        :param str version: the version number for this report.
+        :param dict tree_dict: dictionary mapping tuples of sections to lists
+            of tuples of sections.
+        :param dict text_dict: dictionary mapping tuples of sections to lists
+            of strings.
+        :param plots: list of plots to be written to disk.
+        :type plots: list(MplPlot)
+        :param n_workers: number of subprocesses to use to write out the plots
+            in parallel.  If `None` is given, write the plots in sequential
+            mode.
+        :type n_workers: int or None
+        '''
+        if not isinstance(tree_dict, dict):
+            raise TypeError("expecting a dictionary as 'tree_dict'"
+                            f", got {type(tree_dict)}")
+        if not isinstance(text_dict, dict):
+            raise TypeError("expecting a dictionary as 'text_dict'"
+                            f", got {type(tree_dict)}")
+
+        self.author = author
+        self.title = title
+        self.version = version
+        self.tree_dict = tree_dict.copy()
+        self.text_dict = text_dict.copy()
+        self.plots = plots.copy()
+        self.n_workers = n_workers
+
+    #: name of the manifest of the written pages, in the report directory
+    MANIFEST = '.valjean-manifest.json'
+
+    #: signature of PNG files
+    PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+    def write(self, path):
+        '''Write the text files and the plots into the directory specified by
+        `path`.
+
+        The writing is incremental: a page is only rewritten if its text
+        changed since the last writing (the hashes of the pages are stored in
+        a manifest file, :attr:`MANIFEST`), and a plot is only drawn if its
+        file does not exist or is not a valid PNG file (plot file names are
+        the fingerprints of the plots). Pages of the previous writing that
+        are not part of the report any more, and plots that are not
+        referenced any more, are removed. Unchanged files keep their
+        modification time, so that incremental builds of the documentation
+        only process the modified pages.
+
+        :param path: path to the directory that will be written to. It is OK if
+                     the directory does not exist.
+        :type path: str or pathlib.Path
+        '''
+        path = Path(path)
+
+        old_pages = self.read_manifest(path)
+        self.setup(path)
+        pages = {}
+        self._write_rec(tree=(), path=path, pages=pages, old_pages=old_pages)
+        self.write_manifest(path, pages, old_pages)
+
+        figures = path / 'figures'
+        self.remove_orphan_plots(figures)
+        items = self.plots_to_draw(self.plots, figures)
+        if self.n_workers is not None:
+            LOGGER.info('writing %d plots using %d subprocesses',
+                        len(items), self.n_workers)
+        else:
+            LOGGER.info('writing %d plots in sequential mode', len(items))
+        self.draw_plots(items)
+
+    def plots_to_draw(self, plots, figures):
+        '''Return the plots that must be drawn, i.e. the plots whose file
+        does not exist or is not a valid PNG file.
+
+        :param dict plots: the plots, indexed by their fingerprints.
+        :param pathlib.Path figures: the path to the figures directory.
+        :returns: the plots to draw and the paths of their files.
+        :rtype: list(tuple(MplPlot, str))
+        '''
+        items = [(plot, str(figures / f'plot_{fingerprint}.png'))
+                 for fingerprint, plot in plots.items()
+                 if not self.is_valid_png(figures
+                                          / f'plot_{fingerprint}.png')]
+        LOGGER.debug('%d plots already written', len(plots) - len(items))
+        return items
+
+    def render_pool(self):
+        '''Return a context manager giving the pool of :attr:`n_workers`
+        processes used to draw the plots (see :class:`~.mpl.MplRenderPool`),
+        or `None` if :attr:`n_workers` is `None`.'''
+        if self.n_workers is None:
+            return _NoRenderPool()
+        return MplRenderPool(self.n_workers)
+
+    def draw_plots(self, items, pool=None):
+        '''Draw the given plots, in a pool of :attr:`n_workers` processes
+        (see :meth:`render_pool`) or sequentially if :attr:`n_workers` is
+        `None`.
+
+        A plot that cannot be drawn is logged and skipped.
+
+        :param items: the plots and the paths of their files.
+        :type items: list(tuple(MplPlot, str))
+        :param pool: the pool to use, if already started.
+        :type pool: MplRenderPool or None
+        '''
+        if pool is not None:
+            failures = pool.render(items)
+        elif self.n_workers is not None:
+            with self.render_pool() as new_pool:
+                failures = new_pool.render(items)
+        else:
+            items.sort(key=lambda item: item[0].layout_key())
+            with MplRenderer() as renderer:
+                failures = renderer.save_many(items)
+        for plot_path, err in failures:
+            LOGGER.error('cannot draw plot %s: %s', plot_path, err)
+
+    @classmethod
+    def read_manifest(cls, path):
+        '''Read the hashes of the pages written in `path` by the previous call
+        to :meth:`write`.
+
+        :param pathlib.Path path: the path to the report directory.
+        :returns: the hashes of the pages, indexed by their path relative to
+            the report directory (empty if there is no valid manifest)
+        :rtype: dict(str, str)
+        '''
+        try:
+            with (path / cls.MANIFEST).open() as manifest:
+                return dict(json.load(manifest)['pages'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def write_manifest(self, path, pages, old_pages):
+        '''Remove the pages of the previous writing that are not part of the
+        report any more, and write the manifest of the current pages.
+
+        :param pathlib.Path path: the path to the report directory.
+        :param dict(str, str) pages: the hashes of the current pages.
+        :param dict(str, str) old_pages: the hashes of the pages of the
+            previous writing.
+        '''
+        LOGGER.debug('%d pages written, %d unchanged',
+                     sum(pages[page] != old_pages.get(page) for page in pages),
+                     sum(pages[page] == old_pages.get(page)
+                         for page in pages))
+        for page in old_pages.keys() - pages.keys():
+            LOGGER.debug('removing page %s', page)
+            _remove_file(path / page)
+        with (path / self.MANIFEST).open('w') as manifest:
+            json.dump({'pages': pages}, manifest, indent=0, sort_keys=True)
+
+    @classmethod
+    def is_valid_png(cls, path):
+        '''Check that `path` is a complete PNG file (PNG signature at the
+        beginning and ``IEND`` chunk at the end).
+
+        :param pathlib.Path path: the path to the file.
+        :rtype: bool
+        '''
+        try:
+            with path.open('rb') as png:
+                if png.read(len(cls.PNG_SIGNATURE)) != cls.PNG_SIGNATURE:
+                    return False
+                png.seek(-12, os.SEEK_END)
+                return png.read(12)[4:8] == b'IEND'
+        except OSError:
+            return False
+
+    def remove_orphan_plots(self, figures, fingerprints=None):
+        '''Remove the plot files that are not referenced by the report.
+
+        :param pathlib.Path figures: the path to the figures directory.
+        :param fingerprints: the fingerprints of the plots of the report; if
+            `None`, the keys of :attr:`plots` are used.
+        :type fingerprints: collections.abc.Collection(str) or None
+        '''
+        if fingerprints is None:
+            fingerprints = self.plots
+        keep = {f'plot_{fingerprint}.png' for fingerprint in fingerprints}
+        orphans = [fig for fig in figures.glob('plot_*.png')
+                   if fig.name not in keep]
+        LOGGER.debug('removing %d orphan plots', len(orphans))
+        for fig in orphans:
+            _remove_file(fig)
+
+    def _write_rec(self, *, tree, path, pages, old_pages):
+        subtrees = self.tree_dict[tree]
+
+        def write_text(stream):
+            stream.write('\n'.join(self.text_dict[tree]))
+            if subtrees:
+                stream.write(self.toc('Contents', subtrees))
+
+        self.write_page(tree=tree, path=path, write_text=write_text,
+                        pages=pages, old_pages=old_pages)
+        for subtree in subtrees:
+            self._write_rec(tree=subtree, path=path, pages=pages,
+                            old_pages=old_pages)
+
+    def write_page(self, *, tree, path, write_text, pages, old_pages):
+        '''Write the page of a section, if its text changed.
+
+        The text is written to a temporary file and hashed. The page is
+        replaced by the temporary file if the hash differs from the one of the
+        manifest of the previous write (see :meth:`read_manifest`); otherwise
+        the temporary file is removed, as it is if the text cannot be written.
+
+        :param tuple(str) tree: the section.
+        :param pathlib.Path path: the path to the output directory.
+        :param write_text: function writing the text of the page to the stream
+            given as argument.
+        :param dict pages: the hashes of the pages written so far, updated
+            with the hash of this page.
+        :param dict old_pages: the hashes of the pages of the previous write.
+        '''
+        # pylint: disable=too-many-arguments
+        if tree:
+            tree_path = self.tree_to_path(base=path, tree=tree)
+        else:
+            tree_path = path / 'index'
+        ensure(tree_path.parent, is_dir=True)
+        write_path = tree_path.with_name(tree_path.name + '.rst')
+        tmp_path = write_path.with_name(f'{write_path.name}.{os.getpid()}.tmp')
+        try:
+            with tmp_path.open('w') as tmp_file:
+                writer = _HashingWriter(tmp_file)
+                write_text(writer)
+        except Exception:
+            _remove_file(tmp_path)
+            raise
+        page = write_path.relative_to(path).as_posix()
+        pages[page] = writer.hash.hexdigest()
+        if pages[page] != old_pages.get(page) or not write_path.exists():
+            LOGGER.note('writing tree_path: %s', tree_path)
+            os.replace(tmp_path, write_path)
+        else:
+            LOGGER.debug('unchanged tree_path: %s', tree_path)
+            tmp_path.unlink()
+
+    @staticmethod
+    def tree_to_path(*, base, tree):
+        '''Convert a tree to a file path.
+
+        :param base: the base path for all subtrees.
+        :type base: pathlib.Path
+        :param tuple(str) tree: a sequence of tree nodes, starting from the
+                          tree root.
+        '''
+        paths = [sanitize_filename(node) for node in tree]
+        return base.joinpath(*paths)
+
+    def toc(self, toc_title, subtrees):
+        '''Build an rst table of contents.
+
+        :param str toc_title: the title for the table of contents (e.g.
+                              ``'Contents'``).
+        '''
+        lines = ['\n\n.. toctree::\n    :titlesonly:\n    '
+                 f':caption: {toc_title}:\n']
+        for subtree in subtrees:
+            # need to remove upper level to subtree in toc else they appear N
+            # times in the toc, depending on level, breaking the links
+            fname = str(self.tree_to_path(base=Path(''), tree=subtree[-2:]))
+            line = ' '*4 + fname
+            lines.append(line)
+        lines.append('')
+        lines.append('')
+        return '\n'.join(lines)
+
+    def setup(self, path):
+        '''Set up the output directory for :meth:`write`.
+
+        :param pathlib.Path path: the path to the directory.
+        '''
+        ensure(path, is_dir=True)
+        ensure(path / '.static', is_dir=True)
+        ensure(path / '.templates', is_dir=True)
+        ensure(path / 'figures', is_dir=True)
+        year = datetime.now().year
+        self.configure(resource='conf.py.template', dest=path / 'conf.py',
+                       author=self.author, project=self.title,
+                       version=self.version, theme='alabaster',
+                       theme_options={}, year=year)
+        self.configure(resource='valjean.css',
+                       dest=path / '.static' / 'valjean.css',
+                       formatting=False)
+
+    @staticmethod
+    def configure(resource, dest, formatting=True, **kwargs):
+        '''Copy a package resource to the specified destination, optionally
+        formatting the resource content using :meth:`str.format`.
+
+        For more information about resources, see `pkg_resources`_.
+
+        :param str resource: the name of the resource.
+        :param pathlib.Path dest: the destination path.
+        :param bool formatting: whether formatting should be applied.
+        :param dict kwargs: any additional keyword arguments will be passed to
+                            the formatting.
+        '''
+        assert pkg.resource_exists('valjean.javert.resources.rst', resource)
+        res_template = pkg.resource_string('valjean.javert.resources.rst',
+                                           resource).decode('utf-8')
+        res_str = res_template.format(**kwargs) if formatting else res_template
+        if dest.exists() and dest.read_text() == res_str:
+            return
+        with dest.open('w') as res_file:
+            res_file.write(res_str)
+
+
+class _HashingWriter:
+    '''Text stream writing to a file and hashing what it writes.'''
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.hash = sha256()
+
+    def write(self, text):
+        '''Write `text` to the file and add it to the hash.'''
+        self.hash.update(text.encode('utf-8'))
+        self.stream.write(text)
+
+
+def _remove_file(path):
+    '''Remove a file, if it exists.'''
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class LazyFormattedRst(FormattedRst):
+    '''A :class:`FormattedRst` that formats the report while writing it.
+
+    A :class:`FormattedRst` holds the text of all the sections and all the
+    plots of the report until it is written. A :class:`LazyFormattedRst` only
+    holds the report: :meth:`write` formats it one section at a time. The
+    test results of a section are represented and formatted one by one and
+    written directly to the page of the section (tables are streamed, see
+    :meth:`~.RstTable.write`); the plots of the section are then drawn and
+    released before the next section is formatted. The peak memory is thus
+    bounded by the largest section rather than by the whole report.
+
+    The written files are the same as the ones written by
+    :class:`FormattedRst` for the same report, and the writing is incremental
+    in the same way (see :meth:`FormattedRst.write`).
+
+    Objects of this class are returned by :meth:`~.Rst.format_report` with
+    ``lazy=True``.
+    '''
+
+    def __init__(self, *, author, title, version, report, rst,
+                 n_workers=None):
+        # pylint: disable=too-many-arguments
+        '''Create a :class:`LazyFormattedRst` object.
+
+        :param str author: the author of this report.
+        :param str title: the title of this report.
+        :param str version: the version number for this report.
+        :param TestReport report: the report to format.
+        :param Rst rst: the object formatting the sections (the plots of each
+            section are removed from it once they are drawn).
+        :param n_workers: number of subprocesses to use to write out the plots
+            in parallel.  If `None` is given, write the plots in sequential
+            mode.
+        :type n_workers: int or None
+        '''
+        super().__init__(author=author, title=title, version=version,
+                         tree_dict={}, text_dict={}, plots={},
+                         n_workers=n_workers)
+        self.report = report
+        self.rst = rst
+
+    def write(self, path):
+        '''Format the report and write the text files and the plots into the
+        directory specified by `path`, section by section.
+
+        :param path: path to the directory that will be written to. It is OK if
+                     the directory does not exist.
+        :type path: str or pathlib.Path
+        '''
+        path = Path(path)
+
+        old_pages = self.read_manifest(path)
+        self.setup(path)
+        pages = {}
+        fingerprints = set()
+        LOGGER.info('formatting and writing the report section by section')
+        with self.render_pool() as pool:
+            self._write_lazy_rec(rst=self.rst, report=self.report, tree=(),
+                                 path=path, pages=pages, old_pages=old_pages,
+                                 fingerprints=fingerprints, pool=pool)
+        self.write_manifest(path, pages, old_pages)
+        self.remove_orphan_plots(path / 'figures', fingerprints)
+
+    def _write_lazy_rec(self, *, rst, report, tree, path, pages, old_pages,
+                        fingerprints, pool):
+        # pylint: disable=too-many-arguments
+        subreports = [stuff for stuff in report.content
+                      if isinstance(stuff, TestReport)]
+        subtrees = [tree + (subreport.title,) for subreport in subreports]
+
+        def write_text(stream):
+            with memoized_fingerprints():
+                self.write_section(rst=rst, report=report, depth=len(tree),
+                                   stream=stream)
+            if subtrees:
+                stream.write(self.toc('Contents', subtrees))
+
+        self.write_page(tree=tree, path=path, write_text=write_text,
+                        pages=pages, old_pages=old_pages)
+
+        fingerprints.update(rst.plots)
+        self.draw_plots(self.plots_to_draw(rst.plots, path / 'figures'),
+                        pool=pool)
+        rst.plots.clear()
+
+        for subreport, subtree in zip(subreports, subtrees):
+            self._write_lazy_rec(rst=rst, report=subreport, tree=subtree,
+                                 path=path, pages=pages, old_pages=old_pages,
+                                 fingerprints=fingerprints, pool=pool)
+
+    @staticmethod
+    def write_section(*, rst, report, depth, stream):
+        '''Format a report section (without its subsections) and write it to
+        a stream.
+
+        The text is the same as the one of the section in the ``text_dict``
+        attribute of :class:`~.Rst`, joined by newlines. The plots of the
+        section are added to the ``plots`` attribute of `rst`.
+
+        :param Rst rst: the object formatting the section.
+        :param TestReport report: the report section.
+        :param int depth: the depth of the section, 0 being the top.
+        :param stream: the text stream to write to.
+        '''
+        def items():
+            yield from rst.format_section(report, depth=depth)
+            for stuff in report.content:
+                if isinstance(stuff, TestResult):
+                    yield from rst.format_result_items(stuff)
+                elif not isinstance(stuff, TestReport):
+                    raise TypeError('expected TestReport or TestResult in '
+                                    f'TestReport content, found '
+                                    f'{type(stuff)} instead')
+
+        for index, item in enumerate(items()):
+            if index:
+                stream.write('\n')
+            if isinstance(item, RstTable):
+                item.write(stream)
+            else:
+                stream.write(str(item))